@@ -1,7 +1,25 @@
-from typing import Optional, Tuple
-import heapq
+from bisect import bisect_left
+from collections import deque
+from fractions import Fraction
+from functools import lru_cache
+from typing import Generator, Optional, Tuple
+import math
 
-from state import State
+from arena import NodeArena
+from explored_set import create_explored_set
+from limits import SearchLimits, LimitReached
+from priority_queue import BucketQueue
+from pruning import REVERSAL_PRUNER, LAST_OPERATOR_TO_STATE_MAP, START, get_learned_pruner
+from state import State, PackedState
+
+# The walking distance tables grow quickly with the number of lines: 4 lines of 4 tiles have 24964 configurations,
+# 5 lines of 4 tiles almost 6 million
+MAX_WALKING_DISTANCE_LINES = 4
+
+DEFAULT_WEIGHT = 2
+DEFAULT_ANYTIME_WEIGHT = 3
+ANYTIME_WEIGHT_STEP = Fraction(1, 2)
+MAX_WEIGHT_DENOMINATOR = 100
 
 
 def manhattan_distance(state: State) -> int:
@@ -19,41 +37,499 @@ def manhattan_distance(state: State) -> int:
     return distance
 
 
+def manhattan_distance_delta(state: State, tile: int, from_index: int, to_index: int) -> int:
+    goal_row, goal_col = (tile - 1) // state.width, (tile - 1) % state.width
+    from_row, from_col = from_index // state.width, from_index % state.width
+    to_row, to_col = to_index // state.width, to_index % state.width
+    return abs(goal_row - to_row) + abs(goal_col - to_col) - abs(goal_row - from_row) - abs(goal_col - from_col)
+
+
 def hamming_distance(state: State) -> int:
     distance = 0
-    goal = state.get_target_state()
 
     for index, value in enumerate(state.board):
-        if value != 0 and value != goal.board[index]:
+        if value != 0 and value != index + 1:
             distance += 1
 
     return distance
 
 
+def hamming_distance_delta(state: State, tile: int, from_index: int, to_index: int) -> int:
+    return (to_index != tile - 1) - (from_index != tile - 1)
+
+
+def get_longest_increasing_subsequence_length(values) -> int:
+    tails = []
+    for value in values:
+        i = bisect_left(tails, value)
+        if i == len(tails):
+            tails.append(value)
+        else:
+            tails[i] = value
+    return len(tails)
+
+
+def get_row_conflicts(row_tiles, row: int, width: int) -> int:
+    goal_cols = [(t - 1) % width for t in row_tiles if t != 0 and (t - 1) // width == row]
+    return len(goal_cols) - get_longest_increasing_subsequence_length(goal_cols)
+
+
+def get_column_conflicts(column_tiles, col: int, width: int) -> int:
+    goal_rows = [(t - 1) // width for t in column_tiles if t != 0 and (t - 1) % width == col]
+    return len(goal_rows) - get_longest_increasing_subsequence_length(goal_rows)
+
+
+def linear_conflict(state: State) -> int:
+    # Every tile that has to leave its goal row or column to let other tiles pass costs at least 2 extra moves
+    width, board = state.width, state.board
+    conflicts = 0
+    for row in range(state.height):
+        conflicts += get_row_conflicts(board[row * width:(row + 1) * width], row, width)
+    for col in range(width):
+        conflicts += get_column_conflicts(board[col::width], col, width)
+
+    return manhattan_distance(state) + 2 * conflicts
+
+
+def linear_conflict_delta(state: State, tile: int, from_index: int, to_index: int) -> int:
+    # Moving a tile into the adjacent blank never changes its order within the line it moves along, so only the
+    # two lines it leaves and enters have to be checked again
+    width, board = state.width, state.board
+    from_row, from_col = from_index // width, from_index % width
+    to_row, to_col = to_index // width, to_index % width
+    conflicts = 0
+
+    if from_row == to_row:
+        for col, row, value in ((from_col, from_row, 0), (to_col, to_row, tile)):
+            column = list(board[col::width])
+            conflicts -= get_column_conflicts(column, col, width)
+            column[row] = value
+            conflicts += get_column_conflicts(column, col, width)
+    else:
+        for row, col, value in ((from_row, from_col, 0), (to_row, to_col, tile)):
+            line = list(board[row * width:(row + 1) * width])
+            conflicts -= get_row_conflicts(line, row, width)
+            line[col] = value
+            conflicts += get_row_conflicts(line, row, width)
+
+    return manhattan_distance_delta(state, tile, from_index, to_index) + 2 * conflicts
+
+
+@lru_cache(maxsize=None)
+def get_walking_distance_table(num_of_lines: int, line_size: int) -> dict:
+    # Breadth-first search over configurations that only record how many tiles of each goal line are in each line
+    # and which line holds the blank. Every move takes one tile from the line next to the blank into the blank's line.
+    if num_of_lines > MAX_WALKING_DISTANCE_LINES:
+        raise ValueError(f'Invalid board: Walking distance is limited to boards of at most '
+                         f'{MAX_WALKING_DISTANCE_LINES} rows and columns')
+    counts = [[line_size if i == j else 0 for j in range(num_of_lines)] for i in range(num_of_lines)]
+    counts[-1][-1] -= 1
+    start = tuple(value for line in counts for value in line) + (num_of_lines - 1,)
+    table = {start: 0}
+    frontier = deque([start])
+
+    while len(frontier) > 0:
+        config = frontier.popleft()
+        distance = table[config]
+        blank = config[-1]
+        for line in (blank - 1, blank + 1):
+            if line < 0 or line >= num_of_lines:
+                continue
+            for group in range(num_of_lines):
+                if config[line * num_of_lines + group] == 0:
+                    continue
+                neighbour = list(config)
+                neighbour[line * num_of_lines + group] -= 1
+                neighbour[blank * num_of_lines + group] += 1
+                neighbour[-1] = line
+                neighbour = tuple(neighbour)
+                if neighbour not in table:
+                    table[neighbour] = distance + 1
+                    frontier.append(neighbour)
+
+    return table
+
+
+def get_walking_distance_configs(state: State) -> Tuple[tuple, tuple]:
+    width, height = state.width, state.height
+    rows = [0] * (height * height + 1)
+    cols = [0] * (width * width + 1)
+    for index, value in enumerate(state.board):
+        row, col = index // width, index % width
+        if value == 0:
+            rows[-1], cols[-1] = row, col
+        else:
+            rows[row * height + (value - 1) // width] += 1
+            cols[col * width + (value - 1) % width] += 1
+    return tuple(rows), tuple(cols)
+
+
+def walking_distance(state: State) -> int:
+    rows, cols = get_walking_distance_configs(state)
+    return get_walking_distance_table(state.height, state.width)[rows] \
+        + get_walking_distance_table(state.width, state.height)[cols]
+
+
+def walking_distance_delta(state: State, tile: int, from_index: int, to_index: int) -> int:
+    # A vertical move only changes the row configuration and a horizontal one only the column configuration. The
+    # configurations of the parent are computed once and kept on it for the rest of its children, and a child only
+    # moves one tile and the blank between two lines of one of them.
+    width, height = state.width, state.height
+    from_row, from_col = from_index // width, from_index % width
+    to_row, to_col = to_index // width, to_index % width
+    if state.heuristic_cache is None:
+        state.heuristic_cache = get_walking_distance_configs(state)
+    rows, cols = state.heuristic_cache
+
+    if from_row == to_row:
+        table, config, size = get_walking_distance_table(width, height), cols, width
+        line_from, line_to, group = from_col, to_col, (tile - 1) % width
+    else:
+        table, config, size = get_walking_distance_table(height, width), rows, height
+        line_from, line_to, group = from_row, to_row, (tile - 1) // width
+
+    old_distance = table[config]
+    config = list(config)
+    config[line_from * size + group] -= 1
+    config[line_to * size + group] += 1
+    config[-1] = line_from
+    return table[tuple(config)] - old_distance
+
+
+# Additive heuristics expose a `delta` function that returns the change of the heuristic value caused by moving
+# a single tile, so that State.move can update the value of the parent without evaluating the whole board
+manhattan_distance.delta = manhattan_distance_delta
+hamming_distance.delta = hamming_distance_delta
+linear_conflict.delta = linear_conflict_delta
+walking_distance.delta = walking_distance_delta
+
+
+def prepare_heuristic(state: State, heuristic, limits: SearchLimits = None):
+    # Loads or builds the tables of a heuristic before the search, within its limits, which the heuristic does not get
+    prepare = getattr(heuristic, 'prepare', None)
+    if prepare is not None:
+        prepare(state, limits)
+
+
+def get_initial_heuristic_value(state: State, heuristic) -> int:
+    value = heuristic(state)
+    state.heuristic_value = value if hasattr(heuristic, 'delta') else None
+    return value
+
+
+def get_weight(weight) -> Fraction:
+    # Weights are kept as fractions, so that g + w·h multiplied by the denominator of w is an integer priority for the
+    # bucket queue
+    weight = Fraction(weight).limit_denominator(MAX_WEIGHT_DENOMINATOR)
+    if weight < 1:
+        raise Exception("Invalid weight")
+    return weight
+
+
 class AStarSolver:
     @staticmethod
-    def solve(state, heuristic=manhattan_distance) -> Tuple[Optional[State], int, int, int]:
+    def solve(state, heuristic=manhattan_distance, queue=BucketQueue, limits: SearchLimits = None) \
+            -> Tuple[Optional[State], int, int, int]:
         if not state.is_solvable():
             raise Exception("Not solvable")
+        prepare_heuristic(state, heuristic, limits)
 
-        goal = state.get_target_state()
-        priority = heuristic(state)
-        frontier = [(priority, state, 0)]
-        explored = set()
+        packed = state.pack()
+        goal = packed.get_target_state().key
+        width, height, bits = state.width, state.height, packed.bits
+        mask = (1 << bits) - 1
+        moves = REVERSAL_PRUNER.get_moves(state.geometry, "URDL")
+        delta = getattr(heuristic, 'delta', None)
+
+        arena = NodeArena(len(state) * bits)
+        frontier = queue()
+        frontier.push(heuristic(state), 0, arena.add(packed.key, packed.get_blank_position()))
+        explored = create_explored_set(state)
         num_of_visited = 1
         max_depth = 0
 
         while len(frontier) > 0:
-            _, node, depth = heapq.heappop(frontier)
+            priority, depth, index = frontier.pop()
+            key = arena.keys[index]
+            if key == goal:
+                return arena.materialise(index, state), num_of_visited, len(explored), max_depth
+            if key in explored:
+                continue
+            explored.add(key)
+            if limits is not None:
+                limits.check(num_of_visited, len(explored), max_depth, len(frontier))
+
+            blank = arena.blanks[index]
+            depth += 1
+            # A short-lived view of the expanded node for the heuristic, which is not kept anywhere
+            node = PackedState.from_key(key, width, height, blank)
+            h = priority - depth + 1
+            pruning_state = LAST_OPERATOR_TO_STATE_MAP.get(arena.operators[index], START)
+            for operator, target, _ in moves[pruning_state][blank]:
+                tile = (key >> (target * bits)) & mask
+                neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
+                if neighbour not in explored:
+                    if delta is not None:
+                        neighbour_h = h + delta(node, tile, target, blank)
+                    else:
+                        neighbour_h = heuristic(PackedState.from_key(neighbour, width, height, target))
+                    frontier.push(depth + neighbour_h, depth, arena.add(neighbour, target, index, operator, depth))
+                    num_of_visited += 1
+                    if depth > max_depth:
+                        max_depth = depth
+
+        return None, num_of_visited, len(explored), max_depth
+
+
+class IDAStarSolver:
+    @staticmethod
+    def solve(state, heuristic=manhattan_distance, limits: SearchLimits = None) \
+            -> Tuple[Optional[State], int, int, int]:
+        if not state.is_solvable():
+            raise Exception("Not solvable")
+        prepare_heuristic(state, heuristic, limits)
+
+        goal = state.get_target_state()
+        delta = getattr(heuristic, 'delta', None)
+        # A tree search can skip every move sequence that has a shortlex smaller equivalent, not only reversals
+        pruner = get_learned_pruner()
+        path = {state}
+        num_of_visited = 1
+        num_of_explored = 0
+        max_depth = 0
+
+        def search(node, depth, bound):
+            nonlocal num_of_visited, num_of_explored, max_depth
+
+            h = heuristic(node) if node.heuristic_value is None else node.heuristic_value
+            priority = depth + h
+            if priority > bound:
+                return None, priority
             if node == goal:
-                return node, num_of_visited, len(explored), max_depth
-            explored.add(node)
-            for neighbour in node.get_neighbours("URDL"):
+                return node, priority
+
+            num_of_explored += 1
+            if limits is not None:
+                limits.check(num_of_visited, num_of_explored, max_depth, len(path))
+            next_bound = math.inf
+            for neighbour in node.get_neighbours("URDL", delta, pruner):
+                if neighbour in path:
+                    continue
+                num_of_visited += 1
+                if depth + 1 > max_depth:
+                    max_depth = depth + 1
+
+                path.add(neighbour)
+                solved, neighbour_bound = search(neighbour, depth + 1, bound)
+                path.remove(neighbour)
+
+                if solved is not None:
+                    return solved, neighbour_bound
+                if neighbour_bound < next_bound:
+                    next_bound = neighbour_bound
+
+            return None, next_bound
+
+        bound = get_initial_heuristic_value(state, heuristic)
+        while bound != math.inf:
+            solved, bound = search(state, 0, bound)
+            if solved is not None:
+                return solved, num_of_visited, num_of_explored, max_depth
+
+        return None, num_of_visited, num_of_explored, max_depth
+
+
+class WeightedAStarSolver:
+    @staticmethod
+    def solve(state, heuristic=manhattan_distance, weight=DEFAULT_WEIGHT, limits: SearchLimits = None) \
+            -> Tuple[Optional[State], int, int, int]:
+        # Expands by f = g + w·h, so the solution is at most w times longer than an optimal one (for a consistent
+        # heuristic), but far fewer states are expanded on the way
+        if not state.is_solvable():
+            raise Exception("Not solvable")
+        prepare_heuristic(state, heuristic, limits)
+
+        weight = get_weight(weight)
+        scale, factor = weight.denominator, weight.numerator
+        packed = state.pack()
+        goal = packed.get_target_state().key
+        width, height, bits = state.width, state.height, packed.bits
+        mask = (1 << bits) - 1
+        moves = REVERSAL_PRUNER.get_moves(state.geometry, "URDL")
+        delta = getattr(heuristic, 'delta', None)
+
+        arena = NodeArena(len(state) * bits)
+        frontier = BucketQueue()
+        frontier.push(factor * heuristic(state), 0, arena.add(packed.key, packed.get_blank_position()))
+        explored = create_explored_set(state)
+        num_of_visited = 1
+        max_depth = 0
+
+        while len(frontier) > 0:
+            priority, depth, index = frontier.pop()
+            key = arena.keys[index]
+            if key == goal:
+                return arena.materialise(index, state), num_of_visited, len(explored), max_depth
+            if key in explored:
+                continue
+            explored.add(key)
+            if limits is not None:
+                limits.check(num_of_visited, len(explored), max_depth, len(frontier))
+
+            blank = arena.blanks[index]
+            node = PackedState.from_key(key, width, height, blank)
+            h = (priority - scale * depth) // factor
+            depth += 1
+            pruning_state = LAST_OPERATOR_TO_STATE_MAP.get(arena.operators[index], START)
+            for operator, target, _ in moves[pruning_state][blank]:
+                tile = (key >> (target * bits)) & mask
+                neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
                 if neighbour not in explored:
-                    priority = (depth + 1) + heuristic(neighbour)
-                    heapq.heappush(frontier, (priority, neighbour, depth + 1))
+                    if delta is not None:
+                        neighbour_h = h + delta(node, tile, target, blank)
+                    else:
+                        neighbour_h = heuristic(PackedState.from_key(neighbour, width, height, target))
+                    frontier.push(scale * depth + factor * neighbour_h, depth,
+                                  arena.add(neighbour, target, index, operator, depth))
                     num_of_visited += 1
-                    if depth + 1 > max_depth:
-                        max_depth = depth + 1
+                    if depth > max_depth:
+                        max_depth = depth
 
         return None, num_of_visited, len(explored), max_depth
+
+
+class AnytimeAStarSolver:
+    @staticmethod
+    def solve(state, heuristic=manhattan_distance, weight=DEFAULT_ANYTIME_WEIGHT, deadline=None,
+              limits: SearchLimits = None, on_solution=None) -> Tuple[Optional[State], int, int, int]:
+        # Each better solution is passed to `on_solution` with its suboptimality bound. The best solution is returned
+        # once it is proven optimal or once the deadline (in seconds from now) or another limit has been reached.
+        solutions = AnytimeAStarSolver.iter_solutions(state, heuristic, weight, deadline, limits)
+        best = None
+        while True:
+            try:
+                best, bound = next(solutions)
+            except StopIteration as stop:
+                return (best, *stop.value)
+            if on_solution is not None:
+                on_solution(best, bound)
+
+    @staticmethod
+    def iter_solutions(state, heuristic=manhattan_distance, weight=DEFAULT_ANYTIME_WEIGHT, deadline=None,
+                       limits: SearchLimits = None) -> Generator[Tuple[State, float], None, Tuple[int, int, int]]:
+        # Anytime repairing A* (ARA*): weighted A* run again with smaller and smaller weights down to 1. Every run
+        # keeps the costs found so far and only reopens the states whose cost has improved since they were expanded.
+        # Yields every better solution with its suboptimality bound as soon as it is found and returns the stats.
+        if not state.is_solvable():
+            raise Exception("Not solvable")
+        prepare_heuristic(state, heuristic, limits)
+
+        weight = get_weight(weight)
+        budget = SearchLimits(timeout=deadline) if deadline is not None else None
+        packed = state.pack()
+        goal = packed.get_target_state().key
+        width, height, bits = state.width, state.height, packed.bits
+        mask = (1 << bits) - 1
+        moves = REVERSAL_PRUNER.get_moves(state.geometry, "URDL")
+        delta = getattr(heuristic, 'delta', None)
+
+        arena = NodeArena(len(state) * bits)
+        # The arena index of the cheapest node of every key and its heuristic value
+        records = {packed.key: (arena.add(packed.key, packed.get_blank_position()), heuristic(state))}
+        opened = {packed.key}
+        closed = set()
+        inconsistent = set()
+        best = None
+        num_of_visited = 1
+        num_of_explored = 0
+        max_depth = 0
+
+        def improve_path(frontier, scale, factor):
+            nonlocal num_of_visited, num_of_explored, max_depth
+
+            while len(frontier) > 0:
+                priority, depth, index = frontier.pop()
+                key = arena.keys[index]
+                if records[key][0] != index:
+                    continue
+                goal_record = records.get(goal)
+                if goal_record is not None and scale * arena.depths[goal_record[0]] <= priority:
+                    # No state left in the open list can improve the solution with this weight
+                    frontier.push(priority, depth, index)
+                    return
+
+                opened.discard(key)
+                closed.add(key)
+                num_of_explored += 1
+                for search_limits in (limits, budget):
+                    if search_limits is not None:
+                        search_limits.check(num_of_visited, num_of_explored, max_depth, len(opened))
+
+                blank = arena.blanks[index]
+                node = PackedState.from_key(key, width, height, blank)
+                h = records[key][1]
+                depth += 1
+                pruning_state = LAST_OPERATOR_TO_STATE_MAP.get(arena.operators[index], START)
+                for operator, target, _ in moves[pruning_state][blank]:
+                    tile = (key >> (target * bits)) & mask
+                    neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
+                    record = records.get(neighbour)
+                    if record is not None and arena.depths[record[0]] <= depth:
+                        continue
+                    if record is not None:
+                        neighbour_h = record[1]
+                    elif delta is not None:
+                        neighbour_h = h + delta(node, tile, target, blank)
+                    else:
+                        neighbour_h = heuristic(PackedState.from_key(neighbour, width, height, target))
+
+                    neighbour_index = arena.add(neighbour, target, index, operator, depth)
+                    records[neighbour] = (neighbour_index, neighbour_h)
+                    num_of_visited += 1
+                    if depth > max_depth:
+                        max_depth = depth
+                    if neighbour in closed:
+                        inconsistent.add(neighbour)
+                    else:
+                        opened.add(neighbour)
+                        frontier.push(scale * depth + factor * neighbour_h, depth, neighbour_index)
+
+        def get_bound():
+            # The optimal cost is at least the smallest g + h left to expand
+            lower_bound = min((arena.depths[records[key][0]] + records[key][1] for key in opened | inconsistent),
+                              default=None)
+            cost = arena.depths[best]
+            if lower_bound is None or cost <= lower_bound:
+                return Fraction(1)
+            return min(weight, Fraction(cost, lower_bound))
+
+        while True:
+            opened |= inconsistent
+            inconsistent.clear()
+            closed.clear()
+            frontier = BucketQueue()
+            for key in opened:
+                index, h = records[key]
+                frontier.push(weight.denominator * arena.depths[index] + weight.numerator * h, arena.depths[index],
+                              index)
+
+            try:
+                improve_path(frontier, weight.denominator, weight.numerator)
+            except LimitReached:
+                if best is None:
+                    raise
+                return num_of_visited, num_of_explored, max_depth
+
+            if goal not in records:
+                return num_of_visited, num_of_explored, max_depth
+            bound = None
+            if records[goal][0] != best or weight == 1:
+                # The pass with weight 1 proves the solution optimal, so its bound is published even if it is the same
+                # solution as before
+                best = records[goal][0]
+                bound = Fraction(1) if weight == 1 else get_bound()
+                yield arena.materialise(best, state), float(bound)
+
+            if weight == 1 or bound == 1:
+                return num_of_visited, num_of_explored, max_depth
+            weight = max(Fraction(1), weight - ANYTIME_WEIGHT_STEP)
@@ -0,0 +1,50 @@
+from array import array
+
+from state import State, OPERATORS
+
+NO_PARENT = -1
+NO_OPERATOR = 0xFF
+
+
+class NodeArena:
+    # Search nodes stored in parallel arrays and referenced by index, so that no State objects (and no parent
+    # chains) are kept alive during the search. Keys wider than 64 bits do not fit in an array and use a list.
+    def __init__(self, key_bits):
+        self.keys = array('Q') if key_bits <= 64 else []
+        self.blanks = array('H')
+        self.parents = array('q')
+        self.operators = array('B')
+        self.depths = array('I')
+
+    def add(self, key, blank, parent=NO_PARENT, operator=NO_OPERATOR, depth=0) -> int:
+        self.keys.append(key)
+        self.blanks.append(blank)
+        self.parents.append(parent)
+        self.operators.append(operator)
+        self.depths.append(depth)
+        return len(self.depths) - 1
+
+    def truncate(self, length):
+        del self.keys[length:]
+        del self.blanks[length:]
+        del self.parents[length:]
+        del self.operators[length:]
+        del self.depths[length:]
+
+    def get_operators(self, index):
+        operators = []
+        while self.parents[index] != NO_PARENT:
+            operators.append(OPERATORS[self.operators[index]])
+            index = self.parents[index]
+        operators.reverse()
+        return operators
+
+    def materialise(self, index, root: State) -> State:
+        # Replays the path leading to the node on top of the root, which is the state the search started from
+        node = root
+        for operator in self.get_operators(index):
+            node = node.move(operator)
+        return node
+
+    def __len__(self):
+        return len(self.depths)
@@ -0,0 +1,90 @@
+import heapq
+from typing import Optional, Tuple
+
+from a_star import manhattan_distance, prepare_heuristic
+from arena import NodeArena
+from limits import SearchLimits
+from pruning import REVERSAL_PRUNER, LAST_OPERATOR_TO_STATE_MAP, START
+from state import State, PackedState
+
+DEFAULT_BEAM_WIDTH = 1000
+DEFAULT_RESTARTS = 2
+BEAM_WIDTH_GROWTH = 4
+# An attempt gives up after this many moves per tile, e.g. 20000 moves on a 20x20 board
+MAX_DEPTH_PER_TILE = 50
+
+
+class BeamSearchSolver:
+    @staticmethod
+    def solve(state, heuristic=manhattan_distance, width=DEFAULT_BEAM_WIDTH, restarts=DEFAULT_RESTARTS,
+              limits: SearchLimits = None) -> Tuple[Optional[State], int, int, int]:
+        # Breadth-first search that only keeps the `width` children with the smallest heuristic values at every
+        # depth, so it takes O(width·depth) time and memory but can miss every solution. The beam never goes back to
+        # a state it has kept before, and a failed attempt is started again with a beam BEAM_WIDTH_GROWTH times
+        # wider, at most `restarts` times.
+        if not state.is_solvable():
+            raise Exception("Not solvable")
+        prepare_heuristic(state, heuristic, limits)
+        width, restarts = int(width), int(restarts)
+        if width < 1:
+            raise Exception("Invalid beam width")
+
+        packed = state.pack()
+        goal = packed.get_target_state().key
+        board_width, board_height, bits = state.width, state.height, packed.bits
+        mask = (1 << bits) - 1
+        moves = REVERSAL_PRUNER.get_moves(state.geometry, "URDL")
+        delta = getattr(heuristic, 'delta', None)
+        depth_limit = MAX_DEPTH_PER_TILE * len(state)
+
+        num_of_visited = 1
+        num_of_explored = 0
+        max_depth = 0
+        if packed.key == goal:
+            return state, num_of_visited, num_of_explored, max_depth
+
+        for _ in range(restarts + 1):
+            arena = NodeArena(len(state) * bits)
+            beam = [(heuristic(state), arena.add(packed.key, packed.get_blank_position()))]
+            kept = {packed.key}
+            depth = 0
+
+            while len(beam) > 0 and depth < depth_limit:
+                depth += 1
+                max_depth = max(max_depth, depth)
+                # The children of the whole beam, without duplicates, as keys mapped to (h, blank, parent, operator)
+                children = {}
+                for h, index in beam:
+                    num_of_explored += 1
+                    if limits is not None:
+                        limits.check(num_of_visited, num_of_explored, max_depth, len(children))
+
+                    key = arena.keys[index]
+                    blank = arena.blanks[index]
+                    node = PackedState.from_key(key, board_width, board_height, blank)
+                    pruning_state = LAST_OPERATOR_TO_STATE_MAP.get(arena.operators[index], START)
+                    for operator, target, _ in moves[pruning_state][blank]:
+                        tile = (key >> (target * bits)) & mask
+                        neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
+                        if neighbour in kept or neighbour in children:
+                            continue
+                        num_of_visited += 1
+                        if neighbour == goal:
+                            return arena.materialise(arena.add(neighbour, target, index, operator, depth), state), \
+                                num_of_visited, num_of_explored, max_depth
+
+                        if delta is not None:
+                            neighbour_h = h + delta(node, tile, target, blank)
+                        else:
+                            neighbour_h = heuristic(PackedState.from_key(neighbour, board_width, board_height, target))
+                        children[neighbour] = (neighbour_h, target, index, operator)
+
+                best = heapq.nsmallest(width, children.items(), key=lambda item: item[1][0])
+                beam = []
+                for neighbour, (neighbour_h, target, index, operator) in best:
+                    kept.add(neighbour)
+                    beam.append((neighbour_h, arena.add(neighbour, target, index, operator, depth)))
+
+            width *= BEAM_WIDTH_GROWTH
+
+        return None, num_of_visited, num_of_explored, max_depth
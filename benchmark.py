@@ -12,20 +12,40 @@ def bench(snippet, number=1_000_000, repeat=5, setup=''):
 
 if __name__ == '__main__':
     state_setup = 'from state import State, Direction; from dfs import DFSSolver;' \
-                  'state = State([[13, 2, 10, 3], [1, 12, 8, 4], [5, 0, 9, 6], [15, 14, 11, 7]])'
+                  'state = State([[13, 2, 10, 3], [1, 12, 8, 4], [5, 0, 9, 6], [15, 14, 11, 7]]);' \
+                  'packed = state.pack()'
     state_snippets = [
         'state.get_blank_position()',
         'state.get_inversion_count()',
         'state.is_solvable()',
         'state.get_target_state()',
         'state.get_neighbours("URDL")',
-        'state.move(Direction.RIGHT)'
+        'state.move(Direction.RIGHT)',
+        'hash(state)',
+        'packed.get_neighbours("URDL")',
+        'packed.move(Direction.RIGHT)',
+        'hash(packed)'
     ]
 
     print('--- State (1 000 000 runs) ---')
     for s in state_snippets:
         print(f'{s}: {round(min(bench(s, setup=state_setup)), 2)} s')
 
+    solvability_setup = 'import random; from state import State; random.seed(0);' \
+                        'values = list(range({size} * {size})); random.shuffle(values);' \
+                        'state = State([values[i:i + {size}] for i in range(0, {size} * {size}, {size})])'
+    solvability_snippets = [
+        'state.get_inversion_count()',
+        'state.is_solvable()',
+        'state.inversion_parity = None; state.is_solvable()'
+    ]
+
+    print('\n--- Solvability (1 000 runs) ---')
+    for size in (3, 4, 8, 16, 32):
+        for s in solvability_snippets:
+            setup = solvability_setup.format(size=size)
+            print(f'{size}x{size} {s}: {round(min(bench(s, number=1000, setup=setup)), 4)} s')
+
     dfs_setup = 'from state import State, Direction; from dfs import DFSSolver;' \
                 'state = State([[1, 3, 0, 4], [5, 2, 7, 8], [9, 6, 11, 12], [13, 10, 14, 15]])'
     dfs_snippets = [
@@ -43,7 +63,7 @@ if __name__ == '__main__':
     for s in dfs_snippets:
         print(f'{s}: {round(min(bench(s, number=1000, setup=dfs_setup)), 2)} s')
 
-    bfs_setup = 'from state import State, Direction; from bfs import BFSSolver;' \
+    bfs_setup = 'from state import State, Direction; from bfs import BFSSolver, BidirectionalBFSSolver;' \
                 'state = State([[1, 3, 0, 4], [5, 2, 7, 8], [9, 6, 11, 12], [13, 10, 14, 15]])'
     bfs_snippets = [
         'BFSSolver.solve(state, "RDUL")',
@@ -53,7 +73,9 @@ if __name__ == '__main__':
         'BFSSolver.solve(state, "LUDR")',
         'BFSSolver.solve(state, "LURD")',
         'BFSSolver.solve(state, "ULDR")',
-        'BFSSolver.solve(state, "ULRD")'
+        'BFSSolver.solve(state, "ULRD")',
+        'BidirectionalBFSSolver.solve(state, "RDUL")',
+        'BidirectionalBFSSolver.solve(state, "ULRD")'
     ]
 
     print('\n--- BFS (1 000 runs) ---')
@@ -61,11 +83,16 @@ if __name__ == '__main__':
         print(f'{s}: {round(min(bench(s, number=1000, setup=bfs_setup)), 2)} s')
 
     a_star_setup = 'from state import State, Direction;' \
-                   'from a_star import AStarSolver, hamming_distance, manhattan_distance;' \
+                   'from a_star import AStarSolver, IDAStarSolver, hamming_distance, manhattan_distance,' \
+                   '    linear_conflict, walking_distance;' \
                    'state = State([[1, 3, 0, 4], [5, 2, 7, 8], [9, 6, 11, 12], [13, 10, 14, 15]])'
     a_star_snippets = [
         'AStarSolver.solve(state, hamming_distance)',
-        'AStarSolver.solve(state, manhattan_distance)'
+        'AStarSolver.solve(state, manhattan_distance)',
+        'AStarSolver.solve(state, linear_conflict)',
+        'AStarSolver.solve(state, walking_distance)',
+        'IDAStarSolver.solve(state, hamming_distance)',
+        'IDAStarSolver.solve(state, manhattan_distance)'
     ]
 
     print('\n--- A* (1 000 runs) ---')
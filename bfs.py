@@ -1,32 +1,240 @@
 from typing import Optional, Tuple
 from collections import deque
 
+from arena import NodeArena
+from explored_set import create_explored_set
+from limits import SearchLimits, LimitReached
+from pruning import REVERSAL_PRUNER, LAST_OPERATOR_TO_STATE_MAP, START
 from solver import Solver
-from state import State
+from state import State, OPERATORS
 
 
 class BFSSolver(Solver):
     @staticmethod
-    def solve(state: State, order: str) -> Tuple[Optional[State], int, int, int]:
+    def solve(state: State, order: str, limits: SearchLimits = None) -> Tuple[Optional[State], int, int, int]:
         Solver.solve(state, order)
 
-        goal = state.get_target_state()
+        packed = state.pack()
+        goal = packed.get_target_state().key
+        bits = packed.bits
+        mask = (1 << bits) - 1
+        moves = REVERSAL_PRUNER.get_moves(state.geometry, order)
 
-        frontier = deque([(state, 0)])
-        explored = set()
+        arena = NodeArena(len(state) * bits)
+        frontier = deque([arena.add(packed.key, packed.get_blank_position())])
+        explored = create_explored_set(state)
         num_of_visited = 1
         max_depth = 0
 
         while len(frontier) > 0:
-            node, depth = frontier.popleft()
-            if node == goal:
-                return node, num_of_visited, len(explored), max_depth
-            explored.add(node)
-            for neighbour in node.get_neighbours(order):
+            index = frontier.popleft()
+            key = arena.keys[index]
+            if key == goal:
+                return arena.materialise(index, state), num_of_visited, len(explored), max_depth
+            explored.add(key)
+            if limits is not None:
+                limits.check(num_of_visited, len(explored), max_depth, len(frontier))
+
+            blank = arena.blanks[index]
+            depth = arena.depths[index] + 1
+            pruning_state = LAST_OPERATOR_TO_STATE_MAP.get(arena.operators[index], START)
+            for operator, target, _ in moves[pruning_state][blank]:
+                tile = (key >> (target * bits)) & mask
+                neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
                 if neighbour not in explored:
-                    frontier.append((neighbour, depth + 1))
+                    frontier.append(arena.add(neighbour, target, index, operator, depth))
                     num_of_visited += 1
-                    if depth + 1 > max_depth:
-                        max_depth = depth + 1
+                    if depth > max_depth:
+                        max_depth = depth
 
         return None, num_of_visited, len(explored), max_depth
+
+
+class BidirectionalBFSSolver(Solver):
+    @staticmethod
+    def solve(state: State, order: str, limits: SearchLimits = None) -> Tuple[Optional[State], int, int, int]:
+        Solver.solve(state, order)
+
+        packed = state.pack()
+        target = packed.get_target_state()
+        if packed.key == target.key:
+            return state, 1, 0, 0
+
+        bits = packed.bits
+        mask = (1 << bits) - 1
+        moves = REVERSAL_PRUNER.get_moves(state.geometry, order)
+
+        # Both maps point from a key to the arena node that holds its operator chain from the respective root
+        arena = NodeArena(len(state) * bits)
+        forward = {packed.key: arena.add(packed.key, packed.get_blank_position())}
+        backward = {target.key: arena.add(target.key, target.get_blank_position())}
+        forward_layer = [forward[packed.key]]
+        backward_layer = [backward[target.key]]
+        forward_depth = 0
+        backward_depth = 0
+        num_of_visited = 2
+        num_of_explored = 0
+
+        while len(forward_layer) > 0 and len(backward_layer) > 0:
+            is_forward = len(forward_layer) <= len(backward_layer)
+            layer, seen, other = (forward_layer, forward, backward) if is_forward \
+                else (backward_layer, backward, forward)
+
+            next_layer = []
+            for index in layer:
+                num_of_explored += 1
+                if limits is not None:
+                    limits.check(num_of_visited, num_of_explored, max(forward_depth, backward_depth),
+                                 len(layer) + len(next_layer))
+                key = arena.keys[index]
+                blank = arena.blanks[index]
+                depth = arena.depths[index] + 1
+                pruning_state = LAST_OPERATOR_TO_STATE_MAP.get(arena.operators[index], START)
+                for operator, new_blank, _ in moves[pruning_state][blank]:
+                    tile = (key >> (new_blank * bits)) & mask
+                    neighbour = key + (tile << (blank * bits)) - (tile << (new_blank * bits))
+                    if neighbour in seen:
+                        continue
+                    num_of_visited += 1
+                    neighbour_index = arena.add(neighbour, new_blank, index, operator, depth)
+                    if neighbour in other:
+                        if is_forward:
+                            forward_index, backward_index = neighbour_index, other[neighbour]
+                        else:
+                            forward_index, backward_index = other[neighbour], neighbour_index
+                        max_depth = max(forward_depth, backward_depth) + 1
+                        return BidirectionalBFSSolver.splice(arena, forward_index, backward_index, state), \
+                            num_of_visited, num_of_explored, max_depth
+                    seen[neighbour] = neighbour_index
+                    next_layer.append(neighbour_index)
+
+            if is_forward:
+                forward_layer = next_layer
+                forward_depth += 1
+            else:
+                backward_layer = next_layer
+                backward_depth += 1
+
+        return None, num_of_visited, num_of_explored, max(forward_depth, backward_depth)
+
+    @staticmethod
+    def splice(arena: NodeArena, forward_index: int, backward_index: int, root: State) -> State:
+        # The backward chain leads from the goal to the meeting point, so it is replayed in reverse with the
+        # opposite operators on top of the forward chain
+        node = arena.materialise(forward_index, root)
+        for operator in reversed(arena.get_operators(backward_index)):
+            node = node.move(State.DIRECTION_TO_OPPOSITE_MAP[operator])
+        return node
+
+
+class FrontierBFSSolver(Solver):
+    # Every value of a layer holds the blank position and a bit for each operator that leads back to the previous
+    # layer. Sliding-tile graphs are undirected and bipartite, so a node's neighbours are all in the previous or the
+    # next layer, and all of the previous ones have marked their edges by the time the node is expanded. Hence only
+    # the current and the next layer have to be kept in memory.
+    USED_OPERATOR_BITS = 4
+
+    @staticmethod
+    def solve(state: State, order: str, limits: SearchLimits = None) -> Tuple[Optional[State], int, int, int]:
+        Solver.solve(state, order)
+
+        packed = state.pack()
+        target = packed.get_target_state()
+        start = (packed.key, packed.get_blank_position())
+        goal = (target.key, target.get_blank_position())
+        geometry = state.geometry
+
+        is_found, depth, num_of_visited, num_of_explored = \
+            FrontierBFSSolver.search(geometry, order, start, goal[0], limits)
+        if not is_found:
+            return None, num_of_visited, num_of_explored, depth
+
+        try:
+            operators = FrontierBFSSolver.find_path(geometry, order, start, goal, depth, limits)
+        except LimitReached as limit:
+            raise LimitReached(limit.reason, num_of_visited, num_of_explored, depth)
+
+        node = state
+        for operator in operators:
+            node = node.move(operator)
+        return node, num_of_visited, num_of_explored, depth
+
+    @staticmethod
+    def get_next_layer(geometry, order, layer, limits=None, stats=(0, 0, 0)):
+        # The limits are checked against the stats of the search so far plus the ones of this layer
+        num_of_visited, num_of_explored, depth = stats
+        bits = geometry.bits
+        mask = (1 << bits) - 1
+        used_bits = FrontierBFSSolver.USED_OPERATOR_BITS
+        moves = geometry.get_moves(order)
+        opposites = [OPERATORS.index(State.DIRECTION_TO_OPPOSITE_MAP[direction]) for direction in OPERATORS]
+
+        next_layer = {}
+        for explored, (key, value) in enumerate(layer.items()):
+            if limits is not None:
+                limits.check(num_of_visited + len(next_layer), num_of_explored + explored, depth,
+                             len(layer) + len(next_layer))
+            blank = value >> used_bits
+            for operator, target in moves[blank]:
+                if value & (1 << operator):
+                    continue
+                tile = (key >> (target * bits)) & mask
+                neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
+                used = 1 << opposites[operator]
+                neighbour_value = next_layer.get(neighbour)
+                if neighbour_value is None:
+                    next_layer[neighbour] = (target << used_bits) | used
+                else:
+                    next_layer[neighbour] = neighbour_value | used
+        return next_layer
+
+    @staticmethod
+    def get_layer(geometry, order, root, depth, limits=None):
+        # The states at exactly `depth` moves from the root, as keys mapped to their blank positions
+        key, blank = root
+        layer = {key: blank << FrontierBFSSolver.USED_OPERATOR_BITS}
+        for _ in range(depth):
+            layer = FrontierBFSSolver.get_next_layer(geometry, order, layer, limits)
+        return {key: value >> FrontierBFSSolver.USED_OPERATOR_BITS for key, value in layer.items()}
+
+    @staticmethod
+    def search(geometry, order, start, goal_key, limits=None):
+        key, blank = start
+        layer = {key: blank << FrontierBFSSolver.USED_OPERATOR_BITS}
+        depth = 0
+        num_of_visited = 1
+        num_of_explored = 0
+
+        while len(layer) > 0:
+            if goal_key in layer:
+                return True, depth, num_of_visited, num_of_explored
+            next_layer = FrontierBFSSolver.get_next_layer(geometry, order, layer, limits,
+                                                          (num_of_visited, num_of_explored, depth))
+            num_of_explored += len(layer)
+            layer = next_layer
+            if len(layer) > 0:
+                num_of_visited += len(layer)
+                depth += 1
+
+        return False, depth, num_of_visited, num_of_explored
+
+    @staticmethod
+    def find_path(geometry, order, start, goal, depth, limits=None):
+        # Divide and conquer: a state that is `half` moves from the start and `depth - half` moves from the goal lies
+        # on a shortest path, so both halves of the path can be found the same way
+        if depth == 0:
+            return []
+        if depth == 1:
+            bits = geometry.bits
+            key, blank = start
+            for direction, target in geometry.move_targets[blank].items():
+                tile = (key >> (target * bits)) & ((1 << bits) - 1)
+                if key + (tile << (blank * bits)) - (tile << (target * bits)) == goal[0]:
+                    return [direction]
+
+        half = depth // 2
+        forward = FrontierBFSSolver.get_layer(geometry, order, start, half, limits)
+        backward = FrontierBFSSolver.get_layer(geometry, order, goal, depth - half, limits)
+        middle = next(key for key in forward if key in backward)
+        return FrontierBFSSolver.find_path(geometry, order, start, (middle, forward[middle]), half, limits) \
+            + FrontierBFSSolver.find_path(geometry, order, (middle, forward[middle]), goal, depth - half, limits)
@@ -0,0 +1,299 @@
+from collections import deque
+from typing import Generator, List, Optional, Tuple
+
+from a_star import AStarSolver, manhattan_distance
+from limits import SearchLimits
+from solver import collect_moves, get_operators
+from state import State, Direction
+
+# The part of the board left once every other row and column has been placed is solved optimally by A*
+MAX_CORE_SIZE = 3
+
+
+class Decomposition:
+    # A mutable copy of a board that records every move of the blank. Cells marked as fixed hold placed tiles that
+    # the blank must not move any more.
+    def __init__(self, state: State):
+        self.width = state.width
+        self.height = state.height
+        self.geometry = state.geometry
+        self.board = list(state.board)
+        self.positions = [0] * len(self.board)
+        for index, value in enumerate(self.board):
+            self.positions[value] = index
+        self.blank = self.positions[0]
+        self.fixed = bytearray(len(self.board))
+        self.moves = []
+        # The direction of a move from the difference of the two blank positions
+        self.offsets = {1: Direction.RIGHT, -1: Direction.LEFT, self.width: Direction.DOWN, -self.width: Direction.UP} \
+            if self.width > 1 else {1: Direction.DOWN, -1: Direction.UP}
+
+    def move_to(self, index):
+        # Moves the blank to an adjacent cell
+        blank = self.blank
+        tile = self.board[index]
+        self.board[blank] = tile
+        self.positions[tile] = blank
+        self.board[index] = 0
+        self.moves.append(self.offsets[index - blank])
+        self.blank = index
+
+    def move(self, direction: Direction):
+        self.move_to(self.geometry.move_targets[self.blank][direction])
+
+    def walk(self, path):
+        for index in path:
+            self.move_to(index)
+
+    def get_straight_path(self, start, end, horizontal_first):
+        width = self.width
+        row, col = divmod(start, width)
+        end_row, end_col = divmod(end, width)
+        path = []
+        for horizontal in (horizontal_first, not horizontal_first):
+            if horizontal:
+                step = 1 if end_col > col else -1
+                path.extend(row * width + c for c in range(col + step, end_col + step, step) if col != end_col)
+                col = end_col
+            else:
+                step = 1 if end_row > row else -1
+                path.extend(r * width + col for r in range(row + step, end_row + step, step) if row != end_row)
+                row = end_row
+        return path
+
+    def search_path(self, start, end, avoid, rows, cols):
+        # Breadth-first search for the blank inside the given ranges of rows and columns
+        width = self.width
+        parents = {start: None}
+        frontier = deque([start])
+        while len(frontier) > 0:
+            index = frontier.popleft()
+            if index == end:
+                path = []
+                while index != start:
+                    path.append(index)
+                    index = parents[index]
+                path.reverse()
+                return path
+            for neighbour in self.geometry.move_targets[index].values():
+                row, col = divmod(neighbour, width)
+                if neighbour in parents or self.fixed[neighbour] or neighbour == avoid \
+                        or row not in rows or col not in cols:
+                    continue
+                parents[neighbour] = index
+                frontier.append(neighbour)
+        return None
+
+    def get_path(self, start, end, avoid=-1) -> Optional[list]:
+        # The cells the blank passes through to reach `end` without moving the tile at `avoid` or any fixed tile.
+        # Either of the two L-shaped paths is usually free, otherwise the detour is searched for close to both ends
+        # first and on the whole board last.
+        for horizontal_first in (True, False):
+            path = self.get_straight_path(start, end, horizontal_first)
+            if all(not self.fixed[index] and index != avoid for index in path):
+                return path
+
+        width = self.width
+        row, col = divmod(start, width)
+        end_row, end_col = divmod(end, width)
+        if start + end == 2 * avoid and abs(start - end) in (2, 2 * width):
+            # Going around the tile from behind it to the front, which happens at every step of a moving tile
+            sides = ((1, col + 1 < width), (-1, col > 0)) if col == end_col \
+                else ((width, row + 1 < self.height), (-width, row > 0))
+            for side, is_inside in sides:
+                path = [start + side, avoid + side, end + side, end]
+                if is_inside and not (self.fixed[path[0]] or self.fixed[path[1]] or self.fixed[path[2]]):
+                    return path
+
+        rows = range(max(0, min(row, end_row) - 1), min(self.height, max(row, end_row) + 2))
+        cols = range(max(0, min(col, end_col) - 1), min(self.width, max(col, end_col) + 2))
+        path = self.search_path(start, end, avoid, rows, cols)
+        if path is None:
+            path = self.search_path(start, end, avoid, range(self.height), range(self.width))
+        return path
+
+    def move_tile(self, tile, end, vertical_first=False):
+        # Moves the tile one cell at a time towards `end`, by bringing the blank in front of it and swapping them.
+        # The blank is left behind the tile, so turning takes 3 moves against 5 for a straight step, and the tile
+        # goes diagonally while it can.
+        width = self.width
+        position = self.positions[tile]
+        end_row, end_col = divmod(end, width)
+        while position != end:
+            row, col = divmod(position, width)
+            horizontal = position + (1 if end_col > col else -1) if end_col != col else None
+            vertical = position + (width if end_row > row else -width) if end_row != row else None
+            for step in ((vertical, horizontal) if vertical_first else (horizontal, vertical)):
+                if step is None or self.fixed[step]:
+                    continue
+                path = self.get_path(self.blank, step, position)
+                if path is not None:
+                    break
+            else:
+                raise Exception(f"Cannot move tile {tile}")
+            self.walk(path)
+            self.move_to(position)
+            vertical_first = step == horizontal
+            position = step
+
+    def place_last_two(self, first, second, window, parking):
+        # The last two tiles of a line cannot be placed one after the other. Both are brought into a window of 6
+        # cells next to their goals and then arranged by a breadth-first search over the positions of the two tiles
+        # and the blank in the window, where every other tile is interchangeable.
+        first_end, second_end = first - 1, second - 1
+        if self.positions[first] == first_end and self.positions[second] == second_end:
+            self.fixed[first_end] = self.fixed[second_end] = 1
+            return
+
+        self.move_tile(first, window[0], parking[1])
+        self.fixed[window[0]] = 1
+        if self.positions[second] not in window:
+            self.move_tile(second, parking[0], parking[1])
+        self.fixed[window[0]] = 0
+
+        # The blank joins them in the window without moving either of them
+        self.fixed[self.positions[first]] = self.fixed[self.positions[second]] = 1
+        for free in window:
+            path = None if self.fixed[free] else self.get_path(self.blank, free)
+            if path is not None:
+                break
+        self.fixed[self.positions[first]] = self.fixed[self.positions[second]] = 0
+        self.walk(path)
+
+        start = (self.positions[first], self.positions[second], self.blank)
+        parents = {start: None}
+        frontier = deque([start])
+        while len(frontier) > 0:
+            config = frontier.popleft()
+            first_position, second_position, blank = config
+            if first_position == first_end and second_position == second_end:
+                break
+            for neighbour in self.geometry.move_targets[blank].values():
+                if neighbour not in window:
+                    continue
+                next_config = (blank if neighbour == first_position else first_position,
+                               blank if neighbour == second_position else second_position, neighbour)
+                if next_config not in parents:
+                    parents[next_config] = config
+                    frontier.append(next_config)
+
+        path = []
+        while parents[config] is not None:
+            path.append(config[2])
+            config = parents[config]
+        self.walk(reversed(path))
+        self.fixed[first_end] = self.fixed[second_end] = 1
+
+    def place_row(self, row, left):
+        # Places the tiles of the row from `left` to the right edge, the rows below it have to be free. Yields after
+        # every tile that has been placed for good.
+        width = self.width
+        for col in range(left, width - 2):
+            tile = row * width + col + 1
+            self.move_tile(tile, tile - 1)
+            self.fixed[tile - 1] = 1
+            yield
+
+        corner = row * width + width - 1
+        window = [corner, corner - 1, corner + width, corner + width - 1, corner + 2 * width, corner + 2 * width - 1]
+        self.place_last_two(corner, corner + 1, window, (corner + 2 * width, False))
+        yield
+
+    def place_column(self, col, top):
+        # Places the tiles of the column from `top` to the bottom edge, the columns to its right have to be free
+        width = self.width
+        for row in range(top, self.height - 2):
+            tile = row * width + col + 1
+            self.move_tile(tile, tile - 1, True)
+            self.fixed[tile - 1] = 1
+            yield
+
+        corner = (self.height - 1) * width + col
+        window = [corner, corner - width, corner + 1, corner - width + 1, corner + 2, corner - width + 2]
+        self.place_last_two(corner - width + 1, corner + 1, window, (corner + 2, True))
+        yield
+
+    def take_moves(self):
+        # The moves made since the last call
+        moves = self.moves
+        self.moves = []
+        return moves
+
+    def get_core(self, top, left) -> State:
+        # The unsolved bottom right part of the board as a puzzle of its own
+        width = self.width
+        core_width = width - left
+        core = []
+        for row in range(top, self.height):
+            line = []
+            for col in range(left, width):
+                value = self.board[row * width + col]
+                if value != 0:
+                    goal_row, goal_col = divmod(value - 1, width)
+                    value = (goal_row - top) * core_width + goal_col - left + 1
+                line.append(value)
+            core.append(line)
+        return State(core)
+
+
+class DecompositionSolver:
+    @staticmethod
+    def iter_moves(state, heuristic=manhattan_distance, limits: SearchLimits = None) \
+            -> Generator[List[Direction], None, Tuple[bool, int, int, int]]:
+        # Places the top row or the left column of the unsolved part of the board, whichever is longer, until at
+        # most 3x3 tiles are left, which are solved optimally. The solution is short but not optimal, and the moves
+        # that place a tile are yielded as soon as it is in place, so only a batch of them is held in memory at once.
+        if not state.is_solvable():
+            raise Exception("Not solvable")
+
+        decomposition = Decomposition(state)
+        num_of_moves = 0
+        top, left = 0, 0
+        while True:
+            height, width = state.height - top, state.width - left
+            if height > MAX_CORE_SIZE and width >= 2 and (height >= width or width <= MAX_CORE_SIZE):
+                placements = decomposition.place_row(top, left)
+                top += 1
+            elif width > MAX_CORE_SIZE and height >= 2:
+                placements = decomposition.place_column(left, top)
+                left += 1
+            else:
+                break
+            for _ in placements:
+                moves = decomposition.take_moves()
+                num_of_moves += len(moves)
+                if limits is not None:
+                    limits.check(num_of_moves + 1, num_of_moves, num_of_moves)
+                yield moves
+
+        solved, num_of_visited, num_of_explored, _ = AStarSolver.solve(decomposition.get_core(top, left), heuristic,
+                                                                       limits=limits)
+        if solved is None:
+            # Boards one tile wide pass the parity check, yet most of them cannot be solved
+            return False, num_of_moves + num_of_visited, num_of_moves + num_of_explored, num_of_moves
+        for operator in get_operators(solved):
+            decomposition.move(operator)
+        moves = decomposition.take_moves()
+        yield moves
+
+        num_of_visited += num_of_moves
+        num_of_explored += num_of_moves
+        num_of_moves += len(moves)
+        return True, num_of_visited, num_of_explored, num_of_moves
+
+    @staticmethod
+    def get_moves(state, heuristic=manhattan_distance, limits: SearchLimits = None) \
+            -> Tuple[Optional[List[Direction]], int, int, int]:
+        # The whole solution as a list of moves, which unlike a chain of states takes little memory on large boards
+        return collect_moves(DecompositionSolver.iter_moves(state, heuristic, limits))
+
+    @staticmethod
+    def solve(state, heuristic=manhattan_distance, limits: SearchLimits = None) \
+            -> Tuple[Optional[State], int, int, int]:
+        moves, num_of_visited, num_of_explored, max_depth = DecompositionSolver.get_moves(state, heuristic, limits)
+        if moves is None:
+            return None, num_of_visited, num_of_explored, max_depth
+        node = state
+        for direction in moves:
+            node = node.move(direction)
+        return node, num_of_visited, num_of_explored, max_depth
@@ -1,42 +1,123 @@
 from typing import Optional, Tuple
 
+from arena import NodeArena
+from limits import SearchLimits
+from pruning import REVERSAL_PRUNER, LAST_OPERATOR_TO_STATE_MAP, START
 from solver import Solver
 from state import State
+from transposition_table import TranspositionTable, DEFAULT_CAPACITY
 
 
 class DFSSolver(Solver):
     @staticmethod
-    def solve(state: State, order: str, depth_limit=20) -> Tuple[Optional[State], int, int, int]:
+    def solve(state: State, order: str, depth_limit=20, limits: SearchLimits = None) \
+            -> Tuple[Optional[State], int, int, int]:
         Solver.solve(state, order)
 
-        goal = state.get_target_state()
-        stack = [(state, 0)]
+        packed = state.pack()
+        goal = packed.get_target_state().key
+        bits = packed.bits
+        mask = (1 << bits) - 1
+        moves = REVERSAL_PRUNER.get_moves(state.geometry, order)
+
+        arena = NodeArena(len(state) * bits)
+        stack = [arena.add(packed.key, packed.get_blank_position())]
         explored = set()
         node_to_depth_map = dict()
         num_of_visited = 1
         max_depth = 0
 
         while len(stack) > 0:
-            node, depth = stack.pop()
+            index = stack.pop()
+            # Nodes are pushed in the order they are added to the arena, so nothing past the popped node is still
+            # on the stack or an ancestor of a node on the stack
+            arena.truncate(index + 1)
+            key = arena.keys[index]
+            depth = arena.depths[index]
 
-            if node in explored and node_to_depth_map[node] > depth:
-                explored.remove(node)
+            if key in explored and node_to_depth_map[key] > depth:
+                explored.remove(key)
 
-            if node not in explored:
-                if node == goal:
-                    return node, num_of_visited, len(explored), max_depth
+            if key not in explored:
+                if key == goal:
+                    return arena.materialise(index, state), num_of_visited, len(explored), max_depth
                 if depth >= depth_limit:
                     continue
 
-                explored.add(node)
-                node_to_depth_map[node] = depth
+                explored.add(key)
+                node_to_depth_map[key] = depth
+                if limits is not None:
+                    limits.check(num_of_visited, len(explored), max_depth, len(stack))
 
-                for neighbour in reversed(node.get_neighbours(order)):
+                blank = arena.blanks[index]
+                pruning_state = LAST_OPERATOR_TO_STATE_MAP.get(arena.operators[index], START)
+                for operator, target, _ in reversed(moves[pruning_state][blank]):
+                    tile = (key >> (target * bits)) & mask
+                    neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
                     if neighbour not in explored:
                         num_of_visited += 1
 
-                    stack.append((neighbour, depth + 1))
+                    stack.append(arena.add(neighbour, target, index, operator, depth + 1))
                     if depth + 1 > max_depth:
                         max_depth = depth + 1
 
         return None, num_of_visited, len(explored), max_depth
+
+
+class IterativeDeepeningDFSSolver(Solver):
+    @staticmethod
+    def solve(state: State, order: str, capacity=DEFAULT_CAPACITY, limits: SearchLimits = None) \
+            -> Tuple[Optional[State], int, int, int]:
+        Solver.solve(state, order)
+
+        packed = state.pack()
+        goal = packed.get_target_state().key
+        bits = packed.bits
+        mask = (1 << bits) - 1
+        moves = REVERSAL_PRUNER.get_moves(state.geometry, order)
+
+        arena = NodeArena(len(state) * bits)
+        root = arena.add(packed.key, packed.get_blank_position())
+        table = TranspositionTable(capacity)
+        num_of_visited = 1
+        num_of_explored = 0
+        max_depth = 0
+        depth_limit = 0
+
+        while True:
+            # Depths are only comparable within one iteration, so the table starts empty every time
+            table.clear()
+            stack = [root]
+            is_cut_off = False
+
+            while len(stack) > 0:
+                index = stack.pop()
+                arena.truncate(index + 1)
+                key = arena.keys[index]
+                depth = arena.depths[index]
+
+                if key == goal:
+                    return arena.materialise(index, state), num_of_visited, num_of_explored, max_depth
+                if depth >= depth_limit:
+                    is_cut_off = True
+                    continue
+                # A node reached before at the same or a smaller depth has had at least this much depth left
+                if not table.store(key, depth):
+                    continue
+
+                num_of_explored += 1
+                if limits is not None:
+                    limits.check(num_of_visited, num_of_explored, max_depth, len(stack))
+                blank = arena.blanks[index]
+                pruning_state = LAST_OPERATOR_TO_STATE_MAP.get(arena.operators[index], START)
+                for operator, target, _ in reversed(moves[pruning_state][blank]):
+                    tile = (key >> (target * bits)) & mask
+                    neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
+                    stack.append(arena.add(neighbour, target, index, operator, depth + 1))
+                    num_of_visited += 1
+                    if depth + 1 > max_depth:
+                        max_depth = depth + 1
+
+            if not is_cut_off:
+                return None, num_of_visited, num_of_explored, max_depth
+            depth_limit += 1
@@ -0,0 +1,141 @@
+import math
+import mmap
+import os
+import struct
+from typing import Optional, Tuple
+
+from limits import SearchLimits, CHECK_INTERVAL
+from pattern_database import DEFAULT_DIRECTORY
+from state import State, Geometry, OPERATORS, pack_board, unpack_board, rank_board
+
+MAGIC = b'TQDT'
+HEADER_FORMAT = '<4sHH'
+# Every entry holds the distance in the upper 6 bits and the operator of an optimal move in the lower 2 bits, so the
+# largest distance is 62 (enough for 2x5 and 3x4, which are at most 55 and 53 moves from the goal) and 0xFF marks
+# the permutations that cannot be reached
+UNKNOWN_ENTRY = 0xFF
+MAX_DISTANCE = (UNKNOWN_ENTRY >> 2) - 1
+MAX_TABLE_BOARD_SIZE = 12
+
+
+class DistanceTable:
+    def __init__(self, width, height, table, offset=0):
+        self.width = width
+        self.height = height
+        self.table = table
+        self.offset = offset
+
+    @staticmethod
+    def build(width, height, limits: SearchLimits = None):
+        # Retrograde breadth-first search from the goal state. A state is first reached from a neighbour one move
+        # closer to the goal, so the move back to that neighbour is optimal. Only the time, cancellation and memory
+        # limits apply.
+        size = width * height
+        if size > MAX_TABLE_BOARD_SIZE:
+            raise ValueError(f'Invalid board: Distance tables are limited to {MAX_TABLE_BOARD_SIZE} tiles')
+        if limits is not None:
+            limits.check_allocation(math.factorial(size))
+
+        geometry = Geometry.get(width, height)
+        bits = geometry.bits
+        mask = (1 << bits) - 1
+        moves = geometry.get_moves("LRUD")
+        opposites = [OPERATORS.index(State.DIRECTION_TO_OPPOSITE_MAP[direction]) for direction in OPERATORS]
+
+        table = bytearray([UNKNOWN_ENTRY]) * math.factorial(size)
+        goal = tuple(range(1, size)) + (0,)
+        table[rank_board(goal)] = 0
+        layer = [(pack_board(goal, bits), size - 1)]
+        distance = 0
+        num_of_expanded = 0
+
+        while len(layer) > 0:
+            distance += 1
+            next_layer = []
+            for key, blank in layer:
+                num_of_expanded += 1
+                if limits is not None and num_of_expanded % CHECK_INTERVAL == 0:
+                    limits.check_resources(0, 0, 0)
+                for operator, target in moves[blank]:
+                    tile = (key >> (target * bits)) & mask
+                    neighbour = key + (tile << (blank * bits)) - (tile << (target * bits))
+                    rank = rank_board(unpack_board(neighbour, size, bits))
+                    if table[rank] == UNKNOWN_ENTRY:
+                        if distance > MAX_DISTANCE:
+                            raise ValueError(f'Invalid board: Distances over {MAX_DISTANCE} do not fit in a table')
+                        table[rank] = (distance << 2) | opposites[operator]
+                        next_layer.append((neighbour, target))
+            layer = next_layer
+
+        return DistanceTable(width, height, table)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as file:
+            table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, width, height = struct.unpack_from(HEADER_FORMAT, table)
+        if magic != MAGIC:
+            raise ValueError(f'Invalid distance table file: {path}')
+        offset = struct.calcsize(HEADER_FORMAT)
+
+        if len(table) - offset != math.factorial(width * height):
+            raise ValueError(f'Invalid distance table file: {path}')
+        return DistanceTable(width, height, table, offset)
+
+    @staticmethod
+    def get_filename(width, height):
+        return f'distances_{width}x{height}.bin'
+
+    @staticmethod
+    def load_or_build(width, height, directory=DEFAULT_DIRECTORY, limits: SearchLimits = None):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, DistanceTable.get_filename(width, height))
+        if not os.path.exists(path):
+            DistanceTable.build(width, height, limits).save(path)
+        return DistanceTable.load(path)
+
+    def save(self, path):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(struct.pack(HEADER_FORMAT, MAGIC, self.width, self.height))
+            file.write(self.table[self.offset:])
+        os.replace(temp_path, path)
+
+    def get_entry(self, board):
+        return self.table[self.offset + rank_board(board)]
+
+    def get_distance(self, board):
+        entry = self.get_entry(board)
+        return None if entry == UNKNOWN_ENTRY else entry >> 2
+
+    def get_move(self, board):
+        entry = self.get_entry(board)
+        return None if entry == UNKNOWN_ENTRY or entry == 0 else OPERATORS[entry & 3]
+
+
+_default_tables = {}
+
+
+def get_default_table(width, height, directory=DEFAULT_DIRECTORY, limits: SearchLimits = None) -> DistanceTable:
+    if (width, height, directory) not in _default_tables:
+        _default_tables[(width, height, directory)] = DistanceTable.load_or_build(width, height, directory, limits)
+    return _default_tables[(width, height, directory)]
+
+
+class DistanceTableSolver:
+    @staticmethod
+    def solve(state, directory=DEFAULT_DIRECTORY, limits: SearchLimits = None) -> Tuple[Optional[State], int, int, int]:
+        if not state.is_solvable():
+            raise Exception("Not solvable")
+
+        # Follows the optimal moves stored in the table, one lookup per move of the solution
+        table = get_default_table(state.width, state.height, directory, limits)
+        distance = table.get_distance(state.board)
+        node = state
+        for depth in range(distance):
+            if limits is not None:
+                limits.check(depth + 1, depth, depth)
+            node = node.move(table.get_move(node.board))
+
+        return node, distance + 1, distance, distance
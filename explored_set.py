@@ -0,0 +1,63 @@
+import math
+
+from state import State, get_tile_bits, unpack_board, rank_board
+
+# 12! bits take 60 MB, while a set with all the states of a 3x4 board would take tens of gigabytes. Below 10 tiles
+# a set of every reachable state takes a few megabytes at most and hashing a key is several times faster than
+# ranking it, so the bitset is only worth it in between.
+MIN_BITSET_BOARD_SIZE = 10
+MAX_BITSET_BOARD_SIZE = 12
+# A key in a set takes about 100 bytes, so the keys are moved to the bitset once they would take more memory than it
+BYTES_PER_SET_KEY = 100
+
+
+class BitsetExploredSet:
+    # A set of packed board keys with one bit for every permutation of the board, indexed by its rank. The keys are
+    # kept in a set until there are enough of them to pay for allocating the bitset, which most searches never need.
+    def __init__(self, width, height):
+        self.size = width * height
+        self.bits = get_tile_bits(self.size)
+        self.bitset_length = (math.factorial(self.size) + 7) // 8
+        self.max_set_size = self.bitset_length // BYTES_PER_SET_KEY
+        self.keys = set()
+        self.bitset = None
+        self.count = 0
+
+    def get_rank(self, key):
+        return rank_board(unpack_board(key, self.size, self.bits))
+
+    def add(self, key):
+        if self.bitset is None:
+            self.keys.add(key)
+            self.count = len(self.keys)
+            if self.count > self.max_set_size:
+                self.allocate_bitset()
+            return
+
+        rank = self.get_rank(key)
+        bit = 1 << (rank & 7)
+        if not self.bitset[rank >> 3] & bit:
+            self.bitset[rank >> 3] |= bit
+            self.count += 1
+
+    def allocate_bitset(self):
+        self.bitset = bytearray(self.bitset_length)
+        for key in self.keys:
+            rank = self.get_rank(key)
+            self.bitset[rank >> 3] |= 1 << (rank & 7)
+        self.keys = None
+
+    def __contains__(self, key):
+        if self.bitset is None:
+            return key in self.keys
+        rank = self.get_rank(key)
+        return self.bitset[rank >> 3] & (1 << (rank & 7)) != 0
+
+    def __len__(self):
+        return self.count
+
+
+def create_explored_set(state: State):
+    if MIN_BITSET_BOARD_SIZE <= len(state) <= MAX_BITSET_BOARD_SIZE:
+        return BitsetExploredSet(state.width, state.height)
+    return set()
@@ -0,0 +1,145 @@
+import heapq
+import os
+import sys
+
+from state import Geometry, pack_board
+
+DEFAULT_RUN_SIZE = 1 << 20
+READ_BUFFER_SIZE = 1 << 16
+
+
+def subtract(keys, *excluded):
+    # Removes the duplicates of a sorted iterable and the keys found in any of the other sorted iterables
+    excluded = heapq.merge(*excluded)
+    current = next(excluded, None)
+    previous = None
+    for key in keys:
+        if key == previous:
+            continue
+        previous = key
+        while current is not None and current < key:
+            current = next(excluded, None)
+        if key != current:
+            yield key
+
+
+class ExternalBFS:
+    # Breadth-first search that keeps every layer on disk as a sorted file of fixed-width big-endian keys. A layer
+    # is expanded into sorted runs of at most `run_size` keys, which are merged and stripped of the keys of the
+    # layer before the expanded one. That is enough, because the neighbours of a node are one move closer to or
+    # farther from the start, never as far. A layer is renamed into place only once it is complete, so an
+    # interrupted search resumes from the last complete layer.
+    #
+    # If `tiles` is given, every other tile is replaced by the same placeholder, so the search runs over the states
+    # of a pattern and the layers give the pattern database with the blank position.
+    def __init__(self, width, height, directory, tiles=None, run_size=DEFAULT_RUN_SIZE):
+        self.geometry = Geometry.get(width, height)
+        self.directory = directory
+        self.run_size = run_size
+        self.key_bytes = (self.geometry.size * self.geometry.bits + 7) // 8
+
+        goal = list(range(1, self.geometry.size)) + [0]
+        if tiles is not None:
+            placeholder = min((tile for tile in goal if tile != 0 and tile not in tiles), default=0)
+            goal = [tile if tile == 0 or tile in tiles else placeholder for tile in goal]
+        self.start = pack_board(goal, self.geometry.bits)
+
+    def get_layer_path(self, depth):
+        return os.path.join(self.directory, f'layer_{depth:03d}.bin')
+
+    def read_keys(self, path):
+        key_bytes = self.key_bytes
+        with open(path, 'rb') as file:
+            while True:
+                buffer = file.read(READ_BUFFER_SIZE * key_bytes)
+                if len(buffer) == 0:
+                    break
+                for offset in range(0, len(buffer), key_bytes):
+                    yield int.from_bytes(buffer[offset:offset + key_bytes], 'big')
+
+    def read_layer(self, depth):
+        return self.read_keys(self.get_layer_path(depth))
+
+    def write_keys(self, path, keys):
+        # Writes to a temporary file first, so that a file with the final name is always complete
+        count = 0
+        with open(path + '.tmp', 'wb') as file:
+            buffer = bytearray()
+            for key in keys:
+                buffer += key.to_bytes(self.key_bytes, 'big')
+                count += 1
+                if len(buffer) >= READ_BUFFER_SIZE * self.key_bytes:
+                    file.write(buffer)
+                    buffer.clear()
+            file.write(buffer)
+        os.replace(path + '.tmp', path)
+        return count
+
+    def get_layer_size(self, depth):
+        return os.path.getsize(self.get_layer_path(depth)) // self.key_bytes
+
+    def get_neighbours(self, key):
+        bits = self.geometry.bits
+        mask = (1 << bits) - 1
+        blank = next(index for index in range(self.geometry.size) if (key >> (index * bits)) & mask == 0)
+        for target in self.geometry.move_targets[blank].values():
+            tile = (key >> (target * bits)) & mask
+            yield key + (tile << (blank * bits)) - (tile << (target * bits))
+
+    def expand(self, depth):
+        runs = []
+        buffer = []
+        for key in self.read_layer(depth):
+            buffer.extend(self.get_neighbours(key))
+            if len(buffer) >= self.run_size:
+                runs.append(self.write_run(depth, len(runs), buffer))
+                buffer = []
+        if len(buffer) > 0:
+            runs.append(self.write_run(depth, len(runs), buffer))
+
+        excluded = [self.read_layer(depth - 1)] if depth > 0 else []
+        count = self.write_keys(self.get_layer_path(depth + 1),
+                                subtract(heapq.merge(*[self.read_keys(run) for run in runs]), *excluded))
+        for run in runs:
+            os.remove(run)
+        return count
+
+    def write_run(self, depth, index, keys):
+        keys.sort()
+        path = os.path.join(self.directory, f'run_{depth + 1:03d}_{index:05d}.bin')
+        self.write_keys(path, subtract(keys))
+        return path
+
+    def run(self, max_depth=None):
+        # Returns the number of states at every depth, starting from the last complete layer found on disk
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            if name.startswith('run_') or name.endswith('.tmp'):
+                os.remove(os.path.join(self.directory, name))
+
+        if not os.path.exists(self.get_layer_path(0)):
+            self.write_keys(self.get_layer_path(0), [self.start])
+        elif next(self.read_layer(0)) != self.start:
+            raise ValueError(f'Invalid directory: {self.directory} holds the layers of another search')
+
+        histogram = [self.get_layer_size(0)]
+        while os.path.exists(self.get_layer_path(len(histogram))):
+            histogram.append(self.get_layer_size(len(histogram)))
+
+        while histogram[-1] > 0 and (max_depth is None or len(histogram) <= max_depth):
+            histogram.append(self.expand(len(histogram) - 1))
+
+        # The last layer of an exhausted search is empty
+        if histogram[-1] == 0:
+            histogram.pop()
+        return histogram if max_depth is None else histogram[:max_depth + 1]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (4, 5):
+        print('Usage: python external_bfs.py <width> <height> <directory> [max depth]')
+        exit(1)
+
+    search = ExternalBFS(int(sys.argv[1]), int(sys.argv[2]), sys.argv[3])
+    for depth, count in enumerate(search.run(int(sys.argv[4]) if len(sys.argv) == 5 else None)):
+        print(depth, count)
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# The clock, the cancel event and the memory usage are only looked at every this many checks
+CHECK_INTERVAL = 1024
+
+
+def get_resident_memory():
+    # Current resident set size in bytes, or the peak one where /proc is not available
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+
+
+class LimitReached(Exception):
+    # Raised by a solver that has been stopped by its limits, with the stats of the search up to that point
+    def __init__(self, reason, num_of_visited=0, num_of_explored=0, max_depth=0):
+        super().__init__(f'Limit reached: {reason}')
+        self.reason = reason
+        self.num_of_visited = num_of_visited
+        self.num_of_explored = num_of_explored
+        self.max_depth = max_depth
+
+    def get_stats(self):
+        return self.num_of_visited, self.num_of_explored, self.max_depth
+
+
+class SearchLimits:
+    # `max_memory` is in bytes, `timeout` in seconds from now and `deadline` a time.monotonic() value. Any limit
+    # that is None is not checked.
+    def __init__(self, max_nodes=None, max_frontier=None, max_memory=None, timeout=None, deadline=None,
+                 cancel_event=None):
+        self.max_nodes = max_nodes
+        self.max_frontier = max_frontier
+        self.max_memory = max_memory
+        self.deadline = deadline if timeout is None else time.monotonic() + timeout
+        self.cancel_event = cancel_event
+        self.num_of_checks = 0
+
+    def check(self, num_of_visited, num_of_explored, max_depth, frontier_size=0):
+        if self.max_nodes is not None and num_of_visited > self.max_nodes:
+            raise LimitReached('nodes', num_of_visited, num_of_explored, max_depth)
+        if self.max_frontier is not None and frontier_size > self.max_frontier:
+            raise LimitReached('frontier', num_of_visited, num_of_explored, max_depth)
+
+        self.num_of_checks += 1
+        if self.num_of_checks % CHECK_INTERVAL == 0:
+            self.check_resources(num_of_visited, num_of_explored, max_depth)
+
+    def check_allocation(self, num_of_bytes):
+        # Called before a table of the given size is allocated, so that the memory limit is not overshot at once
+        if self.max_memory is not None and get_resident_memory() + num_of_bytes > self.max_memory:
+            raise LimitReached('memory')
+
+    def check_resources(self, num_of_visited, num_of_explored, max_depth):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise LimitReached('timeout', num_of_visited, num_of_explored, max_depth)
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise LimitReached('cancelled', num_of_visited, num_of_explored, max_depth)
+        if self.max_memory is not None and get_resident_memory() > self.max_memory:
+            raise LimitReached('memory', num_of_visited, num_of_explored, max_depth)
@@ -1,10 +1,67 @@
+import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from timeit import default_timer as timer
 
+from limits import SearchLimits, LimitReached
+from solver import collect_moves, get_operators, iter_moves
 from state import State
-from bfs import BFSSolver
-from dfs import DFSSolver
-from a_star import AStarSolver, hamming_distance, manhattan_distance
+from beam_search import BeamSearchSolver
+from decomposition import DecompositionSolver
+from bfs import BFSSolver, BidirectionalBFSSolver, FrontierBFSSolver
+from dfs import DFSSolver, IterativeDeepeningDFSSolver
+from distance_table import DistanceTableSolver
+from a_star import AStarSolver, IDAStarSolver, WeightedAStarSolver, AnytimeAStarSolver, hamming_distance, \
+    manhattan_distance, linear_conflict, walking_distance
+from pattern_database import pattern_database_distance
+from parallel_search import ParallelAStarSolver, ParallelIDAStarSolver
+
+STRATEGY_TO_SOLVER_MAP = {
+    'bfs': BFSSolver,
+    'bbfs': BidirectionalBFSSolver,
+    'fbfs': FrontierBFSSolver,
+    'dfs': DFSSolver,
+    'iddfs': IterativeDeepeningDFSSolver,
+    'astr': AStarSolver,
+    'idastr': IDAStarSolver,
+    'wastr': WeightedAStarSolver,
+    'arastr': AnytimeAStarSolver,
+    'beam': BeamSearchSolver,
+    'decomp': DecompositionSolver,
+    'pastr': ParallelAStarSolver,
+    'pidastr': ParallelIDAStarSolver,
+    'table': DistanceTableSolver
+}
+
+PARAMETER_TO_HEURISTIC_MAP = {
+    'hamm': hamming_distance,
+    'manh': manhattan_distance,
+    'linc': linear_conflict,
+    'walk': walking_distance,
+    'pdb': pattern_database_distance
+}
+
+# Strategies whose parameter is `<heuristic>:<number>[:<number> ...]`, e.g. the weight and the deadline
+NUMERIC_PARAMETER_STRATEGIES = {'wastr', 'arastr', 'beam'}
+
+# Options that come before the strategy or `batch`, as (name of the SearchLimits argument, parser)
+LIMIT_OPTIONS = {
+    '--timeout': ('timeout', float),
+    '--max-nodes': ('max_nodes', int),
+    '--max-memory': ('max_memory', lambda megabytes: int(float(megabytes) * (1 << 20)))
+}
+
+STREAM_OPTION = '--stream'
+STANDARD_OUTPUT = '-'
+
+NO_SOLUTION_STATUS = '-1'
+LIMIT_REACHED_STATUS = '-2'
+
+RESEARCH_ORDERS = ['RDUL', 'RDLU', 'DRUL', 'DRLU', 'LUDR', 'LURD', 'ULDR', 'ULRD']
+RESEARCH_COMBINATIONS = [('bfs', order) for order in RESEARCH_ORDERS] \
+    + [('dfs', order) for order in RESEARCH_ORDERS] \
+    + [('astr', 'hamm'), ('astr', 'manh')]
 
 
 def read_puzzle_file(filename) -> State:
@@ -17,57 +74,249 @@ def read_puzzle_file(filename) -> State:
         return State(puzzle)
 
 
-if __name__ == '__main__':
-    if len(sys.argv) != 6:
-        exit(1)
+def get_solver(strategy):
+    return STRATEGY_TO_SOLVER_MAP.get(strategy, AStarSolver)
 
-    strategy = sys.argv[1]
-    strategy_param = sys.argv[2]
-    puzzle_file = sys.argv[3]
-    solution_file = sys.argv[4]
-    stats_file = sys.argv[5]
-
-    solver = None
-    if strategy == 'bfs':
-        solver = BFSSolver
-    elif strategy == 'dfs':
-        solver = DFSSolver
-    else:
-        solver = AStarSolver
 
-    param = None
-    if strategy_param == 'hamm':
-        param = hamming_distance
-    elif strategy_param == 'manh':
-        param = manhattan_distance
-    else:
-        param = strategy_param
+def get_parameter(strategy_param):
+    return PARAMETER_TO_HEURISTIC_MAP.get(strategy_param, strategy_param)
+
+
+def get_parameters(strategy, strategy_param):
+    if strategy not in NUMERIC_PARAMETER_STRATEGIES:
+        return [get_parameter(strategy_param)]
+    heuristic, *values = strategy_param.split(':')
+    return [get_parameter(heuristic)] + [float(value) for value in values]
+
+
+def solve_puzzle_file(strategy, strategy_param, puzzle_file, limits: SearchLimits = None):
+    # The solution is None when there is none and the LimitReached exception when the search has been stopped
+    solver = get_solver(strategy)
 
     try:
+        params = get_parameters(strategy, strategy_param)
         state = read_puzzle_file(puzzle_file)
         start = timer()
-        solved, num_of_visited, num_of_explored, max_depth = solver.solve(state, param)
+        operators, num_of_visited, num_of_explored, max_depth = \
+            collect_moves(iter_moves(solver, state, *params, limits=limits))
         end = timer()
         exec_time = end - start
+    except LimitReached as limit:
+        num_of_visited, num_of_explored, max_depth = limit.get_stats()
+        exec_time = timer() - start
+        return limit, num_of_visited, num_of_explored, max_depth, exec_time
+    except Exception:
+        operators = None
+        num_of_visited = 0
+        num_of_explored = 0
+        max_depth = 0
+        exec_time = 0
+
+    solution = None
+    if operators is not None:
+        solution = ''.join(operator.value for operator in operators)
+
+    return solution, num_of_visited, num_of_explored, max_depth, exec_time
+
+
+def write_moves(output, batches):
+    # Writes every batch of moves as soon as it is yielded, returns all the moves and what the generator returns
+    written = []
+    while True:
+        try:
+            batch = next(batches)
+        except StopIteration as stop:
+            return ''.join(written), stop.value
+        moves = ''.join(operator.value for operator in batch)
+        output.write(moves)
+        output.flush()
+        written.append(moves)
+
+
+def stream_puzzle_file(strategy, strategy_param, puzzle_file, output, limits: SearchLimits = None):
+    # Like solve_puzzle_file, but the moves are written to `output` as soon as the solver commits to them. Anytime
+    # solvers write every better solution on a line of its own instead.
+    solver = get_solver(strategy)
+    solution = None
+
+    try:
+        params = get_parameters(strategy, strategy_param)
+        state = read_puzzle_file(puzzle_file)
+        start = timer()
+        if hasattr(solver, 'iter_solutions'):
+            solutions = solver.iter_solutions(state, *params, limits=limits)
+            while True:
+                try:
+                    solved, _ = next(solutions)
+                except StopIteration as stop:
+                    num_of_visited, num_of_explored, max_depth = stop.value
+                    break
+                solution = ''.join(operator.value for operator in get_operators(solved))
+                output.write(solution + '\n')
+                output.flush()
+        else:
+            try:
+                moves, (is_solved, num_of_visited, num_of_explored, max_depth) = \
+                    write_moves(output, iter_moves(solver, state, *params, limits=limits))
+            finally:
+                output.write('\n')
+            solution = moves if is_solved else None
+        exec_time = timer() - start
+    except LimitReached as limit:
+        num_of_visited, num_of_explored, max_depth = limit.get_stats()
+        exec_time = timer() - start
+        return limit, num_of_visited, num_of_explored, max_depth, exec_time
     except Exception:
-        solved = None
+        solution = None
         num_of_visited = 0
         num_of_explored = 0
         max_depth = 0
         exec_time = 0
 
-    solution_output = '-1'
-    solution = []
-    if solved is not None:
-        while solved.parent is not None:
-            solution.append(solved.operator.value)
-            solved = solved.parent
+    return solution, num_of_visited, num_of_explored, max_depth, exec_time
+
+
+def get_status(solution):
+    if isinstance(solution, LimitReached):
+        return LIMIT_REACHED_STATUS
+    return str(len(solution)) if solution is not None else NO_SOLUTION_STATUS
+
+
+def get_stats(solution, num_of_visited, num_of_explored, max_depth, exec_time):
+    return [get_status(solution), str(num_of_visited), str(num_of_explored), str(max_depth),
+            '%.3f' % (exec_time * 1000)]
 
-        solution_output = str(len(solution)) + '\n' + ''.join(reversed(solution))
+
+def write_solution_file(solution_file, solution):
+    solution_output = get_status(solution)
+    if isinstance(solution, str):
+        solution_output += '\n' + solution
     with open(solution_file, 'w') as file:
         file.write(solution_output)
 
+
+def write_stats_file(stats_file, stats):
     with open(stats_file, 'w') as file:
-        file.write((str(len(solution)) if solved is not None else '-1')
-                   + f'\n{num_of_visited}\n{num_of_explored}\n{max_depth}\n'
-                   + '%.3f' % (exec_time * 1000))
+        file.write('\n'.join(stats))
+
+
+def run(strategy, strategy_param, puzzle_file, solution_file, stats_file, limits: SearchLimits = None,
+        stream=False):
+    if stream:
+        # The moves come first and the status last, `-` streams them to the standard output
+        output = sys.stdout if solution_file == STANDARD_OUTPUT else open(solution_file, 'w')
+        try:
+            solution, *result = stream_puzzle_file(strategy, strategy_param, puzzle_file, output, limits)
+            output.write(get_status(solution) + '\n')
+        finally:
+            if output is not sys.stdout:
+                output.close()
+    else:
+        solution, *result = solve_puzzle_file(strategy, strategy_param, puzzle_file, limits)
+        write_solution_file(solution_file, solution)
+    stats = get_stats(solution, *result)
+    write_stats_file(stats_file, stats)
+    return stats
+
+
+def get_puzzle_files(puzzles):
+    if os.path.isdir(puzzles):
+        return [os.path.join(puzzles, name) for name in sorted(os.listdir(puzzles))
+                if os.path.isfile(os.path.join(puzzles, name))]
+
+    # A manifest lists one puzzle file per line, relative to the manifest itself
+    with open(puzzles, 'r') as file:
+        directory = os.path.dirname(puzzles)
+        return [os.path.join(directory, line.strip()) for line in file if line.strip()]
+
+
+def get_puzzle_id(puzzle_file):
+    # Puzzle files are expected to be named like `4x4_07_00212.txt`, i.e. `<size>_<min moves>_<id>`
+    name = os.path.splitext(os.path.basename(puzzle_file))[0]
+    match = re.search(r'_(\d+)_(\d+)$', name)
+    if match is None:
+        return '-1', name
+    return str(int(match.group(1))), str(int(match.group(2)))
+
+
+def get_limits(limit_options):
+    # A new SearchLimits for every puzzle, so that the timeout starts with its search
+    return SearchLimits(**limit_options) if limit_options else None
+
+
+def run_batch_job(job):
+    strategy, strategy_param, puzzle_file, output_directory, limit_options = job
+    name = os.path.splitext(os.path.basename(puzzle_file))[0]
+    prefix = os.path.join(output_directory, f"{name}_{strategy}_{strategy_param.lower().replace(':', '-')}")
+
+    stats = run(strategy, strategy_param, puzzle_file, prefix + '_sol.txt', prefix + '_stats.txt',
+                get_limits(limit_options))
+    min_moves, puzzle_id = get_puzzle_id(puzzle_file)
+    return ' '.join([min_moves, puzzle_id, strategy, strategy_param.lower()] + stats)
+
+
+def run_batch(puzzles, output_directory, combined_stats_file, combinations=None, workers=None, limit_options=None):
+    if combinations is None:
+        combinations = RESEARCH_COMBINATIONS
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    os.makedirs(output_directory, exist_ok=True)
+    jobs = [(strategy, strategy_param, puzzle_file, output_directory, limit_options)
+            for puzzle_file in get_puzzle_files(puzzles)
+            for strategy, strategy_param in combinations]
+
+    # Every worker process imports the solvers once and then handles many jobs
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        lines = list(executor.map(run_batch_job, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+
+    with open(combined_stats_file, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+    return lines
+
+
+def parse_batch_args(args):
+    workers = None
+    if len(args) >= 2 and args[0] == '--workers':
+        workers = int(args[1])
+        args = args[2:]
+    if len(args) < 3:
+        return None
+
+    combinations = [tuple(combination.split(':', 1)) for combination in args[3:]] or None
+    if combinations is not None and any(len(combination) != 2 for combination in combinations):
+        return None
+    return args[0], args[1], args[2], combinations, workers
+
+
+def parse_limit_args(args):
+    # Takes the limit options off the front of the arguments, returns None if one of them is invalid
+    limit_options = {}
+    while len(args) >= 2 and args[0] in LIMIT_OPTIONS:
+        name, parse = LIMIT_OPTIONS[args[0]]
+        try:
+            limit_options[name] = parse(args[1])
+        except ValueError:
+            return None
+        args = args[2:]
+    return limit_options, args
+
+
+if __name__ == '__main__':
+    stream = len(sys.argv) >= 2 and sys.argv[1] == STREAM_OPTION
+    limit_args = parse_limit_args(sys.argv[2:] if stream else sys.argv[1:])
+    if limit_args is None:
+        exit(1)
+    limit_options, args = limit_args
+
+    if len(args) >= 1 and args[0] == 'batch' and not stream:
+        batch_args = parse_batch_args(args[1:])
+        if batch_args is None:
+            exit(1)
+        run_batch(*batch_args, limit_options=limit_options)
+        exit(0)
+
+    if len(args) != 5:
+        exit(1)
+
+    run(*args, limits=get_limits(limit_options), stream=stream)
@@ -0,0 +1,416 @@
+import math
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, Tuple
+
+from a_star import manhattan_distance, get_initial_heuristic_value, prepare_heuristic
+from limits import SearchLimits, LimitReached
+from priority_queue import BucketQueue
+from pruning import REVERSAL_PRUNER, LAST_OPERATOR_TO_STATE_MAP, START, get_learned_pruner
+from state import State, PackedState, OPERATORS
+
+NO_SOLUTION = 1 << 62
+BATCH_SIZE = 256
+EXPANSIONS_PER_ROUND = 512
+POLL_INTERVAL = 0.005
+SUBTREES_PER_WORKER = 8
+MAX_SPLIT_DEPTH = 12
+CANCEL_CHECK_INTERVAL = 1024
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+
+_cancel_event = None
+
+
+def get_owner(key, num_of_workers):
+    # The low bits of a key hold the tile in the first cell alone, so the key is mixed by Fibonacci hashing, 64 bits
+    # at a time, and the worker is picked by the high bits of the mix, which depend on every bit of the key
+    mixed = 0
+    while True:
+        mixed = ((mixed ^ (key & HASH_MASK)) * HASH_MULTIPLIER) & HASH_MASK
+        key >>= 64
+        if key == 0:
+            return (mixed * num_of_workers) >> 64
+
+
+def search_partition(index, width, height, goal, heuristic, inboxes, queries, results, incumbent, sent, received,
+                     idle, counters, stop):
+    # One worker of the hash-distributed A*: it owns the states whose key hashes to its index, keeps their open list
+    # and their best known cost, and sends the children owned by other workers to them in batches. Every message
+    # carries (key, blank, g, h, parent key, operator). The queries for the solution path come through a separate
+    # queue, which is only read once the search is over. The stats are published in `counters` after every round
+    # for the limits checked by the parent.
+    num_of_workers = len(inboxes)
+    packed = PackedState.from_key(0, width, height)
+    bits = packed.bits
+    mask = (1 << bits) - 1
+    moves = REVERSAL_PRUNER.get_moves(packed.geometry, "URDL")
+    delta = getattr(heuristic, 'delta', None)
+    inbox = inboxes[index]
+
+    open_list = BucketQueue()
+    records = {}
+    buffers = [[] for _ in range(num_of_workers)]
+    num_of_visited = 0
+    num_of_explored = 0
+    max_depth = 0
+
+    def add(node):
+        key, blank, g, h, parent, operator = node
+        record = records.get(key)
+        if record is None or g < record[0]:
+            records[key] = (g, blank, parent, operator)
+            open_list.push(g + h, g, key)
+
+    def flush(owner):
+        sent[index] += 1
+        inboxes[owner].put(buffers[owner])
+        buffers[owner] = []
+
+    def receive(batch):
+        idle[index] = 0
+        received[index] += 1
+        for node in batch:
+            add(node)
+
+    while not stop.is_set():
+        while True:
+            try:
+                receive(inbox.get_nowait())
+            except queue.Empty:
+                break
+
+        expanded = 0
+        while expanded < EXPANSIONS_PER_ROUND and len(open_list) > 0:
+            f, g, key = open_list.pop()
+            if f >= incumbent.value:
+                # Nothing left in this partition can lead to a better solution
+                open_list.push(f, g, key)
+                break
+            g_record, blank, _, operator = records[key]
+            if g != g_record:
+                continue
+            if key == goal:
+                with incumbent.get_lock():
+                    if g < incumbent.value:
+                        incumbent.value = g
+                continue
+
+            idle[index] = 0
+            expanded += 1
+            num_of_explored += 1
+            node = PackedState.from_key(key, width, height, blank)
+            h = f - g
+            child_g = g + 1
+            max_depth = max(max_depth, child_g)
+            for child_operator, target, _ in moves[LAST_OPERATOR_TO_STATE_MAP.get(operator, START)][blank]:
+                tile = (key >> (target * bits)) & mask
+                child = key + (tile << (blank * bits)) - (tile << (target * bits))
+                if delta is not None:
+                    child_h = h + delta(node, tile, target, blank)
+                else:
+                    child_h = heuristic(PackedState.from_key(child, width, height, target))
+                if child_g + child_h >= incumbent.value:
+                    continue
+                num_of_visited += 1
+                owner = get_owner(child, num_of_workers)
+                message = (child, target, child_g, child_h, key, child_operator)
+                if owner == index:
+                    add(message)
+                else:
+                    buffers[owner].append(message)
+                    if len(buffers[owner]) >= BATCH_SIZE:
+                        flush(owner)
+
+        counters[3 * index:3 * index + 3] = [num_of_visited, num_of_explored, max_depth]
+        if expanded == 0:
+            # Idle only after all the buffered children have been sent, so that the counters account for them
+            for owner in range(num_of_workers):
+                if len(buffers[owner]) > 0:
+                    flush(owner)
+            idle[index] = 1
+            try:
+                receive(inbox.get(timeout=POLL_INTERVAL))
+            except queue.Empty:
+                pass
+
+    # The batches left in the inboxes are of no use any more, so exiting must not wait for them to be read
+    for other in inboxes:
+        other.cancel_join_thread()
+    results.put(('stats', num_of_visited, num_of_explored, max_depth))
+
+    # Answers the queries for the parents of the states on the solution path until told to exit
+    while True:
+        key = queries[index].get()
+        if key is None:
+            break
+        parent, operator = records[key][2:]
+        results.put(('parent', parent, operator))
+
+
+class ParallelAStarSolver:
+    @staticmethod
+    def solve(state, heuristic=manhattan_distance, workers=None, limits: SearchLimits = None) \
+            -> Tuple[Optional[State], int, int, int]:
+        if not state.is_solvable():
+            raise Exception("Not solvable")
+        prepare_heuristic(state, heuristic, limits)
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        packed = state.pack()
+        goal = packed.get_target_state().key
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(workers)]
+        queries = [context.Queue() for _ in range(workers)]
+        results = context.Queue()
+        incumbent = context.Value('q', NO_SOLUTION)
+        # The last counter belongs to this process, which sends the root
+        sent = context.Array('q', workers + 1, lock=False)
+        received = context.Array('q', workers, lock=False)
+        idle = context.Array('b', workers, lock=False)
+        # Visited, explored and the maximum depth of every worker
+        counters = context.Array('q', 3 * workers, lock=False)
+        stop = context.Event()
+
+        processes = [context.Process(target=search_partition,
+                                     args=(i, state.width, state.height, goal, heuristic, inboxes, queries, results,
+                                           incumbent, sent, received, idle, counters, stop), daemon=True)
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+
+        try:
+            sent[workers] += 1
+            inboxes[get_owner(packed.key, workers)].put(
+                [(packed.key, packed.get_blank_position(), 0, heuristic(state), None, None)])
+            ParallelAStarSolver.wait_for_termination(sent, received, idle, processes, counters, limits)
+            stop.set()
+
+            # Every worker sends its stats once it has left the search, before any query is sent
+            num_of_visited, num_of_explored, max_depth = 1, 0, 0
+            for _ in range(workers):
+                _, visited, explored, depth = ParallelAStarSolver.get_result(results, processes)
+                num_of_visited += visited
+                num_of_explored += explored
+                max_depth = max(max_depth, depth)
+
+            solved = None
+            if incumbent.value != NO_SOLUTION:
+                solved = ParallelAStarSolver.trace(state, goal, queries, results, processes)
+        finally:
+            stop.set()
+            for query in queries:
+                query.put(None)
+            for process in processes:
+                process.join()
+
+        return solved, num_of_visited, num_of_explored, max_depth
+
+    @staticmethod
+    def check_workers(processes):
+        # A worker only exits when it is told to, so any exit before that means that it has failed
+        for index, process in enumerate(processes):
+            if process.exitcode is not None:
+                raise Exception(f"Worker {index} exited with code {process.exitcode}")
+
+    @staticmethod
+    def get_result(results, processes):
+        while True:
+            try:
+                return results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                ParallelAStarSolver.check_workers(processes)
+
+    @staticmethod
+    def get_stats(counters):
+        return 1 + sum(counters[0::3]), sum(counters[1::3]), max(counters[2::3])
+
+    @staticmethod
+    def wait_for_termination(sent, received, idle, processes, counters, limits=None):
+        # The search is over when every worker is idle and every sent batch has been received. Both have to hold in
+        # two snapshots with the same counters, because the counters are not read atomically.
+        previous = None
+        while True:
+            time.sleep(POLL_INTERVAL)
+            ParallelAStarSolver.check_workers(processes)
+            if limits is not None:
+                stats = ParallelAStarSolver.get_stats(counters)
+                limits.check(*stats)
+                limits.check_resources(*stats)
+            snapshot = (sum(sent), sum(received))
+            if all(idle) and snapshot[0] == snapshot[1]:
+                if snapshot == previous:
+                    return
+                previous = snapshot
+            else:
+                previous = None
+
+    @staticmethod
+    def trace(root, goal, queries, results, processes) -> State:
+        # Asks the owner of every state on the path for its parent, back from the goal to the root
+        operators = []
+        key = goal
+        while True:
+            queries[get_owner(key, len(queries))].put(key)
+            _, parent, operator = ParallelAStarSolver.get_result(results, processes)
+            if parent is None:
+                break
+            operators.append(operator)
+            key = parent
+
+        node = root
+        for operator in reversed(operators):
+            node = node.move(OPERATORS[operator])
+        return node
+
+
+def set_cancel_event(event):
+    global _cancel_event
+    _cancel_event = event
+
+
+def search_subtree(board, width, operators, bound, heuristic):
+    # Bounded depth-first search of one subtree of an IDA* iteration, whose root is reached from the start by the
+    # given operators. Returns the operators of a solution (or None), the smallest f-value over the bound and the
+    # stats. It gives up early when another subtree has already found a solution within the same bound.
+    start = State([list(board[i:i + width]) for i in range(0, len(board), width)])
+    goal = start.get_target_state()
+    delta = getattr(heuristic, 'delta', None)
+    pruner = get_learned_pruner()
+    get_initial_heuristic_value(start, heuristic)
+
+    node = start
+    path = {start}
+    for operator in operators:
+        pruning_state = pruner.get_next(node.pruning_state, operator)
+        node = node.move(OPERATORS[operator], delta)
+        node.pruning_state = pruning_state
+        path.add(node)
+
+    num_of_visited = 0
+    num_of_explored = 0
+    max_depth = len(operators)
+
+    def search(node, depth):
+        nonlocal num_of_visited, num_of_explored, max_depth
+
+        h = heuristic(node) if node.heuristic_value is None else node.heuristic_value
+        priority = depth + h
+        if priority > bound:
+            return None, priority
+        if node == goal:
+            return node, priority
+
+        num_of_explored += 1
+        if num_of_explored % CANCEL_CHECK_INTERVAL == 0 and _cancel_event is not None and _cancel_event.is_set():
+            return None, math.inf
+
+        next_bound = math.inf
+        for neighbour in node.get_neighbours("URDL", delta, pruner):
+            if neighbour in path:
+                continue
+            num_of_visited += 1
+            if depth + 1 > max_depth:
+                max_depth = depth + 1
+
+            path.add(neighbour)
+            solved, neighbour_bound = search(neighbour, depth + 1)
+            path.remove(neighbour)
+
+            if solved is not None:
+                return solved, neighbour_bound
+            if neighbour_bound < next_bound:
+                next_bound = neighbour_bound
+
+        return None, next_bound
+
+    solved, next_bound = search(node, len(operators))
+    solution = None
+    if solved is not None:
+        solution = []
+        while solved.parent is not None:
+            solution.append(OPERATORS.index(solved.operator))
+            solved = solved.parent
+        solution.reverse()
+    return solution, next_bound, num_of_visited, num_of_explored, max_depth
+
+
+class ParallelIDAStarSolver:
+    @staticmethod
+    def solve(state, heuristic=manhattan_distance, workers=None, limits: SearchLimits = None) \
+            -> Tuple[Optional[State], int, int, int]:
+        if not state.is_solvable():
+            raise Exception("Not solvable")
+        prepare_heuristic(state, heuristic, limits)
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        # Expands the top of the tree breadth-first until there are enough subtrees to keep every worker busy
+        goal = state.get_target_state()
+        pruner = get_learned_pruner()
+        layer = [(state, [])]
+        num_of_visited = 1
+        num_of_explored = 0
+        for _ in range(MAX_SPLIT_DEPTH):
+            for node, operators in layer:
+                if node == goal:
+                    return ParallelIDAStarSolver.replay(state, operators), num_of_visited, num_of_explored, \
+                        len(operators)
+            if len(layer) >= workers * SUBTREES_PER_WORKER:
+                break
+            num_of_explored += len(layer)
+            layer = [(neighbour, operators + [OPERATORS.index(neighbour.operator)])
+                     for node, operators in layer for neighbour in node.get_neighbours("URDL", None, pruner)]
+            num_of_visited += len(layer)
+        max_depth = len(layer[0][1])
+
+        board = state.board
+        cancel = multiprocessing.get_context().Event()
+        bound = heuristic(state)
+        with ProcessPoolExecutor(max_workers=workers, initializer=set_cancel_event, initargs=(cancel,)) as executor:
+            while bound != math.inf:
+                cancel.clear()
+                pending = {executor.submit(search_subtree, board, state.width, operators, bound, heuristic)
+                           for _, operators in layer}
+                solution = None
+                next_bound = math.inf
+                while len(pending) > 0:
+                    done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        operators, subtree_bound, visited, explored, depth = future.result()
+                        num_of_visited += visited
+                        num_of_explored += explored
+                        max_depth = max(max_depth, depth)
+                        next_bound = min(next_bound, subtree_bound)
+                        # Every solution found within the bound is optimal, as no smaller bound had any
+                        if operators is not None and solution is None:
+                            solution = operators
+                            cancel.set()
+
+                    if limits is not None:
+                        try:
+                            limits.check(num_of_visited, num_of_explored, max_depth)
+                            limits.check_resources(num_of_visited, num_of_explored, max_depth)
+                        except LimitReached:
+                            # The running subtrees give up as soon as they see the event
+                            cancel.set()
+                            for future in pending:
+                                future.cancel()
+                            raise
+
+                if solution is not None:
+                    return ParallelIDAStarSolver.replay(state, solution), num_of_visited, num_of_explored, max_depth
+                bound = next_bound
+
+        return None, num_of_visited, num_of_explored, max_depth
+
+    @staticmethod
+    def replay(root, operators) -> State:
+        node = root
+        for operator in operators:
+            node = node.move(OPERATORS[operator])
+        return node
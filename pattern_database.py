@@ -0,0 +1,216 @@
+import mmap
+import os
+import struct
+
+from limits import SearchLimits, CHECK_INTERVAL
+from state import State, Geometry
+
+MAGIC = b'TQPD'
+HEADER_FORMAT = '<4sHHH'
+UNKNOWN_DISTANCE = 0xFF
+DEFAULT_DIRECTORY = 'tables'
+DEFAULT_PATTERN_SIZE = 4
+DEFAULT_PARTITIONS = {
+    (3, 3): ((1, 2, 3, 4), (5, 6, 7, 8)),
+    (4, 4): ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15))
+}
+
+
+def get_default_partition(width, height):
+    if (width, height) in DEFAULT_PARTITIONS:
+        return DEFAULT_PARTITIONS[(width, height)]
+    tiles = list(range(1, width * height))
+    return tuple(tuple(tiles[i:i + DEFAULT_PATTERN_SIZE]) for i in range(0, len(tiles), DEFAULT_PATTERN_SIZE))
+
+
+def get_number_of_placements(size, num_of_tiles):
+    count = 1
+    for i in range(num_of_tiles):
+        count *= size - i
+    return count
+
+
+def rank_placement(positions, size):
+    rank = 0
+    for i, position in enumerate(positions):
+        digit = position
+        for j in range(i):
+            if positions[j] < position:
+                digit -= 1
+        rank = rank * (size - i) + digit
+    return rank
+
+
+def unrank_placement(rank, size, num_of_tiles):
+    digits = [0] * num_of_tiles
+    for i in range(num_of_tiles - 1, -1, -1):
+        rank, digits[i] = divmod(rank, size - i)
+
+    free_cells = list(range(size))
+    return [free_cells.pop(digit) for digit in digits]
+
+
+class PatternDatabase:
+    def __init__(self, width, height, tiles, table, offset=0):
+        self.width = width
+        self.height = height
+        self.tiles = tuple(tiles)
+        self.table = table
+        self.offset = offset
+
+    @staticmethod
+    def build(width, height, tiles, limits: SearchLimits = None):
+        # Backward breadth-first search over the positions of the pattern tiles and the blank. Moving the blank
+        # over a tile from outside the pattern is free, so the distances of disjoint patterns can be added up.
+        # Building counts no nodes of the search, only the time, cancellation and memory limits apply.
+        size = width * height
+        num_of_tiles = len(tiles)
+        adjacency = [tuple(targets.values()) for targets in Geometry.get(width, height).move_targets]
+        num_of_placements = get_number_of_placements(size, num_of_tiles)
+        if limits is not None:
+            limits.check_allocation(num_of_placements * (size + 1))
+        table = bytearray([UNKNOWN_DISTANCE]) * num_of_placements
+
+        # 0 - not seen, 1 - queued for the next layer, 2 - closed
+        seen = bytearray(len(table) * size)
+        start = rank_placement([tile - 1 for tile in tiles], size) * size + size - 1
+        layer = [start]
+        distance = 0
+        num_of_expanded = 0
+
+        while len(layer) > 0:
+            next_layer = []
+            stack = []
+            for node in layer:
+                if seen[node] != 2:
+                    seen[node] = 2
+                    stack.append(node)
+
+            while len(stack) > 0:
+                node = stack.pop()
+                num_of_expanded += 1
+                if limits is not None and num_of_expanded % CHECK_INTERVAL == 0:
+                    limits.check_resources(0, 0, 0)
+                index, blank = divmod(node, size)
+                if table[index] == UNKNOWN_DISTANCE:
+                    table[index] = distance
+
+                positions = unrank_placement(index, size, num_of_tiles)
+                for cell in adjacency[blank]:
+                    if cell in positions:
+                        new_positions = list(positions)
+                        new_positions[positions.index(cell)] = blank
+                        neighbour = rank_placement(new_positions, size) * size + cell
+                        if seen[neighbour] == 0:
+                            seen[neighbour] = 1
+                            next_layer.append(neighbour)
+                    else:
+                        neighbour = node - blank + cell
+                        if seen[neighbour] != 2:
+                            seen[neighbour] = 2
+                            stack.append(neighbour)
+
+            layer = next_layer
+            distance += 1
+
+        return PatternDatabase(width, height, tiles, table)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as file:
+            table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, width, height, num_of_tiles = struct.unpack_from(HEADER_FORMAT, table)
+        if magic != MAGIC:
+            raise ValueError(f'Invalid pattern database file: {path}')
+        tiles = struct.unpack_from(f'<{num_of_tiles}H', table, struct.calcsize(HEADER_FORMAT))
+        offset = struct.calcsize(HEADER_FORMAT) + struct.calcsize(f'<{num_of_tiles}H')
+
+        if len(table) - offset != get_number_of_placements(width * height, num_of_tiles):
+            raise ValueError(f'Invalid pattern database file: {path}')
+        return PatternDatabase(width, height, tiles, table, offset)
+
+    def save(self, path):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(struct.pack(HEADER_FORMAT, MAGIC, self.width, self.height, len(self.tiles)))
+            file.write(struct.pack(f'<{len(self.tiles)}H', *self.tiles))
+            file.write(self.table[self.offset:])
+        os.replace(temp_path, path)
+
+    def get_distance(self, positions):
+        size = self.width * self.height
+        return self.table[self.offset + rank_placement([positions[tile] for tile in self.tiles], size)]
+
+
+class AdditivePatternDatabase:
+    def __init__(self, databases):
+        self.databases = databases
+        self.tile_to_database_map = {tile: database for database in databases for tile in database.tiles}
+
+    @staticmethod
+    def get_filename(width, height, tiles):
+        return f'pdb_{width}x{height}_{"-".join(map(str, tiles))}.bin'
+
+    @staticmethod
+    def load_or_build(width, height, partition=None, directory=DEFAULT_DIRECTORY, limits: SearchLimits = None):
+        if partition is None:
+            partition = get_default_partition(width, height)
+
+        tiles = sorted(tile for pattern in partition for tile in pattern)
+        if tiles != list(range(1, width * height)):
+            raise ValueError('Invalid partition: Every tile has to belong to exactly one pattern')
+
+        os.makedirs(directory, exist_ok=True)
+        databases = []
+        for pattern in partition:
+            path = os.path.join(directory, AdditivePatternDatabase.get_filename(width, height, pattern))
+            if not os.path.exists(path):
+                PatternDatabase.build(width, height, pattern, limits).save(path)
+            databases.append(PatternDatabase.load(path))
+
+        return AdditivePatternDatabase(databases)
+
+    def __call__(self, state: State) -> int:
+        positions = [0] * len(state)
+        for index, value in enumerate(state.board):
+            positions[value] = index
+
+        return sum(database.get_distance(positions) for database in self.databases)
+
+    def delta(self, state: State, tile: int, from_index: int, to_index: int) -> int:
+        # Only the table of the pattern that contains the moved tile has to be looked up again
+        database = self.tile_to_database_map[tile]
+        board = state.board
+        positions = {t: board.index(t) for t in database.tiles}
+        old_distance = database.get_distance(positions)
+        positions[tile] = to_index
+        return database.get_distance(positions) - old_distance
+
+
+_default_databases = {}
+
+
+def get_default_database(width, height, directory=DEFAULT_DIRECTORY, limits: SearchLimits = None) \
+        -> AdditivePatternDatabase:
+    # The heuristic has no directory of its own, so the database of a board size comes from the first call's one
+    if (width, height) not in _default_databases:
+        _default_databases[(width, height)] = AdditivePatternDatabase.load_or_build(width, height,
+                                                                                    directory=directory, limits=limits)
+    return _default_databases[(width, height)]
+
+
+def prepare_pattern_database(state: State, limits: SearchLimits = None):
+    get_default_database(state.width, state.height, limits=limits)
+
+
+def pattern_database_distance(state: State) -> int:
+    return get_default_database(state.width, state.height)(state)
+
+
+def pattern_database_distance_delta(state: State, tile: int, from_index: int, to_index: int) -> int:
+    return get_default_database(state.width, state.height).delta(state, tile, from_index, to_index)
+
+
+pattern_database_distance.delta = pattern_database_distance_delta
+pattern_database_distance.prepare = prepare_pattern_database
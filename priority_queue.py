@@ -0,0 +1,55 @@
+import heapq
+
+
+class BucketQueue:
+    # Open list for small non-negative integer priorities: one bucket per priority, split by depth into LIFO
+    # stacks, so that push and pop take O(1) amortized time and ties are broken in favour of deeper nodes
+    def __init__(self):
+        self.buckets = []
+        self.min_priority = 0
+        self.size = 0
+
+    def push(self, priority: int, depth: int, item):
+        while len(self.buckets) <= priority:
+            self.buckets.append([])
+        bucket = self.buckets[priority]
+        while len(bucket) <= depth:
+            bucket.append([])
+
+        bucket[depth].append(item)
+        self.size += 1
+        if priority < self.min_priority:
+            self.min_priority = priority
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError('pop from an empty queue')
+
+        while True:
+            bucket = self.buckets[self.min_priority]
+            while len(bucket) > 0 and len(bucket[-1]) == 0:
+                bucket.pop()
+            if len(bucket) > 0:
+                break
+            self.min_priority += 1
+
+        self.size -= 1
+        return self.min_priority, len(bucket) - 1, bucket[-1].pop()
+
+    def __len__(self):
+        return self.size
+
+
+class HeapQueue:
+    def __init__(self):
+        self.heap = []
+
+    def push(self, priority: int, depth: int, item):
+        heapq.heappush(self.heap, (priority, -depth, item))
+
+    def pop(self):
+        priority, depth, item = heapq.heappop(self.heap)
+        return priority, -depth, item
+
+    def __len__(self):
+        return len(self.heap)
@@ -0,0 +1,129 @@
+from collections import deque
+from functools import lru_cache
+
+from state import State, OPERATORS
+
+START = 0
+PRUNED = -1
+DEFAULT_LEARNING_DEPTH = 8
+
+
+def get_reversals():
+    return [(OPERATORS.index(direction), OPERATORS.index(State.DIRECTION_TO_OPPOSITE_MAP[direction]))
+            for direction in OPERATORS]
+
+
+class MovePruner:
+    # A finite-state machine over the operators applied so far (an Aho-Corasick automaton of the forbidden
+    # sequences), which rejects the moves that complete any forbidden sequence. States are small integers, so a
+    # search only has to remember one number per node, and START is the state of a path with no history.
+    def __init__(self, sequences=None):
+        if sequences is None:
+            sequences = get_reversals()
+        self.sequences = [tuple(sequence) for sequence in sequences]
+
+        goto = [[None] * len(OPERATORS)]
+        accepting = [False]
+        for sequence in self.sequences:
+            node = START
+            for operator in sequence:
+                if goto[node][operator] is None:
+                    goto[node][operator] = len(goto)
+                    goto.append([None] * len(OPERATORS))
+                    accepting.append(False)
+                node = goto[node][operator]
+            accepting[node] = True
+
+        failures = [START] * len(goto)
+        queue = deque()
+        for operator, child in enumerate(goto[START]):
+            if child is None:
+                goto[START][operator] = START
+            else:
+                queue.append(child)
+        while len(queue) > 0:
+            node = queue.popleft()
+            accepting[node] = accepting[node] or accepting[failures[node]]
+            for operator, child in enumerate(goto[node]):
+                if child is None:
+                    goto[node][operator] = goto[failures[node]][operator]
+                else:
+                    failures[child] = goto[failures[node]][operator]
+                    queue.append(child)
+
+        self.transitions = [tuple(PRUNED if accepting[target] else target for target in row) for row in goto]
+        self.geometry_to_moves_map = {}
+
+    @staticmethod
+    def learn(max_length=DEFAULT_LEARNING_DEPTH) -> 'MovePruner':
+        # Breadth-first search from the blank of an unbounded board, in which a state is the set of displaced
+        # tiles and the blank position. A path reaching a state already reached by a shortlex smaller path is
+        # redundant, but it is only forbidden when the blank of the other path stays within the bounding box of
+        # its own trajectory, because only then the replacement is legal wherever the redundant path is.
+        vectors = [State.DIRECTION_TO_VECTOR_MAP[direction] for direction in OPERATORS]
+        forbidden = set()
+        lengths = set()
+        start = ((), (0, 0))
+        seen = {start: (0, 0, 0, 0)}
+        layer = [(start, (), (0, 0, 0, 0))]
+
+        for _ in range(max_length):
+            next_layer = []
+            for (displaced, blank), path, box in layer:
+                displaced = dict(displaced)
+                for operator, (row_diff, col_diff) in enumerate(vectors):
+                    new_path = path + (operator,)
+                    if any(new_path[-length:] in forbidden for length in lengths):
+                        continue
+
+                    new_blank = (blank[0] + row_diff, blank[1] + col_diff)
+                    new_displaced = dict(displaced)
+                    tile = new_displaced.pop(new_blank, new_blank)
+                    if tile != blank:
+                        new_displaced[blank] = tile
+                    new_node = (tuple(sorted(new_displaced.items())), new_blank)
+                    new_box = (min(box[0], new_blank[0]), max(box[1], new_blank[0]),
+                               min(box[2], new_blank[1]), max(box[3], new_blank[1]))
+
+                    if new_node in seen:
+                        other_box = seen[new_node]
+                        if other_box[0] >= new_box[0] and other_box[1] <= new_box[1] \
+                                and other_box[2] >= new_box[2] and other_box[3] <= new_box[3]:
+                            forbidden.add(new_path)
+                            lengths.add(len(new_path))
+                        continue
+                    seen[new_node] = new_box
+                    next_layer.append((new_node, new_path, new_box))
+            layer = next_layer
+
+        return MovePruner(sorted(forbidden, key=lambda sequence: (len(sequence), sequence)))
+
+    def get_next(self, state, operator):
+        return self.transitions[state][operator]
+
+    def get_moves(self, geometry, order):
+        # For every pruner state and position of the blank, the moves that are not pruned in the given order as
+        # (operator code, new blank position, next pruner state)
+        moves = self.geometry_to_moves_map.get((geometry.width, geometry.height, order))
+        if moves is None:
+            moves = [[tuple((operator, target, row[operator]) for operator, target in blank_moves
+                            if row[operator] != PRUNED)
+                      for blank_moves in geometry.get_moves(order)]
+                     for row in self.transitions]
+            self.geometry_to_moves_map[(geometry.width, geometry.height, order)] = moves
+        return moves
+
+    def __len__(self):
+        return len(self.transitions)
+
+
+REVERSAL_PRUNER = MovePruner()
+
+# The state of the reversal pruner only depends on the last operator, so graph searches, which must not use longer
+# sequences anyway, can look it up from the operator stored with a node
+LAST_OPERATOR_TO_STATE_MAP = {operator: REVERSAL_PRUNER.get_next(START, operator) for operator in range(len(OPERATORS))}
+
+
+@lru_cache(maxsize=None)
+def get_learned_pruner(max_length=DEFAULT_LEARNING_DEPTH) -> MovePruner:
+    return MovePruner.learn(max_length)
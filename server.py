@@ -0,0 +1,284 @@
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from timeit import default_timer as timer
+
+from distance_table import DEFAULT_DIRECTORY, get_default_table
+from limits import LimitReached
+from main import STRATEGY_TO_SOLVER_MAP, LIMIT_OPTIONS, get_parameters, get_limits, get_status
+from pattern_database import get_default_database
+from pruning import get_learned_pruner
+from solver import collect_moves, iter_moves
+from state import State
+from a_star import walking_distance
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Requests that are being solved or wait for a worker, per worker, before the server stops reading new ones
+MAX_PENDING_PER_WORKER = 4
+# A request line holds a whole board, e.g. about 50 KB for 100x100
+MAX_LINE_LENGTH = 16 << 20
+# How long after its timeout a request is answered even if the worker has not given up on it yet
+TIMEOUT_GRACE = 1
+
+# Tables the workers load or build before they take any request, by the name used in `--preload walk:4x4`. A request
+# can only use the tables that have been preloaded, as building one ignores the limits of the search.
+PRELOADERS = {
+    'walk': lambda width, height, directory: walking_distance(get_solved_state(width, height)),
+    'pdb': get_default_database,
+    'table': get_default_table
+}
+
+# The tables preloaded by the worker process, as (name, width, height), and the directory they are kept in
+_preloads = set()
+_directory = DEFAULT_DIRECTORY
+
+
+def get_solved_state(width, height) -> State:
+    return State([[(row * width + col + 1) % (width * height) for col in range(width)] for row in range(height)])
+
+
+def parse_preload(preload):
+    # `<table>:<width>x<height>`, e.g. `pdb:4x4`
+    name, size = preload.split(':')
+    width, height = map(int, size.split('x'))
+    if name not in PRELOADERS:
+        raise ValueError(f'Unknown table: {name}')
+    return name, width, height
+
+
+def initialize_worker(preloads, directory=DEFAULT_DIRECTORY):
+    # Runs once in every worker process, so that no request pays for importing the solvers or building a table. The
+    # move pruner of IDA* is learned for any board size, so every worker learns it.
+    global _directory
+    get_learned_pruner()
+    for name, width, height in preloads:
+        PRELOADERS[name](width, height, directory)
+    _preloads.update(preloads)
+    _directory = directory
+
+
+def get_table_name(strategy, strategy_param):
+    # The table a request needs, if any
+    if strategy == 'table':
+        return 'table'
+    heuristic = strategy_param.split(':')[0]
+    return heuristic if heuristic in PRELOADERS else None
+
+
+def get_reply(solution, num_of_visited=0, num_of_explored=0, max_depth=0, exec_time=0, error=None):
+    reply = {
+        'status': int(get_status(solution)),
+        'solution': solution if isinstance(solution, str) else None,
+        'visited': num_of_visited,
+        'explored': num_of_explored,
+        'max_depth': max_depth,
+        'time': round(exec_time * 1000, 3)
+    }
+    if error is not None:
+        reply['error'] = error
+    return reply
+
+
+def solve_request(strategy, strategy_param, board, limit_options):
+    # Runs in a worker process. The limits are created here, so that the timeout starts with the search.
+    start = timer()
+    try:
+        if strategy not in STRATEGY_TO_SOLVER_MAP:
+            raise ValueError(f'Unknown strategy: {strategy}')
+        solver = STRATEGY_TO_SOLVER_MAP[strategy]
+        state = State(board)
+        table = get_table_name(strategy, strategy_param)
+        if table is not None and (table, state.width, state.height) not in _preloads:
+            raise ValueError(f'Table not preloaded: {table}:{state.width}x{state.height}')
+        # The distance tables are read from the directory of the server, never from one a client has chosen
+        params = [_directory] if strategy == 'table' else get_parameters(strategy, strategy_param)
+        moves, num_of_visited, num_of_explored, max_depth = \
+            collect_moves(iter_moves(solver, state, *params, limits=get_limits(limit_options)))
+    except LimitReached as limit:
+        return get_reply(limit, *limit.get_stats(), timer() - start)
+    except Exception as exception:
+        return get_reply(None, error=str(exception))
+
+    solution = ''.join(move.value for move in moves) if moves is not None else None
+    return get_reply(solution, num_of_visited, num_of_explored, max_depth, timer() - start)
+
+
+def get_limit_options(request, timeout=None):
+    # The limits of a request use the names and units of the command-line options, e.g. `max_memory` in megabytes.
+    # The timeout of the server applies to requests without one and caps the others.
+    limit_options = {}
+    for name, parse in LIMIT_OPTIONS.values():
+        if request.get(name) is not None:
+            limit_options[name] = parse(request[name])
+    if timeout is not None:
+        limit_options['timeout'] = min(timeout, limit_options.get('timeout', timeout))
+    return limit_options
+
+
+class SolveServer:
+    # Speaks JSON lines: every request is an object with a `board` (a list of rows), a `strategy` and a `parameter`
+    # as on the command line, optionally `timeout`, `max_nodes` and `max_memory` limits and an `id`, which comes
+    # back in the reply. Replies hold the status, the solution and the stats, and may come out of order.
+    def __init__(self, workers=None, max_pending=None, timeout=None, preloads=(), directory=DEFAULT_DIRECTORY):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or MAX_PENDING_PER_WORKER * self.workers
+        self.timeout = timeout
+        self.preloads = list(preloads)
+        self.directory = directory
+        self.executor = None
+        self.slots = None
+        self.server = None
+
+    def create_executor(self):
+        return ProcessPoolExecutor(self.workers, initializer=initialize_worker,
+                                   initargs=(self.preloads, self.directory))
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        self.executor = self.create_executor()
+        loop = asyncio.get_running_loop()
+        # Starts every worker before the first request comes in
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)))
+        self.slots = asyncio.Semaphore(self.max_pending)
+
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path, limit=MAX_LINE_LENGTH)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_LENGTH)
+        return self.server
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(self.encode(None, get_reply(None, error='Request too long')))
+                    break
+                if len(line) == 0:
+                    break
+                if len(line.strip()) == 0:
+                    continue
+
+                # Once every slot is taken the server stops reading, which lets TCP push back on the clients
+                await self.slots.acquire()
+                task = asyncio.create_task(self.answer(*self.submit(line), writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    def submit(self, line):
+        # Hands the request to a worker and returns its id, the future of the reply and the timeout. The slot of the
+        # request is given back when the worker is done with it, which can be after the reply to a request that has
+        # gone past its timeout, so that the slots bound the work queued on the pool.
+        loop = asyncio.get_running_loop()
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            limit_options = get_limit_options(request, self.timeout)
+            job = (request['strategy'], request['parameter'], request['board'], limit_options)
+        except (ValueError, KeyError, TypeError, AttributeError) as exception:
+            self.slots.release()
+            future = loop.create_future()
+            future.set_result(get_reply(None, error=f'Invalid request: {exception}'))
+            return request_id, future, None
+
+        try:
+            future = loop.run_in_executor(self.executor, solve_request, *job)
+        except BrokenProcessPool:
+            # A worker has died, e.g. killed for running out of memory, and the pool cannot be used any more
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self.create_executor()
+            future = loop.run_in_executor(self.executor, solve_request, *job)
+        future.add_done_callback(self.release)
+        return request_id, future, limit_options.get('timeout')
+
+    def release(self, _):
+        self.slots.release()
+
+    async def answer(self, request_id, future, timeout, writer):
+        try:
+            # Shielded, so that neither the timeout nor a closed connection cancels the future that holds the slot
+            reply = await asyncio.wait_for(asyncio.shield(future), None if timeout is None else timeout + TIMEOUT_GRACE)
+        except asyncio.TimeoutError:
+            # The worker checks the timeout itself, this only covers a search that does not get to check it
+            reply = get_reply(LimitReached('timeout'), exec_time=timeout + TIMEOUT_GRACE)
+        except BrokenProcessPool:
+            reply = get_reply(None, error='Worker process died')
+
+        try:
+            writer.write(self.encode(request_id, reply))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    @staticmethod
+    def encode(request_id, reply):
+        return (json.dumps({'id': request_id, **reply}) + '\n').encode()
+
+
+# Options as (name of the SolveServer.start or SolveServer argument, parser)
+SERVER_OPTIONS = {
+    '--host': ('host', str),
+    '--port': ('port', int),
+    '--unix': ('path', str),
+    '--workers': ('workers', int),
+    '--max-pending': ('max_pending', int),
+    '--timeout': ('timeout', float),
+    '--tables': ('directory', str)
+}
+
+
+def parse_server_args(args):
+    # Returns the options as a dict, `--preload` can be repeated, or None if one of them is invalid
+    options = {'preloads': []}
+    while len(args) >= 2 and (args[0] in SERVER_OPTIONS or args[0] == '--preload'):
+        try:
+            if args[0] == '--preload':
+                options['preloads'].append(parse_preload(args[1]))
+            else:
+                name, parse = SERVER_OPTIONS[args[0]]
+                options[name] = parse(args[1])
+        except ValueError:
+            return None
+        args = args[2:]
+    return options if len(args) == 0 else None
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, **options):
+    solve_server = SolveServer(**options)
+    server = await solve_server.start(host, port, path)
+    # SIGTERM stops the server like Ctrl+C does, so that the workers are shut down as well
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        await server.serve_forever()
+    finally:
+        await solve_server.close()
+
+
+if __name__ == '__main__':
+    server_options = parse_server_args(sys.argv[1:])
+    if server_options is None:
+        exit(1)
+
+    try:
+        asyncio.run(serve(**server_options))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Generator, List, Optional, Tuple
 
-from state import State
+from state import State, Direction
 
 
 class Solver(ABC):
@@ -14,3 +14,39 @@ class Solver(ABC):
             raise Exception("Invalid search order")
 
         return
+
+
+def get_operators(solved: State) -> List[Direction]:
+    # The moves from the oldest ancestor of the state to the state itself
+    operators = []
+    while solved.parent is not None:
+        operators.append(solved.operator)
+        solved = solved.parent
+    operators.reverse()
+    return operators
+
+
+def iter_moves(solver, state: State, *params, limits=None) \
+        -> Generator[List[Direction], None, Tuple[bool, int, int, int]]:
+    # Yields the moves of the solution in batches as soon as the solver commits to them, and returns whether there
+    # is a solution and the stats. Solvers that only know the solution once the search is over yield all of it at
+    # once, read from the chain of states.
+    if hasattr(solver, 'iter_moves'):
+        return (yield from solver.iter_moves(state, *params, limits=limits))
+
+    solved, num_of_visited, num_of_explored, max_depth = solver.solve(state, *params, limits=limits)
+    if solved is None:
+        return False, num_of_visited, num_of_explored, max_depth
+    yield get_operators(solved)
+    return True, num_of_visited, num_of_explored, max_depth
+
+
+def collect_moves(batches) -> Tuple[Optional[List[Direction]], int, int, int]:
+    # The whole solution yielded by `iter_moves`, or None if there is none, and the stats
+    moves = []
+    while True:
+        try:
+            moves.extend(next(batches))
+        except StopIteration as stop:
+            is_solved, *stats = stop.value
+            return (moves if is_solved else None, *stats)
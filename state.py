@@ -8,7 +8,57 @@ class Direction(Enum):
     DOWN = 'D'
 
 
+OPERATORS = tuple(Direction)
+
+
+def get_tile_bits(size):
+    return max(1, (size - 1).bit_length())
+
+
+def pack_board(board, bits):
+    key = 0
+    for index, value in enumerate(board):
+        key |= value << (index * bits)
+    return key
+
+
+def unpack_board(key, size, bits):
+    mask = (1 << bits) - 1
+    return tuple([(key >> (index * bits)) & mask for index in range(size)])
+
+
+def rank_board(board):
+    # Myrvold-Ruskey ranking, a bijection between the permutations of `size` values and 0 ... size! - 1 computed
+    # in linear time by moving every value to the end of the permutation
+    permutation = list(board)
+    inverse = [0] * len(permutation)
+    for index, value in enumerate(permutation):
+        inverse[value] = index
+
+    rank = 0
+    multiplier = 1
+    for last in range(len(permutation) - 1, 0, -1):
+        value = permutation[last]
+        index = inverse[last]
+        permutation[last], permutation[index] = permutation[index], permutation[last]
+        inverse[value], inverse[last] = index, last
+        rank += value * multiplier
+        multiplier *= last + 1
+    return rank
+
+
+def unrank_board(rank, size):
+    permutation = list(range(size))
+    for last in range(size - 1, 0, -1):
+        rank, index = divmod(rank, last + 1)
+        permutation[last], permutation[index] = permutation[index], permutation[last]
+    return tuple(permutation)
+
+
 class State:
+    __slots__ = ('width', 'height', 'geometry', 'board', 'parent', 'operator', 'blank_position', 'heuristic_value',
+                 'inversion_parity', 'pruning_state', 'heuristic_cache')
+
     DIRECTION_TO_VECTOR_MAP = {
         Direction.LEFT: (0, -1),
         Direction.RIGHT: (0, 1),
@@ -16,6 +66,13 @@ class State:
         Direction.DOWN: (1, 0)
     }
 
+    DIRECTION_TO_OPPOSITE_MAP = {
+        Direction.LEFT: Direction.RIGHT,
+        Direction.RIGHT: Direction.LEFT,
+        Direction.UP: Direction.DOWN,
+        Direction.DOWN: Direction.UP
+    }
+
     def __init__(self, board, parent=None, operator=None):
         self.width = len(board[0])
         self.height = len(board)
@@ -35,44 +92,59 @@ class State:
         if seen_values != values:
             raise ValueError(f'Invalid board: Values {values - seen_values} are missing')
 
+        self.geometry = Geometry.get(self.width, self.height)
         self.board = tuple([item for row in board for item in row])
         self.parent = parent
         self.operator = operator
         self.blank_position = None
+        self.heuristic_value = None
+        self.inversion_parity = None
+        self.pruning_state = 0
+        self.heuristic_cache = None
 
     def is_solvable(self):
-        inv_count = self.get_inversion_count()
+        inv_parity = self.get_inversion_parity()
 
-        if len(self) % 2 != 0:
-            return inv_count % 2 == 0
+        if self.width % 2 != 0:
+            return inv_parity == 0
         else:
-            blank_row_pos = self.get_blank_position() // self.width
-            if blank_row_pos % 2 != 0:
-                return inv_count % 2 == 0
-            else:
-                return inv_count % 2 != 0
+            # Every vertical move changes the parity of the number of inversions when the width is even
+            blank_row_distance = self.height - 1 - self.get_blank_position() // self.width
+            return (inv_parity + blank_row_distance) % 2 == 0
 
     def get_target_state(self):
-        target = State.__new__(State)
+        target = type(self).__new__(type(self))
         target.parent = None
         target.operator = None
         target.width = self.width
         target.height = self.height
+        target.geometry = self.geometry
         target.blank_position = len(self) - 1
+        target.heuristic_value = None
+        target.inversion_parity = 0
+        target.pruning_state = 0
+        target.heuristic_cache = None
         target.board = tuple([i for i in range(1, len(self))] + [0])
         return target
 
-    def move(self, direction: Direction):
-        index = self.get_blank_position()
-        row_diff, col_diff = self.DIRECTION_TO_VECTOR_MAP[direction]
-        row, col = index // self.width, index % self.width
-        new_row, new_col = row + row_diff, col + col_diff
+    def get_move_target(self, direction: Direction):
+        return self.geometry.move_targets[self.get_blank_position()].get(direction)
+
+    def get_child_heuristic_value(self, index, new_index, delta):
+        # Updates the parent's heuristic value with the change caused by the single tile that has been moved
+        if delta is None or self.heuristic_value is None:
+            return None
+        tile = self.board[new_index]
+        return self.heuristic_value + delta(self, tile, new_index, index)
 
-        if new_row < 0 or new_col < 0 or new_row >= self.height or new_col >= self.width:
+    def move(self, direction: Direction, delta=None):
+        new_index = self.get_move_target(direction)
+        if new_index is None:
             return None
+        return self.create_child(direction, self.get_blank_position(), new_index, delta)
 
+    def create_child(self, direction: Direction, index, new_index, delta=None):
         board = list(self.board)
-        new_index = new_row * self.width + new_col
         board[index], board[new_index] = board[new_index], board[index]
 
         new_state = State.__new__(State)
@@ -80,38 +152,86 @@ class State:
         new_state.operator = direction
         new_state.width = self.width
         new_state.height = self.height
-        new_state.blank_position = new_row * self.width + new_col
+        new_state.geometry = self.geometry
+        new_state.blank_position = new_index
+        new_state.heuristic_value = self.get_child_heuristic_value(index, new_index, delta)
+        new_state.inversion_parity = self.get_child_inversion_parity(index, new_index)
+        new_state.pruning_state = 0
+        new_state.heuristic_cache = None
         new_state.board = tuple(board)
         return new_state
 
-    def get_neighbours(self, order):
+    def get_neighbours(self, order, delta=None, pruner=None):
+        index = self.get_blank_position()
+        if pruner is None:
+            return [self.create_child(OPERATORS[operator], index, new_index, delta)
+                    for operator, new_index in self.geometry.get_moves(order)[index]]
+
+        # Skips the moves that complete a redundant sequence, the children carry on with the pruner's next state
         neighbours = []
-        for d in order:
-            neighbour = self.move(Direction(d))
-            if neighbour is not None:
-                neighbours.append(neighbour)
+        for operator, new_index, pruning_state in pruner.get_moves(self.geometry, order)[self.pruning_state][index]:
+            neighbour = self.create_child(OPERATORS[operator], index, new_index, delta)
+            neighbour.pruning_state = pruning_state
+            neighbours.append(neighbour)
         return neighbours
 
     def get_inversion_count(self):
-        # Converting a tuple to a list noticeably improves performance for some reason
-        board = list(self.board)
-
+        # Scans the board from the right and counts the smaller values already seen with a Fenwick tree
+        size = len(self)
+        tree = [0] * size
         inv_count = 0
-        for i in range(len(self) - 1):
-            for j in range(i + 1, len(self)):
-                if board[i] and board[j] and board[i] > board[j]:
-                    inv_count += 1
+
+        for value in reversed(self.board):
+            if value == 0:
+                continue
+            i = value - 1
+            while i > 0:
+                inv_count += tree[i]
+                i -= i & -i
+            i = value
+            while i < size:
+                tree[i] += 1
+                i += i & -i
 
         return inv_count
 
+    def get_inversion_parity(self):
+        if self.inversion_parity is None:
+            self.inversion_parity = self.get_inversion_count() % 2
+        return self.inversion_parity
+
+    def get_child_inversion_parity(self, index, new_index):
+        # A horizontal move never changes the inversions and a vertical one makes the moved tile jump over
+        # width - 1 other tiles, so the parity only changes on vertical moves on boards of even width
+        if self.inversion_parity is None:
+            return None
+        if self.width % 2 == 0 and abs(new_index - index) == self.width:
+            return self.inversion_parity ^ 1
+        return self.inversion_parity
+
     def get_blank_position(self):
         return self.board.index(0) if self.blank_position is None else self.blank_position
 
+    def pack(self):
+        packed = PackedState.__new__(PackedState)
+        packed.parent = None
+        packed.operator = None
+        packed.width = self.width
+        packed.height = self.height
+        packed.geometry = self.geometry
+        packed.blank_position = self.get_blank_position()
+        packed.heuristic_value = None
+        packed.inversion_parity = self.inversion_parity
+        packed.pruning_state = 0
+        packed.heuristic_cache = None
+        packed.board = self.board
+        return packed
+
     def __len__(self):
         return len(self.board)
 
     def __eq__(self, other):
-        if isinstance(other, State):
+        if isinstance(other, State) and not isinstance(other, PackedState):
             return self.board == other.board
         return False
 
@@ -124,3 +244,129 @@ class State:
 
     def __lt__(self, other):
         return False
+
+
+# Stores the board as a single integer with `bits` bits per tile (a board up to 4x4 fits in 64 bits)
+class PackedState(State):
+    __slots__ = ('key', 'bits')
+
+    @property
+    def board(self):
+        return unpack_board(self.key, self.width * self.height, self.bits)
+
+    @board.setter
+    def board(self, value):
+        self.bits = get_tile_bits(len(value))
+        self.key = pack_board(value, self.bits)
+
+    @staticmethod
+    def from_key(key, width, height, blank_position=None, parent=None, operator=None):
+        state = PackedState.__new__(PackedState)
+        state.geometry = Geometry.get(width, height)
+        state.key = key
+        state.bits = state.geometry.bits
+        state.width = width
+        state.height = height
+        state.blank_position = blank_position
+        state.heuristic_value = None
+        state.inversion_parity = None
+        state.pruning_state = 0
+        state.heuristic_cache = None
+        state.parent = parent
+        state.operator = operator
+        return state
+
+    def get_child_heuristic_value(self, index, new_index, delta):
+        if delta is None or self.heuristic_value is None:
+            return None
+        tile = (self.key >> (new_index * self.bits)) & ((1 << self.bits) - 1)
+        return self.heuristic_value + delta(self, tile, new_index, index)
+
+    def create_child(self, direction: Direction, index, new_index, delta=None):
+        bits = self.bits
+        tile = (self.key >> (new_index * bits)) & ((1 << bits) - 1)
+
+        new_state = PackedState.__new__(PackedState)
+        new_state.parent = self
+        new_state.operator = direction
+        new_state.width = self.width
+        new_state.height = self.height
+        new_state.geometry = self.geometry
+        new_state.blank_position = new_index
+        new_state.heuristic_value = self.get_child_heuristic_value(index, new_index, delta)
+        new_state.inversion_parity = self.get_child_inversion_parity(index, new_index)
+        new_state.pruning_state = 0
+        new_state.heuristic_cache = None
+        new_state.bits = bits
+        new_state.key = self.key + (tile << (index * bits)) - (tile << (new_index * bits))
+        return new_state
+
+    def unpack(self):
+        state = State.__new__(State)
+        state.parent = None
+        state.operator = None
+        state.width = self.width
+        state.height = self.height
+        state.geometry = self.geometry
+        state.blank_position = self.blank_position
+        state.heuristic_value = None
+        state.inversion_parity = self.inversion_parity
+        state.pruning_state = 0
+        state.heuristic_cache = None
+        state.board = self.board
+        return state
+
+    def __len__(self):
+        return self.width * self.height
+
+    def __eq__(self, other):
+        # Never equal to a State, which would need the board unpacked, they are converted by pack() and unpack()
+        if isinstance(other, PackedState):
+            return self.key == other.key
+        return False
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f'PackedState(parent={hex(id(self.parent)) if self.parent is not None else None}, '\
+               f'operator={self.operator}, key={hex(self.key)})'
+
+
+class Geometry:
+    # Tables shared by all the states of one board size, computed once: the positions the blank can move to from
+    # every cell, and the legal moves of every cell for each search order that has been used
+    instances = {}
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.bits = get_tile_bits(self.size)
+        self.move_targets = []
+        for index in range(self.size):
+            row, col = index // width, index % width
+            targets = {}
+            for direction, (row_diff, col_diff) in State.DIRECTION_TO_VECTOR_MAP.items():
+                new_row, new_col = row + row_diff, col + col_diff
+                if 0 <= new_row < height and 0 <= new_col < width:
+                    targets[direction] = new_row * width + new_col
+            self.move_targets.append(targets)
+        self.order_to_moves_map = {}
+
+    @staticmethod
+    def get(width, height) -> 'Geometry':
+        geometry = Geometry.instances.get((width, height))
+        if geometry is None:
+            geometry = Geometry.instances[(width, height)] = Geometry(width, height)
+        return geometry
+
+    def get_moves(self, order):
+        # For every position of the blank, the legal moves in the given order as (operator code, new blank position)
+        moves = self.order_to_moves_map.get(order)
+        if moves is None:
+            directions = [Direction(d) for d in order]
+            moves = [tuple((OPERATORS.index(d), targets[d]) for d in directions if d in targets)
+                     for targets in self.move_targets]
+            self.order_to_moves_map[order] = moves
+        return moves
@@ -1,11 +1,16 @@
 import unittest
 
 from state import State, Direction
-from a_star import AStarSolver, hamming_distance, manhattan_distance
+from limits import SearchLimits, LimitReached
+from priority_queue import HeapQueue
+from a_star import AStarSolver, IDAStarSolver, WeightedAStarSolver, AnytimeAStarSolver, hamming_distance, \
+    manhattan_distance, linear_conflict, walking_distance
+from solver import get_operators
 
 
-class AStarTest(unittest.TestCase):
-    def setUp(self) -> None:
+class Boards:
+    # The boards of the tests of every A* variant
+    def configure(self):
         self.solved = State([
             [1, 2, 3],
             [4, 5, 6],
@@ -23,6 +28,11 @@ class AStarTest(unittest.TestCase):
             [13, 10, 14, 15]
         ])
 
+
+class AStarTest(unittest.TestCase, Boards):
+    def setUp(self) -> None:
+        self.configure()
+
     def test_manhattan_distance_if_solved_then_returns_0(self):
         self.assertEqual(0, manhattan_distance(self.solved))
 
@@ -37,6 +47,73 @@ class AStarTest(unittest.TestCase):
         state = self.solved.move(Direction.LEFT).move(Direction.LEFT).move(Direction.UP)
         self.assertEqual(3, hamming_distance(state))
 
+    def test_linear_conflict_if_solved_then_returns_0(self):
+        self.assertEqual(0, linear_conflict(self.solved))
+
+    def test_linear_conflict_if_tiles_swapped_in_their_goal_row_then_adds_2_moves_to_manhattan_distance(self):
+        state = State([
+            [2, 1, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+        self.assertEqual(manhattan_distance(state) + 2, linear_conflict(state))
+
+    def test_linear_conflict_if_tiles_reversed_in_their_goal_column_then_counts_every_tile_to_remove(self):
+        state = State([
+            [7, 2, 3],
+            [4, 5, 6],
+            [1, 8, 0]
+        ])
+        self.assertEqual(manhattan_distance(state) + 4, linear_conflict(state))
+
+    def test_walking_distance_if_solved_then_returns_0(self):
+        self.assertEqual(0, walking_distance(self.solved))
+
+    def test_walking_distance_if_unsolved_then_is_not_less_than_manhattan_distance(self):
+        self.assertGreaterEqual(walking_distance(self.unsolved), manhattan_distance(self.unsolved))
+        self.assertGreaterEqual(walking_distance(self.puzzle15), manhattan_distance(self.puzzle15))
+
+    def test_walking_distance_if_board_has_more_than_4_rows_then_raises_value_error(self):
+        state = State([[(row * 3 + col + 1) % 15 for col in range(3)] for row in range(5)])
+        with self.assertRaises(ValueError):
+            walking_distance(state)
+
+    def test_move_if_walking_distance_delta_passed_then_parent_configurations_are_computed_once(self):
+        state = self.puzzle15.pack()
+        state.heuristic_value = walking_distance(state)
+        neighbours = state.get_neighbours("URDL", walking_distance.delta)
+        self.assertIsNotNone(state.heuristic_cache)
+        for neighbour in neighbours:
+            self.assertEqual(walking_distance(neighbour), neighbour.heuristic_value)
+
+    def test_move_if_linear_conflict_delta_passed_then_heuristic_value_is_updated_incrementally(self):
+        state = self.puzzle15
+        state.heuristic_value = linear_conflict(state)
+        for d in "RDLLUURRDLDRULLDRU":
+            state = state.move(Direction(d), linear_conflict.delta) or state
+            self.assertEqual(linear_conflict(state), state.heuristic_value)
+
+    def test_move_if_walking_distance_delta_passed_then_heuristic_value_is_updated_incrementally(self):
+        state = self.puzzle15
+        state.heuristic_value = walking_distance(state)
+        for d in "RDLLUURRDLDRULLDRU":
+            state = state.move(Direction(d), walking_distance.delta) or state
+            self.assertEqual(walking_distance(state), state.heuristic_value)
+
+    def test_move_if_manhattan_delta_passed_then_heuristic_value_is_updated_incrementally(self):
+        state = self.unsolved
+        state.heuristic_value = manhattan_distance(state)
+        for d in "RDLLUURRDLDR":
+            state = state.move(Direction(d), manhattan_distance.delta) or state
+            self.assertEqual(manhattan_distance(state), state.heuristic_value)
+
+    def test_move_if_hamming_delta_passed_then_heuristic_value_is_updated_incrementally(self):
+        state = self.puzzle15.pack()
+        state.heuristic_value = hamming_distance(state)
+        for d in "RDLLUURRDLDR":
+            state = state.move(Direction(d), hamming_distance.delta) or state
+            self.assertEqual(hamming_distance(state), state.heuristic_value)
+
     def test_solve_if_already_solved_then_returns_the_input_state(self):
         self.assertEqual(self.solved, AStarSolver.solve(self.solved)[0])
 
@@ -92,6 +169,17 @@ class AStarTest(unittest.TestCase):
         state = self.solved.move(Direction.UP)
         self.assertEqual(state.get_target_state(), AStarSolver.solve(state, manhattan_distance)[0])
 
+    def test_solve_if_linear_conflict_or_walking_distance_heuristic_then_returns_optimal_solution(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved, manhattan_distance)[0]))
+        for heuristic in (linear_conflict, walking_distance):
+            solved = AStarSolver.solve(self.unsolved, heuristic)[0]
+            self.assertEqual(self.unsolved.get_target_state(), solved)
+            self.assertEqual(expected, len(get_operators(solved)))
+
+    def test_solve_if_heap_queue_passed_then_returns_solution_of_the_same_length(self):
+        expected = len(get_operators(AStarSolver.solve(self.puzzle15)[0]))
+        self.assertEqual(expected, len(get_operators(AStarSolver.solve(self.puzzle15, manhattan_distance, HeapQueue)[0])))
+
     def test_solve_if_15_puzzle_then_returns_solved_state(self):
         self.assertEqual(self.puzzle15.get_target_state(), AStarSolver.solve(self.puzzle15)[0])
 
@@ -114,6 +202,158 @@ class AStarTest(unittest.TestCase):
 
         self.assertEqual(self.puzzle15.get_target_state(), result)
 
+    def test_solve_if_node_limit_reached_then_raises_limit_reached_with_the_stats(self):
+        with self.assertRaises(LimitReached) as c:
+            AStarSolver.solve(self.puzzle15, hamming_distance, limits=SearchLimits(max_nodes=10))
+        self.assertEqual('nodes', c.exception.reason)
+        self.assertGreater(c.exception.num_of_visited, 10)
+
+
+class IDAStarTest(unittest.TestCase, Boards):
+    def setUp(self) -> None:
+        self.configure()
+
+    def test_solve_if_already_solved_then_returns_the_input_state(self):
+        self.assertEqual(self.solved, IDAStarSolver.solve(self.solved)[0])
+
+    def test_solve_if_is_not_solvable_then_raises_an_exception(self):
+        state = State([
+            [1, 8, 2],
+            [0, 4, 3],
+            [6, 7, 5]
+        ])
+        with self.assertRaises(Exception) as c:
+            IDAStarSolver.solve(state)
+        self.assertEqual("Not solvable", str(c.exception))
+
+    def test_solve_if_one_step_from_target_state_then_returns_state_with_correct_parent_and_operator(self):
+        state = self.solved.move(Direction.UP)
+        result = IDAStarSolver.solve(state)[0]
+        self.assertEqual(state, result.parent)
+        self.assertEqual(Direction.DOWN, result.operator)
+
+    def test_solve_if_unsolved_then_returns_solved_state(self):
+        self.assertEqual(self.unsolved.get_target_state(), IDAStarSolver.solve(self.unsolved)[0])
+
+    def test_solve_if_unsolved_then_the_operator_chain_is_correct(self):
+        operators = []
+        state = IDAStarSolver.solve(self.unsolved)[0]
+        while state is not None and state.operator is not None:
+            operators.append(state.operator)
+            state = state.parent
+
+        result = self.unsolved
+        for o in reversed(operators):
+            result = result.move(o)
+
+        self.assertEqual(self.unsolved.get_target_state(), result)
+
+    def test_solve_if_unsolved_then_the_solution_is_as_short_as_the_a_star_one(self):
+        for heuristic in (manhattan_distance, hamming_distance):
+            self.assertEqual(len(get_operators(AStarSolver.solve(self.unsolved, heuristic)[0])),
+                             len(get_operators(IDAStarSolver.solve(self.unsolved, heuristic)[0])))
+
+    def test_solve_if_15_puzzle_then_the_oldest_ancestor_of_the_result_state_is_the_input_state(self):
+        state = IDAStarSolver.solve(self.puzzle15)[0].parent
+        while state.parent is not None:
+            state = state.parent
+        self.assertIs(self.puzzle15, state)
+
+    def test_solve_if_15_puzzle_then_max_depth_equals_the_solution_length(self):
+        solved, _, _, max_depth = IDAStarSolver.solve(self.puzzle15)
+        self.assertEqual(len(get_operators(solved)), max_depth)
+
+    def test_solve_if_deadline_passed_then_raises_limit_reached(self):
+        with self.assertRaises(LimitReached) as c:
+            IDAStarSolver.solve(self.unsolved, hamming_distance, limits=SearchLimits(timeout=0))
+        self.assertEqual('timeout', c.exception.reason)
+        self.assertGreater(c.exception.num_of_explored, 0)
+
+
+class WeightedAStarTest(unittest.TestCase, Boards):
+    def setUp(self) -> None:
+        self.configure()
+
+    def test_solve_if_already_solved_then_returns_the_input_state(self):
+        self.assertEqual(self.solved, WeightedAStarSolver.solve(self.solved)[0])
+
+    def test_solve_if_weight_is_less_than_1_then_raises_an_exception(self):
+        with self.assertRaises(Exception) as c:
+            WeightedAStarSolver.solve(self.unsolved, manhattan_distance, 0.5)
+        self.assertEqual("Invalid weight", str(c.exception))
+
+    def test_solve_if_weight_is_1_then_returns_optimal_solution(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved)[0]))
+        self.assertEqual(expected, len(get_operators(WeightedAStarSolver.solve(self.unsolved, weight=1)[0])))
+
+    def test_solve_if_weighted_then_the_solution_is_at_most_weight_times_longer(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved)[0]))
+        for weight in (1.5, 2, 5):
+            solved = WeightedAStarSolver.solve(self.unsolved, manhattan_distance, weight)[0]
+            self.assertEqual(self.unsolved.get_target_state(), solved)
+            self.assertLessEqual(len(get_operators(solved)), weight * expected)
+
+    def test_solve_if_5x5_board_then_returns_solved_state(self):
+        state = State([[(row * 5 + col + 1) % 25 for col in range(5)] for row in range(5)])
+        for d in "LLUURRDLLLUURDRDLURRDDLLUULLDRURDLDRULURDRDLUL":
+            state = state.move(Direction(d)) or state
+        state.parent = None
+        self.assertEqual(state.get_target_state(), WeightedAStarSolver.solve(state, linear_conflict, 3)[0])
+
+
+class AnytimeAStarTest(unittest.TestCase, Boards):
+    def setUp(self) -> None:
+        self.configure()
+
+    def test_solve_if_already_solved_then_returns_the_input_state(self):
+        self.assertEqual(self.solved, AnytimeAStarSolver.solve(self.solved)[0])
+
+    def test_solve_if_no_deadline_then_returns_optimal_solution(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved)[0]))
+        solved = AnytimeAStarSolver.solve(self.unsolved, linear_conflict, 5)[0]
+        self.assertEqual(self.unsolved.get_target_state(), solved)
+        self.assertEqual(expected, len(get_operators(solved)))
+
+    def test_solve_if_solutions_improve_then_publishes_shorter_ones_with_smaller_bounds(self):
+        solutions = []
+        AnytimeAStarSolver.solve(self.unsolved, manhattan_distance, 5,
+                                 on_solution=lambda solved, bound: solutions.append((solved, bound)))
+        lengths = [len(get_operators(solved)) for solved, _ in solutions]
+        bounds = [bound for _, bound in solutions]
+        self.assertEqual(sorted(lengths, reverse=True), lengths)
+        self.assertEqual(sorted(bounds, reverse=True), bounds)
+        self.assertEqual(1, bounds[-1])
+        self.assertTrue(all(bound <= 5 for bound in bounds))
+
+    def test_solve_if_deadline_passed_then_returns_the_best_solution_so_far(self):
+        state = State([[(row * 5 + col + 1) % 25 for col in range(5)] for row in range(5)])
+        for d in "LLUURRDLLLUURDRDLURRDDLLUU":
+            state = state.move(Direction(d))
+        state.parent = None
+        solved = AnytimeAStarSolver.solve(state, linear_conflict, 3, 0)[0]
+        self.assertEqual(state.get_target_state(), solved)
+
+    def test_iter_solutions_if_unsolved_then_yields_each_solution_before_the_search_is_over(self):
+        solutions = AnytimeAStarSolver.iter_solutions(self.unsolved, manhattan_distance, 5)
+        solved, bound = next(solutions)
+        self.assertEqual(self.unsolved.get_target_state(), solved)
+        self.assertLessEqual(bound, 5)
+        lengths = [len(get_operators(solved))] + [len(get_operators(solved)) for solved, _ in solutions]
+        self.assertEqual(len(get_operators(AStarSolver.solve(self.unsolved)[0])), lengths[-1])
+
+    def test_iter_solutions_if_last_pass_finds_no_shorter_solution_then_yields_it_again_with_bound_1(self):
+        state = State([[4, 3, 2], [8, 5, 1], [7, 0, 6]])
+        solutions = [(len(get_operators(solved)), bound)
+                     for solved, bound in AnytimeAStarSolver.iter_solutions(state, manhattan_distance, 2)]
+        self.assertEqual(2, len(solutions))
+        self.assertEqual(solutions[0][0], solutions[1][0])
+        self.assertGreater(solutions[0][1], 1)
+        self.assertEqual(1, solutions[1][1])
+
+    def test_solve_if_limit_reached_before_any_solution_then_raises_limit_reached(self):
+        with self.assertRaises(LimitReached):
+            AnytimeAStarSolver.solve(self.unsolved, manhattan_distance, 1, limits=SearchLimits(max_nodes=10))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from arena import NodeArena, NO_PARENT
+from state import State, Direction, OPERATORS
+
+
+class NodeArenaTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state = State([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+        self.arena = NodeArena(36)
+        root = self.arena.add(self.state.pack().key, 8)
+        left = self.state.move(Direction.LEFT).pack()
+        self.left = self.arena.add(left.key, 7, root, OPERATORS.index(Direction.LEFT), 1)
+        up = left.move(Direction.UP)
+        self.up = self.arena.add(up.key, 4, self.left, OPERATORS.index(Direction.UP), 2)
+
+    def test_add_if_called_then_returns_consecutive_indices(self):
+        self.assertEqual((1, 2), (self.left, self.up))
+        self.assertEqual(3, len(self.arena))
+
+    def test_add_if_no_parent_passed_then_node_is_a_root(self):
+        self.assertEqual(NO_PARENT, self.arena.parents[0])
+        self.assertEqual([], self.arena.get_operators(0))
+
+    def test_get_operators_if_nested_node_then_returns_operators_from_the_root(self):
+        self.assertEqual([Direction.LEFT, Direction.UP], self.arena.get_operators(self.up))
+
+    def test_materialise_if_nested_node_then_returns_state_with_correct_parent_chain(self):
+        result = self.arena.materialise(self.up, self.state)
+        self.assertEqual(self.state.move(Direction.LEFT).move(Direction.UP), result)
+        self.assertEqual(Direction.UP, result.operator)
+        self.assertIs(self.state, result.parent.parent)
+
+    def test_truncate_if_called_then_drops_the_following_nodes(self):
+        self.arena.truncate(self.left + 1)
+        self.assertEqual(2, len(self.arena))
+        self.assertEqual(2, len(self.arena.keys))
+
+    def test_init_if_key_does_not_fit_in_64_bits_then_stores_big_keys(self):
+        arena = NodeArena(125)
+        index = arena.add(1 << 100, 0)
+        self.assertEqual(1 << 100, arena.keys[index])
+
+
+if __name__ == '__main__':
+    unittest.main()
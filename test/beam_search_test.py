@@ -0,0 +1,76 @@
+import unittest
+
+from a_star import linear_conflict, manhattan_distance
+from beam_search import BeamSearchSolver
+from limits import SearchLimits, LimitReached
+from solver import get_operators
+from state import State, Direction
+
+
+class BeamSearchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.solved = State([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+        self.unsolved = State([
+            [7, 5, 4],
+            [0, 3, 2],
+            [8, 1, 6]
+        ])
+        self.puzzle25 = State([[(row * 5 + col + 1) % 25 for col in range(5)] for row in range(5)])
+        for d in "LLLLUUUURRRRDDDLLLUURRDDLULURDRULDLURDLLURRD":
+            self.puzzle25 = self.puzzle25.move(Direction(d)) or self.puzzle25
+        self.puzzle25.parent = None
+
+    def test_solve_if_already_solved_then_returns_the_input_state(self):
+        self.assertEqual((self.solved, 1, 0, 0), BeamSearchSolver.solve(self.solved))
+
+    def test_solve_if_is_not_solvable_then_raises_an_exception(self):
+        with self.assertRaises(Exception) as c:
+            BeamSearchSolver.solve(State([[1, 8, 2], [0, 4, 3], [6, 7, 5]]))
+        self.assertEqual("Not solvable", str(c.exception))
+
+    def test_solve_if_beam_width_is_0_then_raises_an_exception(self):
+        with self.assertRaises(Exception) as c:
+            BeamSearchSolver.solve(self.unsolved, manhattan_distance, 0)
+        self.assertEqual("Invalid beam width", str(c.exception))
+
+    def test_solve_if_one_step_from_target_state_then_returns_state_with_correct_parent_and_operator(self):
+        state = self.solved.move(Direction.UP)
+        solved = BeamSearchSolver.solve(state)[0]
+        self.assertEqual(state, solved.parent)
+        self.assertEqual(Direction.DOWN, solved.operator)
+
+    def test_solve_if_unsolved_then_the_operator_chain_leads_from_the_input_state_to_the_target_state(self):
+        solved = BeamSearchSolver.solve(self.puzzle25, linear_conflict, 100)[0]
+        operators = []
+        state = solved
+        while state.parent is not None:
+            operators.append(state.operator)
+            state = state.parent
+        self.assertIs(self.puzzle25, state)
+
+        result = self.puzzle25
+        for operator in reversed(operators):
+            result = result.move(operator)
+        self.assertEqual(self.puzzle25.get_target_state(), result)
+
+    def test_solve_if_wide_beam_then_the_solution_is_not_longer_than_with_a_narrow_one(self):
+        narrow = len(get_operators(BeamSearchSolver.solve(self.unsolved, manhattan_distance, 1, 0)[0]))
+        wide = len(get_operators(BeamSearchSolver.solve(self.unsolved, manhattan_distance, 1000, 0)[0]))
+        self.assertLessEqual(wide, narrow)
+
+    def test_solve_if_beam_width_is_fixed_then_explores_at_most_width_states_per_depth(self):
+        _, _, num_of_explored, max_depth = BeamSearchSolver.solve(self.puzzle25, manhattan_distance, 10, 0)
+        self.assertLessEqual(num_of_explored, 10 * max_depth)
+
+    def test_solve_if_node_limit_reached_then_raises_limit_reached_with_the_stats(self):
+        with self.assertRaises(LimitReached) as c:
+            BeamSearchSolver.solve(self.puzzle25, manhattan_distance, 100, limits=SearchLimits(max_nodes=50))
+        self.assertGreater(c.exception.num_of_visited, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 
-from bfs import BFSSolver
+from bfs import BFSSolver, BidirectionalBFSSolver, FrontierBFSSolver
+from solver import get_operators
 from solver_test import SolverTest
+from state import State, Direction
 
 
 class BFSTest(unittest.TestCase, SolverTest):
@@ -9,6 +11,63 @@ class BFSTest(unittest.TestCase, SolverTest):
         super().configure()
         self.solver = BFSSolver()
 
+    def test_solve_if_board_uses_a_bitset_explored_set_then_returns_solved_state(self):
+        state = State([
+            [1, 2, 0, 3, 5],
+            [6, 7, 8, 4, 9]
+        ])
+        solved, _, num_of_explored, _ = self.solver.solve(state, "RDLU")
+        self.assertEqual([Direction.RIGHT, Direction.DOWN, Direction.RIGHT], get_operators(solved))
+        self.assertGreater(num_of_explored, 0)
+
+
+class BidirectionalBFSTest(unittest.TestCase, SolverTest):
+    def setUp(self) -> None:
+        super().configure()
+        self.solver = BidirectionalBFSSolver()
+
+    def test_solve_if_unsolved_then_the_solution_is_as_short_as_the_bfs_one(self):
+        for order in ("RDLU", "ULDR", "DRUL"):
+            self.assertEqual(len(get_operators(BFSSolver.solve(self.unsolved, order)[0])),
+                             len(get_operators(self.solver.solve(self.unsolved, order)[0])))
+
+    def test_solve_if_15_puzzle_then_the_operator_chain_is_correct(self):
+        state = State([
+            [5, 1, 3, 4],
+            [9, 2, 7, 8],
+            [6, 0, 10, 11],
+            [13, 14, 15, 12]
+        ])
+        solution = get_operators(self.solver.solve(state, "LURD")[0])
+        self.assertEqual(len(get_operators(BFSSolver.solve(state, "LURD")[0])), len(solution))
+
+        for o in solution:
+            state = state.move(o)
+        self.assertEqual(state.get_target_state(), state)
+
+    def test_solve_if_unsolved_then_explores_fewer_states_than_bfs(self):
+        self.assertLess(self.solver.solve(self.unsolved, "RDLU")[2], BFSSolver.solve(self.unsolved, "RDLU")[2])
+
+
+class FrontierBFSTest(unittest.TestCase, SolverTest):
+    def setUp(self) -> None:
+        super().configure()
+        self.solver = FrontierBFSSolver()
+
+    def test_solve_if_unsolved_then_the_solution_is_as_short_as_the_bfs_one(self):
+        for order in ("RDLU", "ULDR"):
+            self.assertEqual(len(get_operators(BFSSolver.solve(self.unsolved, order)[0])),
+                             len(get_operators(self.solver.solve(self.unsolved, order)[0])))
+
+    def test_solve_if_unsolved_then_explores_every_state_at_most_once(self):
+        num_of_explored = self.solver.solve(self.unsolved, "RDLU")[2]
+        self.assertLessEqual(num_of_explored, BFSSolver.solve(self.unsolved, "RDLU")[2])
+
+    def test_get_layer_if_8_puzzle_goal_then_returns_the_known_layer_sizes(self):
+        target = self.solved.pack()
+        sizes = [len(self.solver.get_layer(target.geometry, "RDLU", (target.key, 8), depth)) for depth in range(10)]
+        self.assertEqual([1, 2, 4, 8, 16, 20, 39, 62, 116, 152], sizes)
+
 
 if __name__ == '__main__':
     unittest.main()
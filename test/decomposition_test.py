@@ -0,0 +1,83 @@
+import random
+import unittest
+
+from a_star import manhattan_distance
+from decomposition import DecompositionSolver
+from limits import SearchLimits, LimitReached
+from state import State, Direction
+
+
+def shuffle(width, height, seed):
+    generator = random.Random(seed)
+    board = list(range(width * height))
+    while True:
+        generator.shuffle(board)
+        state = State([board[row * width:(row + 1) * width] for row in range(height)])
+        if state.is_solvable():
+            return state
+
+
+class DecompositionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.solved = State([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+
+    def test_solve_if_already_solved_then_returns_the_input_state(self):
+        self.assertEqual(self.solved, DecompositionSolver.solve(self.solved)[0])
+
+    def test_solve_if_is_not_solvable_then_raises_an_exception(self):
+        with self.assertRaises(Exception) as c:
+            DecompositionSolver.solve(State([[1, 8, 2], [0, 4, 3], [6, 7, 5]]))
+        self.assertEqual("Not solvable", str(c.exception))
+
+    def test_solve_if_one_step_from_target_state_then_returns_state_with_correct_parent_and_operator(self):
+        state = self.solved.move(Direction.UP)
+        solved = DecompositionSolver.solve(state)[0]
+        self.assertEqual(state, solved.parent)
+        self.assertEqual(Direction.DOWN, solved.operator)
+
+    def test_solve_if_board_is_at_most_3x3_then_the_solution_is_optimal(self):
+        state = State([[7, 5, 4], [0, 3, 2], [8, 1, 6]])
+        self.assertEqual(17, DecompositionSolver.solve(state, manhattan_distance)[3])
+
+    def test_get_moves_if_boards_of_any_shape_then_the_moves_lead_to_the_target_state(self):
+        for width, height in [(2, 2), (2, 3), (3, 2), (4, 4), (5, 5), (4, 7), (7, 4), (2, 8), (8, 2), (6, 9)]:
+            for seed in range(5):
+                state = shuffle(width, height, seed)
+                moves = DecompositionSolver.get_moves(state)[0]
+                for move in moves:
+                    state = state.move(move)
+                self.assertEqual(state.get_target_state(), state, (width, height, seed))
+
+    def test_get_moves_if_large_board_then_returns_a_solution(self):
+        state = shuffle(30, 30, 0)
+        moves, _, _, max_depth = DecompositionSolver.get_moves(state)
+        board = list(state.board)
+        blank = board.index(0)
+        for move in moves:
+            target = state.geometry.move_targets[blank][move]
+            board[blank], board[target] = board[target], 0
+            blank = target
+        self.assertEqual(list(range(1, 900)) + [0], board)
+        self.assertEqual(len(moves), max_depth)
+
+    def test_iter_moves_if_large_board_then_yields_the_moves_in_batches_as_tiles_are_placed(self):
+        batches = DecompositionSolver.iter_moves(shuffle(10, 10, 0))
+        first = next(batches)
+        self.assertGreater(len(first), 0)
+        self.assertGreater(len(list(batches)), 50)
+
+    def test_get_moves_if_board_is_one_tile_wide_and_cannot_be_solved_then_returns_none(self):
+        self.assertIsNone(DecompositionSolver.get_moves(State([[3], [1], [2], [0]]))[0])
+
+    def test_get_moves_if_node_limit_reached_then_raises_limit_reached_with_the_stats(self):
+        with self.assertRaises(LimitReached) as c:
+            DecompositionSolver.get_moves(shuffle(10, 10, 0), limits=SearchLimits(max_nodes=100))
+        self.assertGreater(c.exception.num_of_visited, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
-from dfs import DFSSolver
+from a_star import AStarSolver
+from dfs import DFSSolver, IterativeDeepeningDFSSolver
+from solver import get_operators
 from solver_test import SolverTest
 
 
@@ -10,5 +12,22 @@ class DFSTest(unittest.TestCase, SolverTest):
         self.solver = DFSSolver()
 
 
+class IterativeDeepeningDFSTest(unittest.TestCase, SolverTest):
+    def setUp(self) -> None:
+        super().configure()
+        self.solver = IterativeDeepeningDFSSolver()
+
+    def test_solve_if_unsolved_then_returns_the_shortest_solution(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved)[0]))
+        for order in ("RDLU", "LURD", "DRUL"):
+            self.assertEqual(expected, len(get_operators(self.solver.solve(self.unsolved, order)[0])))
+
+    def test_solve_if_table_is_tiny_then_still_returns_the_shortest_solution(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved)[0]))
+        solved = self.solver.solve(self.unsolved, "RDLU", 8)[0]
+        self.assertEqual(self.unsolved.get_target_state(), solved)
+        self.assertEqual(expected, len(get_operators(solved)))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from bfs import BFSSolver
+from distance_table import DistanceTable, DistanceTableSolver
+from limits import SearchLimits, LimitReached
+from solver import get_operators
+from state import State, Direction
+
+
+class DistanceTableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.unsolved = State([
+            [5, 0, 1, 3],
+            [2, 7, 4, 6]
+        ])
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_build_if_goal_state_then_distance_is_0(self):
+        table = DistanceTable.build(3, 2)
+        self.assertEqual(0, table.get_distance((1, 2, 3, 4, 5, 0)))
+        self.assertIsNone(table.get_move((1, 2, 3, 4, 5, 0)))
+
+    def test_build_if_not_solvable_then_distance_is_unknown(self):
+        self.assertIsNone(DistanceTable.build(3, 2).get_distance((2, 1, 3, 4, 5, 0)))
+
+    def test_build_if_board_is_too_large_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            DistanceTable.build(4, 4)
+
+    def test_build_if_timeout_passed_then_raises_limit_reached(self):
+        with self.assertRaises(LimitReached) as c:
+            DistanceTable.build(4, 2, SearchLimits(timeout=0))
+        self.assertEqual('timeout', c.exception.reason)
+
+    def test_get_distance_if_solvable_then_equals_bfs_solution_length(self):
+        table = DistanceTable.build(4, 2)
+        state = self.unsolved
+        for d in "LDRRULDL":
+            state = state.move(Direction(d)) or state
+            state.parent = None
+            expected = len(get_operators(BFSSolver.solve(state, "LRUD")[0]))
+            self.assertEqual(expected, table.get_distance(state.board))
+
+    def test_load_or_build_if_called_twice_then_loads_the_saved_table(self):
+        table = DistanceTable.load_or_build(4, 2, self.directory.name)
+        self.assertEqual(['distances_4x2.bin'], os.listdir(self.directory.name))
+        loaded = DistanceTable.load_or_build(4, 2, self.directory.name)
+        self.assertEqual(bytes(table.table[table.offset:]), loaded.table[loaded.offset:])
+
+    def test_solve_if_unsolved_then_returns_optimal_solution(self):
+        solved = DistanceTableSolver.solve(self.unsolved, self.directory.name)[0]
+        self.assertEqual(self.unsolved.get_target_state(), solved)
+        self.assertEqual(len(get_operators(BFSSolver.solve(self.unsolved, "LRUD")[0])), len(get_operators(solved)))
+
+    def test_solve_if_already_solved_then_returns_the_input_state(self):
+        state = self.unsolved.get_target_state()
+        self.assertEqual((state, 1, 0, 0), DistanceTableSolver.solve(state, self.directory.name))
+
+    def test_solve_if_not_solvable_then_raises_an_exception(self):
+        with self.assertRaises(Exception) as c:
+            DistanceTableSolver.solve(State([[2, 1, 3, 4], [5, 6, 7, 0]]), self.directory.name)
+        self.assertEqual("Not solvable", str(c.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from explored_set import BitsetExploredSet, create_explored_set
+from state import State, Direction
+
+
+class BitsetExploredSetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state = State([
+            [1, 2, 3, 4, 5],
+            [6, 7, 8, 9, 0]
+        ]).pack()
+        self.explored = BitsetExploredSet(5, 2)
+
+    def test_contains_if_key_not_added_then_returns_false(self):
+        self.assertNotIn(self.state.key, self.explored)
+
+    def test_add_if_key_added_then_contains_only_it(self):
+        self.explored.add(self.state.key)
+        self.assertIn(self.state.key, self.explored)
+        self.assertNotIn(self.state.move(Direction.LEFT).key, self.explored)
+
+    def test_add_if_key_added_twice_then_counts_it_once(self):
+        self.explored.add(self.state.key)
+        self.explored.add(self.state.key)
+        self.explored.add(self.state.move(Direction.UP).key)
+        self.assertEqual(2, len(self.explored))
+
+    def test_add_if_few_keys_added_then_the_bitset_is_not_allocated(self):
+        self.explored.add(self.state.key)
+        self.assertIsNone(self.explored.bitset)
+
+    def test_add_if_more_keys_than_the_set_holds_then_moves_them_to_the_bitset(self):
+        explored = BitsetExploredSet(5, 2)
+        explored.max_set_size = 1
+        keys = [self.state.key, self.state.move(Direction.UP).key, self.state.move(Direction.LEFT).key]
+        for key in keys:
+            explored.add(key)
+        self.assertIsNotNone(explored.bitset)
+        self.assertTrue(all(key in explored for key in keys))
+        self.assertNotIn(self.state.move(Direction.LEFT).move(Direction.LEFT).key, explored)
+        self.assertEqual(3, len(explored))
+
+    def test_create_explored_set_if_board_has_10_to_12_tiles_then_returns_bitset(self):
+        self.assertIsInstance(create_explored_set(self.state), BitsetExploredSet)
+
+    def test_create_explored_set_if_board_is_small_then_returns_set(self):
+        self.assertIsInstance(create_explored_set(State([[1, 2, 3], [4, 5, 6], [7, 8, 0]])), set)
+
+
+if __name__ == '__main__':
+    unittest.main()
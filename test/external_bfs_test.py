@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from external_bfs import ExternalBFS, subtract
+
+
+class ExternalBFSTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_subtract_if_keys_repeat_or_are_excluded_then_yields_each_remaining_key_once(self):
+        self.assertEqual([1, 4, 9], list(subtract([1, 1, 2, 4, 4, 7, 9], [0, 2, 3], [7, 8])))
+
+    def test_run_if_8_puzzle_then_returns_the_known_layer_sizes(self):
+        histogram = ExternalBFS(3, 3, self.directory.name).run(9)
+        self.assertEqual([1, 2, 4, 8, 16, 20, 39, 62, 116, 152], histogram)
+
+    def test_run_if_exhausted_then_counts_every_reachable_state(self):
+        histogram = ExternalBFS(3, 2, self.directory.name, run_size=16).run()
+        self.assertEqual(360, sum(histogram))
+        self.assertEqual(22, len(histogram))
+
+    def test_run_if_resumed_then_returns_the_same_histogram_as_an_uninterrupted_run(self):
+        expected = ExternalBFS(4, 2, os.path.join(self.directory.name, 'a')).run()
+        search = ExternalBFS(4, 2, os.path.join(self.directory.name, 'b'), run_size=100)
+        search.run(10)
+        # An interrupted expansion leaves runs and temporary files behind
+        with open(search.get_layer_path(11) + '.tmp', 'wb') as file:
+            file.write(b'\x00\x01')
+        self.assertEqual(expected, search.run())
+
+    def test_run_if_pattern_passed_then_counts_every_placement_of_the_pattern_and_the_blank(self):
+        histogram = ExternalBFS(3, 3, self.directory.name, tiles=(1, 2, 3)).run()
+        self.assertEqual(9 * 8 * 7 * 6, sum(histogram))
+
+    def test_run_if_directory_holds_another_search_then_raises_value_error(self):
+        ExternalBFS(3, 2, self.directory.name).run(2)
+        with self.assertRaises(ValueError):
+            ExternalBFS(3, 2, self.directory.name, tiles=(1, 2)).run()
+
+    def test_read_layer_if_layer_written_then_keys_are_sorted(self):
+        search = ExternalBFS(3, 3, self.directory.name)
+        search.run(6)
+        keys = list(search.read_layer(6))
+        self.assertEqual(sorted(set(keys)), keys)
+
+
+if __name__ == '__main__':
+    unittest.main()
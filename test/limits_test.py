@@ -0,0 +1,58 @@
+import threading
+import unittest
+
+from limits import SearchLimits, LimitReached, CHECK_INTERVAL, get_resident_memory
+
+
+class SearchLimitsTest(unittest.TestCase):
+    def test_check_if_no_limits_then_does_not_raise(self):
+        limits = SearchLimits()
+        for i in range(2 * CHECK_INTERVAL):
+            limits.check(i, i, i, i)
+
+    def test_check_if_too_many_nodes_then_raises_limit_reached_with_the_stats(self):
+        with self.assertRaises(LimitReached) as c:
+            SearchLimits(max_nodes=10).check(11, 5, 3)
+        self.assertEqual('nodes', c.exception.reason)
+        self.assertEqual((11, 5, 3), c.exception.get_stats())
+
+    def test_check_if_frontier_too_large_then_raises_limit_reached(self):
+        with self.assertRaises(LimitReached) as c:
+            SearchLimits(max_frontier=10).check(1, 1, 1, 11)
+        self.assertEqual('frontier', c.exception.reason)
+
+    def test_check_if_deadline_passed_then_raises_limit_reached_within_the_check_interval(self):
+        limits = SearchLimits(timeout=0)
+        with self.assertRaises(LimitReached) as c:
+            for i in range(CHECK_INTERVAL):
+                limits.check(i, i, 0)
+        self.assertEqual('timeout', c.exception.reason)
+        self.assertEqual(CHECK_INTERVAL - 1, c.exception.num_of_visited)
+
+    def test_check_resources_if_cancel_event_set_then_raises_limit_reached(self):
+        event = threading.Event()
+        limits = SearchLimits(cancel_event=event)
+        limits.check_resources(0, 0, 0)
+        event.set()
+        with self.assertRaises(LimitReached) as c:
+            limits.check_resources(0, 0, 0)
+        self.assertEqual('cancelled', c.exception.reason)
+
+    def test_check_resources_if_memory_over_the_limit_then_raises_limit_reached(self):
+        with self.assertRaises(LimitReached) as c:
+            SearchLimits(max_memory=1).check_resources(0, 0, 0)
+        self.assertEqual('memory', c.exception.reason)
+
+    def test_check_allocation_if_table_does_not_fit_in_the_memory_limit_then_raises_limit_reached(self):
+        limits = SearchLimits(max_memory=get_resident_memory() + (64 << 20))
+        limits.check_allocation(1 << 20)
+        with self.assertRaises(LimitReached) as c:
+            limits.check_allocation(128 << 20)
+        self.assertEqual('memory', c.exception.reason)
+
+    def test_get_resident_memory_if_called_then_returns_a_positive_number_of_bytes(self):
+        self.assertGreater(get_resident_memory(), 1 << 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
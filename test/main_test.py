@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+
+from a_star import manhattan_distance
+from main import get_parameters, get_puzzle_id, parse_batch_args, parse_limit_args, run, run_batch
+from limits import SearchLimits
+
+
+class MainTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.puzzles = os.path.join(self.directory.name, 'puzzles')
+        os.makedirs(self.puzzles)
+        with open(os.path.join(self.puzzles, '3x3_01_00001.txt'), 'w') as file:
+            file.write('3 3\n1 2 3\n4 5 6\n7 0 8\n')
+        with open(os.path.join(self.puzzles, '3x3_02_00002.txt'), 'w') as file:
+            file.write('3 3\n1 2 3\n4 5 6\n0 7 8\n')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def read(self, *path):
+        with open(os.path.join(self.directory.name, *path), 'r') as file:
+            return file.read()
+
+    def test_get_puzzle_id_if_research_file_name_then_returns_min_moves_and_id(self):
+        self.assertEqual(('7', '212'), get_puzzle_id('puzzles/4x4_07_00212.txt'))
+
+    def test_get_parameters_if_weighted_strategy_then_returns_the_heuristic_and_the_numbers(self):
+        self.assertEqual([manhattan_distance, 3.0, 1.5], get_parameters('arastr', 'manh:3:1.5'))
+        self.assertEqual(['RDUL'], get_parameters('bfs', 'RDUL'))
+
+    def test_parse_batch_args_if_combination_without_parameter_then_returns_none(self):
+        self.assertIsNone(parse_batch_args(['puzzles', 'out', 'stats.csv', 'bfs']))
+
+    def test_parse_batch_args_if_workers_passed_then_returns_them(self):
+        self.assertEqual(('puzzles', 'out', 'stats.csv', [('bfs', 'RDUL')], 2),
+                         parse_batch_args(['--workers', '2', 'puzzles', 'out', 'stats.csv', 'bfs:RDUL']))
+
+    def test_parse_limit_args_if_limits_passed_then_returns_them_and_the_remaining_args(self):
+        self.assertEqual(({'timeout': 1.5, 'max_nodes': 1000, 'max_memory': 64 << 20}, ['bfs', 'RDUL']),
+                         parse_limit_args(['--timeout', '1.5', '--max-nodes', '1000', '--max-memory', '64',
+                                           'bfs', 'RDUL']))
+
+    def test_parse_limit_args_if_invalid_value_then_returns_none(self):
+        self.assertIsNone(parse_limit_args(['--max-nodes', 'many', 'bfs']))
+
+    def test_run_if_limit_reached_then_writes_status_2_and_the_partial_stats(self):
+        solution_file = os.path.join(self.directory.name, 'sol.txt')
+        stats_file = os.path.join(self.directory.name, 'stats.txt')
+        with open(os.path.join(self.puzzles, 'hard.txt'), 'w') as file:
+            file.write('3 3\n7 5 4\n0 3 2\n8 1 6\n')
+        run('bfs', 'RDUL', os.path.join(self.puzzles, 'hard.txt'), solution_file, stats_file,
+            SearchLimits(max_nodes=100))
+        self.assertEqual('-2', self.read('sol.txt'))
+        stats = self.read('stats.txt').split('\n')
+        self.assertEqual('-2', stats[0])
+        self.assertGreater(int(stats[1]), 100)
+        self.assertGreater(float(stats[4]), 0)
+
+    def test_run_if_solvable_then_writes_solution_and_stats_files(self):
+        solution_file = os.path.join(self.directory.name, 'sol.txt')
+        stats_file = os.path.join(self.directory.name, 'stats.txt')
+        run('astr', 'manh', os.path.join(self.puzzles, '3x3_02_00002.txt'), solution_file, stats_file)
+        self.assertEqual('2\nRR', self.read('sol.txt'))
+        stats = self.read('stats.txt').split('\n')
+        self.assertEqual(5, len(stats))
+        self.assertEqual(('2', '2'), (stats[0], stats[3]))
+
+    def test_run_if_anytime_strategy_then_writes_the_optimal_solution(self):
+        solution_file = os.path.join(self.directory.name, 'sol.txt')
+        stats_file = os.path.join(self.directory.name, 'stats.txt')
+        run('arastr', 'manh:3:10', os.path.join(self.puzzles, '3x3_02_00002.txt'), solution_file, stats_file)
+        self.assertEqual('2\nRR', self.read('sol.txt'))
+
+    def test_run_if_decomposition_strategy_then_writes_the_moves(self):
+        solution_file = os.path.join(self.directory.name, 'sol.txt')
+        stats_file = os.path.join(self.directory.name, 'stats.txt')
+        run('decomp', 'manh', os.path.join(self.puzzles, '3x3_02_00002.txt'), solution_file, stats_file)
+        self.assertEqual('2\nRR', self.read('sol.txt'))
+
+    def test_run_if_streaming_then_writes_the_moves_first_and_the_status_last(self):
+        solution_file = os.path.join(self.directory.name, 'sol.txt')
+        stats_file = os.path.join(self.directory.name, 'stats.txt')
+        run('decomp', 'manh', os.path.join(self.puzzles, '3x3_02_00002.txt'), solution_file, stats_file,
+            stream=True)
+        self.assertEqual('RR\n2\n', self.read('sol.txt'))
+        self.assertEqual('2', self.read('stats.txt').split('\n')[0])
+
+    def test_run_if_streaming_anytime_strategy_then_writes_every_better_solution_on_its_own_line(self):
+        solution_file = os.path.join(self.directory.name, 'sol.txt')
+        stats_file = os.path.join(self.directory.name, 'stats.txt')
+        run('arastr', 'manh:3', os.path.join(self.puzzles, '3x3_02_00002.txt'), solution_file, stats_file,
+            stream=True)
+        lines = self.read('sol.txt').split('\n')
+        self.assertEqual(['RR', '2', ''], lines[-3:])
+
+    def test_run_if_streaming_and_limit_reached_then_ends_with_status_2(self):
+        solution_file = os.path.join(self.directory.name, 'sol.txt')
+        stats_file = os.path.join(self.directory.name, 'stats.txt')
+        with open(os.path.join(self.puzzles, 'hard.txt'), 'w') as file:
+            file.write('3 3\n7 5 4\n0 3 2\n8 1 6\n')
+        run('bfs', 'RDUL', os.path.join(self.puzzles, 'hard.txt'), solution_file, stats_file,
+            SearchLimits(max_nodes=100), stream=True)
+        self.assertEqual('\n-2\n', self.read('sol.txt'))
+
+    def test_run_batch_if_directory_passed_then_writes_one_csv_line_per_job(self):
+        output = os.path.join(self.directory.name, 'out')
+        combined = os.path.join(self.directory.name, 'stats.csv')
+        run_batch(self.puzzles, output, combined, [('bfs', 'RDUL'), ('astr', 'manh')], workers=2)
+
+        lines = [line.split(' ') for line in self.read('stats.csv').splitlines()]
+        self.assertEqual([['1', '1', 'bfs', 'rdul'], ['1', '1', 'astr', 'manh'],
+                          ['2', '2', 'bfs', 'rdul'], ['2', '2', 'astr', 'manh']], [line[:4] for line in lines])
+        self.assertTrue(all(len(line) == 9 for line in lines))
+        self.assertEqual('2\nRR', self.read('out', '3x3_02_00002_astr_manh_sol.txt'))
+
+    def test_run_batch_if_manifest_passed_then_solves_the_listed_puzzles(self):
+        manifest = os.path.join(self.directory.name, 'manifest.txt')
+        with open(manifest, 'w') as file:
+            file.write('puzzles/3x3_02_00002.txt\n')
+        lines = run_batch(manifest, os.path.join(self.directory.name, 'out'),
+                          os.path.join(self.directory.name, 'stats.csv'), [('dfs', 'LURD')], workers=1)
+        self.assertEqual(1, len(lines))
+        self.assertTrue(lines[0].startswith('2 2 dfs lurd '))
+
+    def test_run_batch_if_limit_options_passed_then_every_job_gets_its_own_limits(self):
+        lines = run_batch(self.puzzles, os.path.join(self.directory.name, 'out'),
+                          os.path.join(self.directory.name, 'stats.csv'), [('bfs', 'RDUL')], workers=1,
+                          limit_options={'max_nodes': 1})
+        self.assertEqual(['1', '-2'], [line.split(' ')[4] for line in lines])
+
+
+if __name__ == '__main__':
+    unittest.main()
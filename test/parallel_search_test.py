@@ -0,0 +1,132 @@
+import itertools
+import multiprocessing
+import unittest
+
+from a_star import AStarSolver, hamming_distance, linear_conflict, walking_distance
+from limits import SearchLimits, LimitReached
+from parallel_search import ParallelAStarSolver, ParallelIDAStarSolver, get_owner, search_subtree
+from solver import get_operators
+from state import State, Direction, pack_board
+
+
+def failing_heuristic(state):
+    # Only fails in the worker processes, the root is evaluated by the parent
+    if multiprocessing.parent_process() is not None:
+        raise ValueError("Heuristic failed")
+    return 0
+
+
+class ParallelAStarTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.solved = State([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+        self.unsolved = State([
+            [7, 5, 4],
+            [0, 3, 2],
+            [8, 1, 6]
+        ])
+
+    def test_get_owner_if_called_then_returns_a_worker_index(self):
+        self.assertEqual({0, 1, 2}, {get_owner(key, 3) for key in range(100)})
+
+    def test_get_owner_if_keys_share_the_first_tile_then_they_are_spread_evenly_over_the_workers(self):
+        counts = [0] * 4
+        for tiles in itertools.islice(itertools.permutations(range(1, 16)), 4000):
+            counts[get_owner(pack_board((0,) + tiles, 4), 4)] += 1
+        self.assertTrue(all(800 < count < 1200 for count in counts), counts)
+
+    def test_solve_if_is_not_solvable_then_raises_an_exception(self):
+        with self.assertRaises(Exception) as c:
+            ParallelAStarSolver.solve(State([[1, 8, 2], [0, 4, 3], [6, 7, 5]]), workers=2)
+        self.assertEqual("Not solvable", str(c.exception))
+
+    def test_solve_if_already_solved_then_returns_the_input_state(self):
+        self.assertEqual(self.solved, ParallelAStarSolver.solve(self.solved, workers=2)[0])
+
+    def test_solve_if_one_step_from_target_state_then_returns_state_with_correct_parent_and_operator(self):
+        state = self.solved.move(Direction.UP)
+        solved = ParallelAStarSolver.solve(state, workers=2)[0]
+        self.assertEqual(state, solved.parent)
+        self.assertEqual(Direction.DOWN, solved.operator)
+
+    def test_solve_if_unsolved_then_returns_optimal_solution(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved)[0]))
+        for workers in (1, 3):
+            solved = ParallelAStarSolver.solve(self.unsolved, linear_conflict, workers)[0]
+            self.assertEqual(self.unsolved.get_target_state(), solved)
+            self.assertEqual(expected, len(get_operators(solved)))
+
+    def test_solve_if_unsolved_then_the_oldest_ancestor_of_the_result_state_is_the_input_state(self):
+        state = ParallelAStarSolver.solve(self.unsolved, workers=2)[0]
+        while state.parent is not None:
+            state = state.parent
+        self.assertIs(self.unsolved, state)
+
+    def test_solve_if_unsolved_then_returns_stats_of_all_workers(self):
+        _, num_of_visited, num_of_explored, max_depth = ParallelAStarSolver.solve(self.unsolved, workers=2)
+        self.assertGreater(num_of_visited, num_of_explored)
+        self.assertGreaterEqual(max_depth, len(get_operators(AStarSolver.solve(self.unsolved)[0])))
+
+    def test_solve_if_a_worker_fails_then_raises_an_exception(self):
+        with self.assertRaises(Exception) as c:
+            ParallelAStarSolver.solve(self.unsolved, failing_heuristic, 2)
+        self.assertIn("exited with code", str(c.exception))
+
+    def test_solve_if_deadline_passed_then_raises_limit_reached(self):
+        with self.assertRaises(LimitReached) as c:
+            ParallelAStarSolver.solve(self.unsolved, hamming_distance, 2, SearchLimits(timeout=0))
+        self.assertEqual('timeout', c.exception.reason)
+
+
+class ParallelIDAStarTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.solved = State([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+        self.unsolved = State([
+            [7, 5, 4],
+            [0, 3, 2],
+            [8, 1, 6]
+        ])
+
+    def test_solve_if_is_not_solvable_then_raises_an_exception(self):
+        with self.assertRaises(Exception) as c:
+            ParallelIDAStarSolver.solve(State([[1, 8, 2], [0, 4, 3], [6, 7, 5]]), workers=2)
+        self.assertEqual("Not solvable", str(c.exception))
+
+    def test_solve_if_already_solved_then_returns_the_input_state(self):
+        self.assertEqual((self.solved, 1, 0, 0), ParallelIDAStarSolver.solve(self.solved, workers=2))
+
+    def test_solve_if_unsolved_then_returns_optimal_solution(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved)[0]))
+        for heuristic in (linear_conflict, walking_distance):
+            solved = ParallelIDAStarSolver.solve(self.unsolved, heuristic, 2)[0]
+            self.assertEqual(self.unsolved.get_target_state(), solved)
+            self.assertEqual(expected, len(get_operators(solved)))
+
+    def test_solve_if_unsolved_then_the_oldest_ancestor_of_the_result_state_is_the_input_state(self):
+        state = ParallelIDAStarSolver.solve(self.unsolved, workers=2)[0]
+        while state.parent is not None:
+            state = state.parent
+        self.assertIs(self.unsolved, state)
+
+    def test_solve_if_node_limit_reached_then_raises_limit_reached_with_the_stats(self):
+        with self.assertRaises(LimitReached) as c:
+            ParallelIDAStarSolver.solve(self.unsolved, hamming_distance, 2, SearchLimits(max_nodes=100))
+        self.assertEqual('nodes', c.exception.reason)
+        self.assertGreater(c.exception.num_of_visited, 100)
+
+    def test_search_subtree_if_bound_too_small_then_returns_the_next_bound(self):
+        operators, next_bound, _, num_of_explored, _ = search_subtree(self.unsolved.board, 3, [], 0, linear_conflict)
+        self.assertIsNone(operators)
+        self.assertEqual(linear_conflict(self.unsolved), next_bound)
+        self.assertEqual(0, num_of_explored)
+
+
+if __name__ == '__main__':
+    unittest.main()
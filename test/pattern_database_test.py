@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from state import State, Direction
+from a_star import AStarSolver, manhattan_distance
+from limits import SearchLimits, LimitReached
+from pattern_database import PatternDatabase, AdditivePatternDatabase, rank_placement, unrank_placement
+from solver import get_operators
+
+
+class PatternDatabaseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.partition = ((1, 2, 3, 4), (5, 6, 7, 8))
+        self.heuristic = AdditivePatternDatabase.load_or_build(3, 3, self.partition, self.directory.name)
+        self.unsolved = State([
+            [7, 5, 4],
+            [0, 3, 2],
+            [8, 1, 6]
+        ])
+
+    def tearDown(self) -> None:
+        self.heuristic = None
+        self.directory.cleanup()
+
+    def test_unrank_placement_if_ranked_placement_passed_then_returns_the_original_placement(self):
+        for positions in ([0, 1, 2], [8, 0, 4], [3, 7, 5]):
+            self.assertEqual(positions, unrank_placement(rank_placement(positions, 9), 9, 3))
+
+    def test_rank_placement_if_all_placements_ranked_then_ranks_are_dense(self):
+        ranks = {rank_placement([a, b], 4) for a in range(4) for b in range(4) if a != b}
+        self.assertEqual(set(range(12)), ranks)
+
+    def test_build_if_pattern_is_in_place_then_distance_is_0(self):
+        database = PatternDatabase.build(3, 3, (1, 2, 3))
+        self.assertEqual(0, database.get_distance([8, 0, 1, 2, 3, 4, 5, 6, 7]))
+
+    def test_build_if_timeout_passed_then_raises_limit_reached(self):
+        with self.assertRaises(LimitReached) as c:
+            PatternDatabase.build(3, 3, (1, 2, 3, 4), SearchLimits(timeout=0))
+        self.assertEqual('timeout', c.exception.reason)
+
+    def test_build_if_table_is_larger_than_the_memory_limit_then_raises_limit_reached_before_allocating_it(self):
+        with self.assertRaises(LimitReached) as c:
+            PatternDatabase.build(10, 10, (1, 2, 3, 4), SearchLimits(max_memory=1 << 30))
+        self.assertEqual('memory', c.exception.reason)
+
+    def test_load_or_build_if_called_then_writes_one_file_per_pattern(self):
+        self.assertEqual(2, len(os.listdir(self.directory.name)))
+
+    def test_load_or_build_if_invalid_partition_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            AdditivePatternDatabase.load_or_build(3, 3, ((1, 2, 3), (5, 6, 7, 8)), self.directory.name)
+
+    def test_load_if_saved_then_returns_the_same_distances(self):
+        database = PatternDatabase.build(3, 3, (1, 2, 3))
+        path = os.path.join(self.directory.name, 'pdb.bin')
+        database.save(path)
+        loaded = PatternDatabase.load(path)
+        self.assertEqual((3, 3, (1, 2, 3)), (loaded.width, loaded.height, loaded.tiles))
+        self.assertEqual(bytes(database.table), loaded.table[loaded.offset:])
+
+    def test_call_if_solved_then_returns_0(self):
+        self.assertEqual(0, self.heuristic(self.unsolved.get_target_state()))
+
+    def test_call_if_unsolved_then_is_not_less_than_manhattan_distance(self):
+        state = self.unsolved
+        for d in "RDLLUURRDLDR":
+            state = state.move(Direction(d)) or state
+            self.assertGreaterEqual(self.heuristic(state), manhattan_distance(state))
+
+    def test_delta_if_tile_moved_then_matches_full_evaluation(self):
+        state = self.unsolved
+        state.heuristic_value = self.heuristic(state)
+        for d in "RDLLUURRDLDR":
+            state = state.move(Direction(d), self.heuristic.delta) or state
+            self.assertEqual(self.heuristic(state), state.heuristic_value)
+
+    def test_call_if_unsolved_then_does_not_overestimate(self):
+        solved = AStarSolver.solve(self.unsolved, manhattan_distance)[0]
+        self.assertLessEqual(self.heuristic(self.unsolved), len(get_operators(solved)))
+
+    def test_solve_if_pattern_database_heuristic_then_returns_optimal_solution(self):
+        expected = len(get_operators(AStarSolver.solve(self.unsolved, manhattan_distance)[0]))
+        solved = AStarSolver.solve(self.unsolved, self.heuristic)[0]
+        self.assertEqual(self.unsolved.get_target_state(), solved)
+        self.assertEqual(expected, len(get_operators(solved)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from priority_queue import BucketQueue, HeapQueue
+
+
+class PriorityQueueTest:
+    def test_pop_if_empty_then_raises_index_error(self):
+        self.assertRaises(IndexError, self.queue.pop)
+
+    def test_pop_if_different_priorities_then_returns_the_lowest_one_first(self):
+        self.queue.push(5, 0, 'a')
+        self.queue.push(3, 0, 'b')
+        self.queue.push(4, 0, 'c')
+        self.assertEqual([(3, 0, 'b'), (4, 0, 'c'), (5, 0, 'a')], [self.queue.pop() for _ in range(3)])
+
+    def test_pop_if_equal_priorities_then_returns_the_deepest_node_first(self):
+        self.queue.push(4, 1, 'a')
+        self.queue.push(4, 3, 'b')
+        self.queue.push(4, 2, 'c')
+        self.assertEqual(['b', 'c', 'a'], [self.queue.pop()[2] for _ in range(3)])
+
+    def test_push_if_lower_priority_than_already_popped_then_it_is_popped_next(self):
+        self.queue.push(6, 0, 'a')
+        self.queue.push(7, 0, 'b')
+        self.queue.pop()
+        self.queue.push(2, 0, 'c')
+        self.assertEqual('c', self.queue.pop()[2])
+
+    def test_len_if_pushed_and_popped_then_returns_the_number_of_items_left(self):
+        for i in range(5):
+            self.queue.push(i, i, i)
+        self.queue.pop()
+        self.assertEqual(4, len(self.queue))
+
+
+class BucketQueueTest(unittest.TestCase, PriorityQueueTest):
+    def setUp(self) -> None:
+        self.queue = BucketQueue()
+
+    def test_pop_if_equal_priority_and_depth_then_returns_the_last_pushed_item_first(self):
+        self.queue.push(4, 2, 'a')
+        self.queue.push(4, 2, 'b')
+        self.assertEqual('b', self.queue.pop()[2])
+
+
+class HeapQueueTest(unittest.TestCase, PriorityQueueTest):
+    def setUp(self) -> None:
+        self.queue = HeapQueue()
+
+
+if __name__ == '__main__':
+    unittest.main()
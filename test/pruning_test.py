@@ -0,0 +1,66 @@
+import unittest
+
+from pruning import MovePruner, REVERSAL_PRUNER, START, PRUNED, get_learned_pruner
+from state import State, Direction, OPERATORS
+
+LEFT, RIGHT, UP, DOWN = (OPERATORS.index(direction) for direction in Direction)
+
+
+def get_distances(state, depth_limit, pruner=None):
+    # Shortest depth at which every state is reached by a tree search, without any duplicate detection
+    distances = {}
+    stack = [(state, 0)]
+    while len(stack) > 0:
+        node, depth = stack.pop()
+        if distances.get(node.board, depth + 1) > depth:
+            distances[node.board] = depth
+        if depth < depth_limit:
+            stack.extend((neighbour, depth + 1) for neighbour in node.get_neighbours("LRUD", None, pruner))
+    return distances
+
+
+class MovePrunerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state = State([
+            [1, 2, 3],
+            [4, 0, 5],
+            [7, 8, 6]
+        ])
+
+    def test_get_next_if_reversal_then_returns_pruned(self):
+        for operator, opposite in ((LEFT, RIGHT), (RIGHT, LEFT), (UP, DOWN), (DOWN, UP)):
+            self.assertEqual(PRUNED, REVERSAL_PRUNER.get_next(REVERSAL_PRUNER.get_next(START, operator), opposite))
+
+    def test_get_next_if_not_reversal_then_does_not_prune(self):
+        state = START
+        for operator in (LEFT, UP, RIGHT, RIGHT, DOWN, LEFT):
+            state = REVERSAL_PRUNER.get_next(state, operator)
+            self.assertNotEqual(PRUNED, state)
+
+    def test_init_if_sequence_is_a_suffix_then_prunes_it_after_any_prefix(self):
+        pruner = MovePruner([(UP, LEFT, DOWN)])
+        state = START
+        for operator in (LEFT, LEFT, UP, LEFT):
+            state = pruner.get_next(state, operator)
+        self.assertEqual(PRUNED, pruner.get_next(state, DOWN))
+
+    def test_learn_if_length_2_then_learns_reversals(self):
+        self.assertEqual(sorted(REVERSAL_PRUNER.sequences), sorted(MovePruner.learn(2).sequences))
+
+    def test_learn_if_length_6_then_prunes_half_of_a_2x2_cycle(self):
+        sequences = MovePruner.learn(6).sequences
+        self.assertIn((UP, LEFT, DOWN, RIGHT, UP, LEFT), sequences)
+        self.assertNotIn((LEFT, UP, RIGHT, DOWN, LEFT, UP), sequences)
+
+    def test_get_neighbours_if_pruner_passed_then_skips_the_reversal(self):
+        left = self.state.get_neighbours("LRUD", None, REVERSAL_PRUNER)[0]
+        self.assertEqual(Direction.LEFT, left.operator)
+        self.assertEqual([Direction.UP, Direction.DOWN],
+                         [neighbour.operator for neighbour in left.get_neighbours("LRUD", None, REVERSAL_PRUNER)])
+
+    def test_get_neighbours_if_learned_pruner_then_still_reaches_every_state_at_its_distance(self):
+        self.assertEqual(get_distances(self.state, 8), get_distances(self.state, 8, get_learned_pruner()))
+
+
+if __name__ == '__main__':
+    unittest.main()
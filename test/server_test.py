@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import signal
+import tempfile
+import unittest
+import unittest.mock
+
+from a_star import get_walking_distance_table
+from server import SolveServer, get_limit_options, initialize_worker, parse_preload, parse_server_args, \
+    solve_request
+
+UNSOLVED = [[7, 5, 4], [0, 3, 2], [8, 1, 6]]
+
+
+class ServerFunctionsTest(unittest.TestCase):
+    def test_solve_request_if_solvable_then_returns_the_solution_and_the_stats(self):
+        reply = solve_request('astr', 'manh', [[1, 2, 3], [4, 5, 6], [0, 7, 8]], {})
+        self.assertEqual((2, 'RR', 2), (reply['status'], reply['solution'], reply['max_depth']))
+        self.assertGreater(reply['visited'], 0)
+
+    def test_solve_request_if_limit_reached_then_returns_status_2_and_the_partial_stats(self):
+        reply = solve_request('bfs', 'RDUL', UNSOLVED, {'max_nodes': 100})
+        self.assertEqual((-2, None), (reply['status'], reply['solution']))
+        self.assertGreater(reply['visited'], 100)
+
+    def test_solve_request_if_board_is_invalid_then_returns_status_1_and_the_error(self):
+        reply = solve_request('astr', 'manh', [[1, 2], [3, 3]], {})
+        self.assertEqual(-1, reply['status'])
+        self.assertIn('Invalid board', reply['error'])
+
+    def test_solve_request_if_strategy_is_unknown_then_returns_the_error(self):
+        self.assertEqual('Unknown strategy: foo', solve_request('foo', 'manh', UNSOLVED, {})['error'])
+
+    def test_solve_request_if_table_not_preloaded_then_returns_the_error(self):
+        self.assertEqual('Table not preloaded: pdb:10x10',
+                         solve_request('astr', 'pdb', [[(i + 1) % 100 for i in range(r * 10, r * 10 + 10)]
+                                                       for r in range(10)], {})['error'])
+        self.assertEqual('Table not preloaded: table:3x3', solve_request('table', '/tmp/tables', UNSOLVED, {})['error'])
+
+    def test_get_limit_options_if_server_timeout_is_shorter_then_caps_the_timeout_of_the_request(self):
+        self.assertEqual({'timeout': 1, 'max_memory': 1 << 20},
+                         get_limit_options({'timeout': 5, 'max_memory': 1}, timeout=1))
+        self.assertEqual({'timeout': 2}, get_limit_options({}, timeout=2))
+
+    def test_initialize_worker_if_walking_distance_preloaded_then_the_tables_are_built(self):
+        get_walking_distance_table.cache_clear()
+        initialize_worker([parse_preload('walk:3x2')])
+        self.assertEqual(2, get_walking_distance_table.cache_info().currsize)
+
+    def test_parse_preload_if_unknown_table_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            parse_preload('foo:3x3')
+
+    def test_parse_server_args_if_options_passed_then_returns_them(self):
+        self.assertEqual({'preloads': [('pdb', 4, 4)], 'port': 9000, 'workers': 2},
+                         parse_server_args(['--port', '9000', '--preload', 'pdb:4x4', '--workers', '2']))
+        self.assertIsNone(parse_server_args(['--port', 'x']))
+        self.assertIsNone(parse_server_args(['--foo', '1']))
+
+
+class SolveServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.solve_server = SolveServer(workers=2, max_pending=2)
+        server = await self.solve_server.start(port=0)
+        self.port = server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self) -> None:
+        await self.solve_server.close()
+
+    async def request(self, *requests):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        for request in requests:
+            writer.write((request if isinstance(request, str) else json.dumps(request)).encode() + b'\n')
+        await writer.drain()
+        replies = [json.loads(await reader.readline()) for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+        return replies
+
+    async def test_request_if_solvable_then_replies_with_the_solution_and_the_id(self):
+        reply = (await self.request({'id': 7, 'board': UNSOLVED, 'strategy': 'astr', 'parameter': 'manh'}))[0]
+        self.assertEqual((7, 17), (reply['id'], reply['status']))
+        self.assertEqual(17, len(reply['solution']))
+
+    async def test_request_if_not_json_then_replies_with_an_error(self):
+        reply = (await self.request('{"board": '))[0]
+        self.assertEqual((None, -1), (reply['id'], reply['status']))
+        self.assertIn('Invalid request', reply['error'])
+
+    async def test_request_if_timeout_passed_then_replies_with_status_2(self):
+        board = [[0, 15, 14, 13], [12, 11, 10, 9], [8, 7, 6, 5], [4, 3, 2, 1]]
+        reply = (await self.request({'board': board, 'strategy': 'bfs', 'parameter': 'RDUL', 'timeout': 0.2}))[0]
+        self.assertEqual(-2, reply['status'])
+
+    async def test_request_if_more_requests_than_slots_then_answers_all_of_them(self):
+        requests = [{'id': i, 'board': UNSOLVED, 'strategy': 'astr', 'parameter': 'manh'} for i in range(6)]
+        replies = await self.request(*requests)
+        self.assertEqual(list(range(6)), sorted(reply['id'] for reply in replies))
+        self.assertTrue(all(reply['status'] == 17 for reply in replies))
+        # Every slot has been given back, or the next requests would wait forever
+        replies = await asyncio.wait_for(self.request(*requests[:2]), 10)
+        self.assertEqual(2, len(replies))
+
+    async def test_request_if_timed_out_then_the_slot_is_held_until_the_worker_is_done(self):
+        board = [[0, 15, 14, 13], [12, 11, 10, 9], [8, 7, 6, 5], [4, 3, 2, 1]]
+        self.solve_server.timeout = 0.1
+        with unittest.mock.patch('server.TIMEOUT_GRACE', -0.1):
+            reply = (await self.request({'board': board, 'strategy': 'bfs', 'parameter': 'RDUL'}))[0]
+        self.assertEqual(-2, reply['status'])
+        self.assertEqual(1, self.solve_server.slots._value)
+        await asyncio.sleep(1)
+        self.assertEqual(2, self.solve_server.slots._value)
+
+    async def test_request_if_a_worker_died_then_replies_with_an_error_and_answers_the_next_requests(self):
+        loop = asyncio.get_running_loop()
+        pid = await loop.run_in_executor(self.solve_server.executor, os.getpid)
+        os.kill(pid, signal.SIGKILL)
+        request = {'board': UNSOLVED, 'strategy': 'astr', 'parameter': 'manh'}
+        replies = []
+        for _ in range(3):
+            replies.extend(await asyncio.wait_for(self.request(request), 10))
+        self.assertTrue(all(reply['status'] in (-1, 17) for reply in replies))
+        self.assertEqual(17, replies[-1]['status'])
+
+    async def test_request_if_many_connections_then_answers_each_on_its_own(self):
+        requests = [{'id': i, 'board': UNSOLVED, 'strategy': 'decomp', 'parameter': 'manh'} for i in range(4)]
+        replies = await asyncio.gather(*(self.request(request) for request in requests))
+        self.assertEqual(list(range(4)), [reply[0]['id'] for reply in replies])
+
+
+class UnixSolveServerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_request_if_unix_socket_then_replies_with_the_solution(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'solve.sock')
+            solve_server = SolveServer(workers=1)
+            await solve_server.start(path=path)
+            try:
+                reader, writer = await asyncio.open_unix_connection(path)
+                writer.write(b'{"board": [[1, 2, 3], [4, 5, 6], [7, 0, 8]], "strategy": "bfs", "parameter": "RDUL"}\n')
+                reply = json.loads(await reader.readline())
+                writer.close()
+                await writer.wait_closed()
+            finally:
+                await solve_server.close()
+        self.assertEqual((1, 'R'), (reply['status'], reply['solution']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
 
-from solver import Solver
+from limits import SearchLimits, LimitReached
+from a_star import AStarSolver
+from decomposition import DecompositionSolver
+from solver import Solver, collect_moves, get_operators, iter_moves
 from state import State, Direction
 
 
@@ -77,3 +80,39 @@ class SolverTest:
             result = result.move(o)
 
         self.assertEqual(self.unsolved.get_target_state(), result)
+
+    def test_solve_if_node_limit_reached_then_raises_limit_reached_with_the_stats(self):
+        with self.assertRaises(LimitReached) as c:
+            self.solver.solve(self.unsolved, "RDLU", limits=SearchLimits(max_nodes=10))
+        self.assertEqual('nodes', c.exception.reason)
+        self.assertGreater(c.exception.num_of_visited, 10)
+        self.assertGreater(c.exception.num_of_explored, 0)
+
+
+class IterMovesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.unsolved = State([
+            [7, 5, 4],
+            [0, 3, 2],
+            [8, 1, 6]
+        ])
+
+    def test_iter_moves_if_solver_only_returns_states_then_yields_the_whole_solution_at_once(self):
+        batches = list(iter_moves(AStarSolver, self.unsolved))
+        self.assertEqual([get_operators(AStarSolver.solve(self.unsolved)[0])], batches)
+
+    def test_iter_moves_if_solver_yields_moves_then_passes_the_batches_on(self):
+        state = State([[(row * 6 + col + 1) % 36 for col in range(6)] for row in range(6)]).move(Direction.UP)
+        state.parent = None
+        self.assertEqual(list(DecompositionSolver.iter_moves(state)), list(iter_moves(DecompositionSolver, state)))
+
+    def test_collect_moves_if_solved_then_returns_the_moves_and_the_stats(self):
+        moves, num_of_visited, _, max_depth = collect_moves(iter_moves(AStarSolver, self.unsolved))
+        result = self.unsolved
+        for move in moves:
+            result = result.move(move)
+        self.assertEqual(self.unsolved.get_target_state(), result)
+        self.assertEqual((len(moves), True), (max_depth, num_of_visited > 0))
+
+    def test_collect_moves_if_there_is_no_solution_then_returns_none(self):
+        self.assertIsNone(collect_moves(iter_moves(DecompositionSolver, State([[3], [1], [2], [0]])))[0])
@@ -1,6 +1,9 @@
+import itertools
+import math
 import unittest
 
-from state import State, Direction
+from state import State, PackedState, Geometry, Direction, OPERATORS, get_tile_bits, pack_board, unpack_board, \
+    rank_board, unrank_board
 
 
 class StateTest(unittest.TestCase):
@@ -160,6 +163,57 @@ class StateTest(unittest.TestCase):
         ])
         self.assertFalse(state.is_solvable())
 
+    def test_get_inversion_count_if_large_board_then_returns_the_same_number_as_pairwise_comparison(self):
+        values = [(i * 37) % 100 for i in range(100)]
+        state = State([values[i:i + 10] for i in range(0, 100, 10)])
+        expected = sum(1 for i in range(100) for j in range(i + 1, 100)
+                       if values[i] and values[j] and values[i] > values[j])
+        self.assertEqual(expected, state.get_inversion_count())
+
+    def test_is_solvable_if_odd_width_and_even_height_and_target_state_moved_up_then_returns_true(self):
+        state = State([
+            [1, 2, 3],
+            [4, 5, 0]
+        ])
+        self.assertTrue(state.move(Direction.UP).is_solvable())
+
+    def test_is_solvable_if_even_width_and_odd_height_then_returns_true_for_the_target_state(self):
+        state = State([
+            [1, 2],
+            [3, 4],
+            [5, 0]
+        ])
+        self.assertTrue(state.is_solvable())
+        self.assertTrue(state.move(Direction.UP).is_solvable())
+
+    def test_is_solvable_if_even_width_and_odd_height_and_two_tiles_swapped_then_returns_false(self):
+        state = State([
+            [2, 1],
+            [3, 4],
+            [5, 0]
+        ])
+        self.assertFalse(state.is_solvable())
+
+    def test_move_if_inversion_parity_known_then_it_is_updated_without_counting(self):
+        state = State([
+            [13, 2, 10, 3],
+            [1, 12, 8, 4],
+            [5, 0, 9, 6],
+            [15, 14, 11, 7]
+        ])
+        state.get_inversion_parity()
+        for d in "URDDLLUURRRD":
+            state = state.move(Direction(d)) or state
+            self.assertEqual(state.get_inversion_count() % 2, state.inversion_parity)
+
+    def test_move_if_inversion_parity_unknown_then_it_stays_unknown(self):
+        state = State([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+        self.assertIsNone(state.move(Direction.UP).inversion_parity)
+
     def test_get_target_state_if_board_has_single_field_then_returns_the_current_state(self):
         state = State([[0]])
         self.assertEqual(State([[0]]), state.get_target_state())
@@ -324,6 +378,27 @@ class StateTest(unittest.TestCase):
         ])
         self.assertEqual(Direction.LEFT, state.move(Direction.LEFT).operator)
 
+    def test_move_if_delta_passed_then_heuristic_value_is_updated_with_the_moved_tile(self):
+        state = State([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+        state.heuristic_value = 10
+        moves = []
+        result = state.move(Direction.LEFT, lambda s, tile, src, dst: moves.append((tile, src, dst)) or 1)
+        self.assertEqual(11, result.heuristic_value)
+        self.assertEqual([(8, 7, 8)], moves)
+
+    def test_move_if_no_delta_passed_then_heuristic_value_is_none(self):
+        state = State([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 0]
+        ])
+        state.heuristic_value = 10
+        self.assertIsNone(state.move(Direction.LEFT).heuristic_value)
+
     def test_get_neighbours_if_not_an_edge_cell_then_return_correct_number_of_states(self):
         state = State([
             [1, 2, 3, 4],
@@ -425,5 +500,138 @@ class StateTest(unittest.TestCase):
             i += 1
 
 
+class PackedStateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state = State([
+            [1, 2, 3, 4],
+            [5, 6, 7, 8],
+            [9, 10, 0, 11],
+            [12, 13, 14, 15]
+        ])
+
+    def test_get_tile_bits_if_15_puzzle_then_returns_4(self):
+        self.assertEqual(4, get_tile_bits(16))
+
+    def test_unpack_board_if_packed_board_passed_then_returns_the_original_board(self):
+        bits = get_tile_bits(len(self.state))
+        self.assertEqual(self.state.board, unpack_board(pack_board(self.state.board, bits), len(self.state), bits))
+
+    def test_pack_if_15_puzzle_then_key_fits_in_64_bits(self):
+        self.assertLess(self.state.pack().key, 1 << 64)
+
+    def test_pack_if_large_board_then_board_is_preserved(self):
+        state = State([[(row * 6 + col + 1) % 36 for col in range(6)] for row in range(6)])
+        self.assertEqual(state.board, state.pack().board)
+
+    def test_init_if_called_explicitly_then_board_is_preserved(self):
+        self.assertEqual(self.state.board, PackedState([
+            [1, 2, 3, 4],
+            [5, 6, 7, 8],
+            [9, 10, 0, 11],
+            [12, 13, 14, 15]
+        ]).board)
+
+    def test_init_if_invalid_board_then_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            PackedState([[1, 2], [2, 0]])
+
+    def test_move_if_valid_move_then_returns_the_same_board_as_unpacked_state(self):
+        packed = self.state.pack()
+        for d in Direction:
+            self.assertEqual(self.state.move(d).board, packed.move(d).board)
+
+    def test_move_if_invalid_move_then_returns_none(self):
+        state = State([
+            [1, 0, 2],
+            [3, 4, 5],
+            [6, 7, 8]
+        ])
+        self.assertIsNone(state.pack().move(Direction.UP))
+
+    def test_move_if_valid_then_parent_and_operator_are_set(self):
+        packed = self.state.pack()
+        result = packed.move(Direction.LEFT)
+        self.assertIs(packed, result.parent)
+        self.assertEqual(Direction.LEFT, result.operator)
+
+    def test_get_neighbours_if_packed_then_returns_packed_states_in_correct_order(self):
+        neighbours = self.state.pack().get_neighbours("RDLU")
+        for i, d in enumerate("RDLU"):
+            self.assertIsInstance(neighbours[i], PackedState)
+            self.assertEqual(self.state.move(Direction(d)).pack(), neighbours[i])
+
+    def test_get_target_state_if_packed_then_returns_packed_target_state(self):
+        target = self.state.pack().get_target_state()
+        self.assertIsInstance(target, PackedState)
+        self.assertEqual(self.state.get_target_state().pack(), target)
+
+    def test_is_solvable_if_packed_then_returns_the_same_result_as_unpacked_state(self):
+        state = State([
+            [3, 9, 1, 15],
+            [14, 11, 4, 6],
+            [13, 0, 10, 12],
+            [2, 7, 8, 5]
+        ])
+        self.assertEqual(state.is_solvable(), state.pack().is_solvable())
+        self.assertEqual(self.state.is_solvable(), self.state.pack().is_solvable())
+
+    def test_hash_if_equal_states_then_the_hashes_are_also_equal(self):
+        packed1 = self.state.pack().move(Direction.UP).move(Direction.DOWN)
+        packed2 = self.state.pack()
+        self.assertEqual(packed1, packed2)
+        self.assertEqual(hash(packed1), hash(packed2))
+
+    def test_eq_if_packed_and_unpacked_states_have_the_same_board_then_they_are_not_equal(self):
+        packed = self.state.pack()
+        self.assertNotEqual(self.state, packed)
+        self.assertNotEqual(packed, self.state)
+        self.assertNotIn(packed, {self.state})
+        self.assertEqual(self.state, packed.unpack())
+
+    def test_unpack_if_packed_then_returns_equal_state(self):
+        unpacked = self.state.pack().unpack()
+        self.assertNotIsInstance(unpacked, PackedState)
+        self.assertEqual(self.state, unpacked)
+
+
+class GeometryTest(unittest.TestCase):
+    def test_get_if_called_twice_with_the_same_size_then_returns_the_same_instance(self):
+        self.assertIs(Geometry.get(4, 3), Geometry.get(4, 3))
+        self.assertIsNot(Geometry.get(4, 3), Geometry.get(3, 4))
+
+    def test_init_if_state_created_then_uses_the_shared_geometry(self):
+        state = State([
+            [1, 2, 3],
+            [4, 5, 0]
+        ])
+        self.assertIs(Geometry.get(3, 2), state.geometry)
+        self.assertIs(state.geometry, state.move(Direction.LEFT).geometry)
+
+    def test_move_targets_if_corner_cell_then_contains_only_legal_moves(self):
+        geometry = Geometry.get(3, 2)
+        self.assertEqual({Direction.RIGHT: 1, Direction.DOWN: 3}, geometry.move_targets[0])
+        self.assertEqual({Direction.LEFT: 4, Direction.UP: 2}, geometry.move_targets[5])
+
+    def test_get_moves_if_order_passed_then_returns_legal_moves_in_that_order(self):
+        moves = Geometry.get(3, 3).get_moves("ULDR")[4]
+        self.assertEqual([Direction.UP, Direction.LEFT, Direction.DOWN, Direction.RIGHT],
+                         [OPERATORS[operator] for operator, _ in moves])
+        self.assertEqual([1, 3, 7, 5], [target for _, target in moves])
+
+    def test_get_moves_if_called_twice_with_the_same_order_then_returns_the_cached_table(self):
+        geometry = Geometry.get(3, 3)
+        self.assertIs(geometry.get_moves("RDLU"), geometry.get_moves("RDLU"))
+
+
+class RankTest(unittest.TestCase):
+    def test_rank_board_if_all_permutations_ranked_then_ranks_are_dense(self):
+        ranks = {rank_board(permutation) for permutation in itertools.permutations(range(6))}
+        self.assertEqual(set(range(math.factorial(6))), ranks)
+
+    def test_unrank_board_if_ranked_board_passed_then_returns_the_original_board(self):
+        for board in ((1, 2, 3, 4, 5, 6, 7, 8, 0), (7, 5, 4, 0, 3, 2, 8, 1, 6), (0, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1)):
+            self.assertEqual(board, unrank_board(rank_board(board), len(board)))
+
+
 if __name__ == '__main__':
     unittest.main()
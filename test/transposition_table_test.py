@@ -0,0 +1,46 @@
+import unittest
+
+from transposition_table import TranspositionTable
+
+
+class TranspositionTableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.table = TranspositionTable(1024)
+
+    def test_store_if_new_key_then_returns_true(self):
+        self.assertTrue(self.table.store(42, 3))
+        self.assertEqual(3, self.table.get(42))
+
+    def test_store_if_key_stored_at_smaller_or_equal_depth_then_returns_false(self):
+        self.table.store(42, 3)
+        self.assertFalse(self.table.store(42, 3))
+        self.assertFalse(self.table.store(42, 5))
+
+    def test_store_if_key_reached_at_smaller_depth_then_updates_the_depth(self):
+        self.table.store(42, 3)
+        self.assertTrue(self.table.store(42, 1))
+        self.assertEqual(1, self.table.get(42))
+
+    def test_store_if_bucket_is_full_then_keeps_the_shallowest_entry(self):
+        table = TranspositionTable(2)
+        table.store(1, 2)
+        table.store(2, 5)
+        table.store(3, 4)
+        self.assertEqual(2, table.get(1))
+        self.assertNotIn(2, table)
+        self.assertEqual(2, len(table))
+
+    def test_store_if_many_keys_then_size_never_exceeds_the_capacity(self):
+        for key in range(10000):
+            self.table.store(key, key % 7)
+        self.assertEqual(1024, len(self.table))
+
+    def test_clear_if_called_then_forgets_every_key(self):
+        self.table.store(42, 3)
+        self.table.clear()
+        self.assertNotIn(42, self.table)
+        self.assertEqual(0, len(self.table))
+
+
+if __name__ == '__main__':
+    unittest.main()
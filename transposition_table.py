@@ -0,0 +1,58 @@
+from array import array
+
+DEFAULT_CAPACITY = 1 << 20
+
+
+class TranspositionTable:
+    # A fixed-size hash table of keys and the shallowest depth they have been reached at. Every key can only be in
+    # one of the two slots of its bucket: the first one keeps the shallower of the colliding entries, because they
+    # prune the larger subtrees, and the second one is always replaced. Memory never grows past the capacity, the
+    # cost of a collision is only that a node may be searched again.
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.num_of_buckets = max(1, capacity // 2)
+        self.keys = [None] * (2 * self.num_of_buckets)
+        self.depths = array('I', [0]) * (2 * self.num_of_buckets)
+        self.size = 0
+
+    def store(self, key, depth) -> bool:
+        # Returns False if the key has already been reached at the same or a smaller depth, otherwise records it
+        slot = 2 * (hash(key) % self.num_of_buckets)
+        keys, depths = self.keys, self.depths
+        for i in (slot, slot + 1):
+            if keys[i] == key:
+                if depths[i] <= depth:
+                    return False
+                depths[i] = depth
+                return True
+
+        if keys[slot] is None:
+            keys[slot], depths[slot] = key, depth
+            self.size += 1
+            return True
+
+        if keys[slot + 1] is None:
+            self.size += 1
+        if depth <= depths[slot]:
+            # The shallower entry takes the first slot and the one it replaces falls back to the second
+            keys[slot + 1], depths[slot + 1] = keys[slot], depths[slot]
+            keys[slot], depths[slot] = key, depth
+        else:
+            keys[slot + 1], depths[slot + 1] = key, depth
+        return True
+
+    def get(self, key):
+        slot = 2 * (hash(key) % self.num_of_buckets)
+        for i in (slot, slot + 1):
+            if self.keys[i] == key:
+                return self.depths[i]
+        return None
+
+    def clear(self):
+        self.keys = [None] * len(self.keys)
+        self.size = 0
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self.size